@@ -0,0 +1,272 @@
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+
+# Brotli and Zstandard are optional; without them only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript", "application/xml", "application/graphql", "image/svg+xml"
+)
+# A 304 keeps the response's other headers (Cache-Control, CORS, X-Next-Cursor...) but describes no body
+NOT_MODIFIED_DROPPED = {b"content-length", b"content-type", b"content-encoding"}
+
+class GzipEncoder:
+    name = "gzip"
+    
+    def __init__(self, level: int = 6):
+        self.level = level
+    
+    def compress(self, data: bytes) -> bytes:
+        # A fixed mtime keeps output identical for identical bodies
+        return gzip.compress(data, self.level, mtime=0)
+    
+    def stream(self):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return (
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush
+        )
+
+class BrotliEncoder:
+    name = "br"
+    
+    def __init__(self, quality: int = 4):
+        self.quality = quality
+    
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.quality)
+    
+    def stream(self):
+        compressor = brotli.Compressor(quality=self.quality)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush(), compressor.finish)
+
+class ZstdEncoder:
+    name = "zstd"
+    
+    def __init__(self, level: int = 3):
+        self.compressor = zstandard.ZstdCompressor(level=level)
+    
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+    
+    def stream(self):
+        compressor = self.compressor.compressobj()
+        return (
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush
+        )
+
+def available_encoders() -> List:
+    """Supported encoders in server preference order"""
+    encoders = []
+    if zstandard is not None:
+        encoders.append(ZstdEncoder())
+    if brotli is not None:
+        encoders.append(BrotliEncoder())
+    encoders.append(GzipEncoder())
+    return encoders
+
+def negotiate(accept_encoding: str, encoders: List) -> Optional[object]:
+    """Pick the encoder the client weights highest; ties go to the server's preference"""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    
+    best, best_weight = None, 0.0
+    for encoder in encoders:
+        weight = weights.get(encoder.name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoder, weight
+    return best
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (ETag, encoding), bounded by total bytes"""
+    
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._bodies: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def get(self, etag: str, encoding: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._bodies.get((etag, encoding))
+            if body is not None:
+                self._bodies.move_to_end((etag, encoding))
+            return body
+    
+    def put(self, etag: str, encoding: str, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop((etag, encoding), None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._bodies[(etag, encoding)] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._bodies.popitem(last=False)
+                self._size -= len(evicted)
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli/zstd compression for compressible response types.
+    
+    Complete bodies smaller than `minimum_size` go out as they are. Streamed
+    bodies are compressed chunk by chunk, flushing after each so clients see
+    data as it is produced. When `etag` is on, successful GET responses get an
+    ETag derived from their uncompressed body, a matching If-None-Match is
+    answered with 304, and compressed bodies are cached by ETag and encoding
+    so unchanged responses aren't compressed twice.
+    """
+    
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        encoders: Optional[List] = None,
+        etag: bool = True,
+        cache: Optional[CompressedBodyCache] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = encoders if encoders is not None else available_encoders()
+        self.etag = etag
+        self.cache = cache
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoder = negotiate(request_headers.get("accept-encoding", ""), self.encoders)
+        # Not HEAD: its empty body would get an ETag that never matches the GET's
+        with_etag = self.etag and scope["method"] == "GET"
+        if encoder is None and not with_etag:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, send, encoder, with_etag, request_headers.get("if-none-match"))
+        await self.app(scope, receive, responder.send)
+
+class _Responder:
+    """Per-request state: holds the start message until the first body chunk shows what to do"""
+    
+    def __init__(self, middleware: CompressionMiddleware, send, encoder, with_etag: bool, if_none_match: Optional[str]):
+        self.middleware = middleware
+        self.downstream = send
+        self.encoder = encoder
+        self.with_etag = with_etag
+        self.if_none_match = if_none_match
+        self.start = None
+        self.stream = None
+        self.passthrough = False
+    
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+        if self.stream is not None:
+            await self._send_streamed(message)
+            return
+        
+        headers = MutableHeaders(raw=self.start["headers"])
+        compressible = (
+            "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            and self.start["status"] not in (204, 304)
+        )
+        if not compressible:
+            self.passthrough = True
+            await self.downstream(self.start)
+            await self.downstream(message)
+            return
+        headers.add_vary_header("Accept-Encoding")
+        
+        if message.get("more_body", False):
+            if self.encoder is None:
+                self.passthrough = True
+                await self.downstream(self.start)
+                await self.downstream(message)
+                return
+            self.stream = self.encoder.stream()
+            del headers["content-length"]
+            headers["content-encoding"] = self.encoder.name
+            await self.downstream(self.start)
+            await self._send_streamed(message)
+            return
+        
+        await self._send_complete(headers, message.get("body", b""))
+    
+    async def _send_streamed(self, message):
+        compress, finish = self.stream
+        body = compress(message.get("body", b""))
+        more_body = message.get("more_body", False)
+        if not more_body:
+            body += finish()
+        await self.downstream({"type": "http.response.body", "body": body, "more_body": more_body})
+    
+    async def _send_complete(self, headers: MutableHeaders, body: bytes):
+        etag = None
+        encode = self.encoder is not None and len(body) >= self.middleware.minimum_size
+        if self.with_etag and self.start["status"] == 200 and "etag" not in headers:
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            # Each encoding is a distinct representation and needs its own strong ETag
+            headers["etag"] = f'"{etag[1:-1]}-{self.encoder.name}"' if encode else etag
+            if self._not_modified(etag):
+                await self.downstream({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(name, value) for name, value in headers.raw if name not in NOT_MODIFIED_DROPPED]
+                })
+                await self.downstream({"type": "http.response.body", "body": b""})
+                return
+        
+        if encode:
+            cache = self.middleware.cache
+            compressed = cache.get(etag, self.encoder.name) if cache is not None and etag else None
+            if compressed is None:
+                compressed = self.encoder.compress(body)
+                if cache is not None and etag:
+                    cache.put(etag, self.encoder.name, compressed)
+            body = compressed
+            headers["content-encoding"] = self.encoder.name
+            headers["content-length"] = str(len(body))
+        
+        await self.downstream(self.start)
+        await self.downstream({"type": "http.response.body", "body": body})
+    
+    def _not_modified(self, etag: str) -> bool:
+        if not self.if_none_match:
+            return False
+        if self.if_none_match.strip() == "*":
+            return True
+        base = etag[1:-1]
+        for candidate in self.if_none_match.split(","):
+            candidate = candidate.strip().removeprefix("W/").strip('"')
+            if candidate == base or candidate.rsplit("-", 1)[0] == base:
+                return True
+        return False
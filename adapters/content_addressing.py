@@ -0,0 +1,56 @@
+import hashlib
+import mimetypes
+import os
+from typing import Tuple
+from domain.models import ImageUpload
+
+CHUNK_SIZE = 1024 * 1024
+# Every content-addressed object lives under one prefix, whatever it was uploaded for
+CONTENT_PREFIX = "objects"
+# Leading bytes of the image formats we accept, and the extension each is stored under
+MAGIC_EXTENSIONS = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+# mimetypes picks the first registered extension, which varies by platform
+CANONICAL_EXTENSIONS = {".jpe": ".jpg", ".jpeg": ".jpg", ".tif": ".tiff"}
+
+def content_hash(image: ImageUpload) -> Tuple[str, int]:
+    """Return the SHA-256 hex digest and size of an upload, leaving the stream rewound"""
+    hasher = hashlib.sha256()
+    size = 0
+    image.content.seek(0)
+    for chunk in iter(lambda: image.content.read(CHUNK_SIZE), b""):
+        hasher.update(chunk)
+        size += len(chunk)
+    image.content.seek(0)
+    return hasher.hexdigest(), size
+
+def object_extension(filename: str, content_type: str) -> str:
+    extension = os.path.splitext(filename or "")[1].lower()
+    if not extension:
+        extension = mimetypes.guess_extension(content_type or "") or ".jpg"
+    return extension
+
+def sniff_extension(head: bytes, content_type: str) -> str:
+    """Extension for the format the bytes are actually in, falling back to the declared content type"""
+    for magic, extension in MAGIC_EXTENSIONS:
+        if head.startswith(magic):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    extension = mimetypes.guess_extension(content_type or "") or ".bin"
+    return CANONICAL_EXTENSIONS.get(extension, extension)
+
+def object_key(digest: str, head: bytes, content_type: str) -> str:
+    """Deterministic key for content with this digest whose first bytes are `head`"""
+    return f"{CONTENT_PREFIX}/{digest}{sniff_extension(head, content_type)}"
+
+def content_key(digest: str, image: ImageUpload) -> str:
+    """Build a deterministic object key so identical bytes always map to the same object"""
+    image.content.seek(0)
+    head = image.content.read(12)
+    image.content.seek(0)
+    return object_key(digest, head, image.content_type)
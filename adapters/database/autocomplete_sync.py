@@ -0,0 +1,38 @@
+from typing import Dict
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from .catalog_sync import CatalogChangeHandler, register_catalog_sync
+from .entities import ProductEntity, ProductVariantEntity
+
+def load_autocomplete(db: Session, index) -> int:
+    """Rebuild the autocomplete index from every product and variant"""
+    with index.loading():
+        products = db.execute(select(ProductEntity.id, ProductEntity.sku_id, ProductEntity.title)).all()
+        variants = db.execute(
+            select(ProductVariantEntity.id, ProductVariantEntity.product_id, ProductVariantEntity.sku_suffix)
+        ).all()
+        index.bulk_load(products, variants)
+    return len(index)
+
+class AutocompleteSync(CatalogChangeHandler):
+    """Applies committed catalog changes to the autocomplete index"""
+    
+    def __init__(self, index):
+        self.index = index
+    
+    def product_saved(self, product: Dict):
+        self.index.upsert_product(product["id"], product["sku_id"], product["title"])
+    
+    def product_deleted(self, product_id: str):
+        self.index.remove_product(product_id)
+    
+    def variant_saved(self, variant: Dict):
+        if variant["product_id"] is not None:
+            self.index.upsert_variant(variant["id"], variant["product_id"], variant["sku_suffix"])
+    
+    def variant_deleted(self, variant_id: str):
+        self.index.remove_variant(variant_id)
+
+def register_autocomplete_sync(index, session_class=Session):
+    """Keep the autocomplete index in step with committed product and variant changes"""
+    return register_catalog_sync(AutocompleteSync(index), session_class)
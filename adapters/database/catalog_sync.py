@@ -0,0 +1,74 @@
+from typing import Dict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Columns snapshotted at flush time, so handlers never touch expired instances
+PRODUCT_FIELDS = ("id", "sku_id", "title", "color_primary")
+VARIANT_FIELDS = ("id", "product_id", "sku_suffix", "color_code")
+
+class CatalogChangeHandler:
+    """Receives committed catalog changes; products and variants arrive as plain dict snapshots"""
+    
+    def product_saved(self, product: Dict):
+        pass
+    
+    def product_deleted(self, product_id: str):
+        pass
+    
+    def variant_saved(self, variant: Dict):
+        pass
+    
+    def variant_deleted(self, variant_id: str):
+        pass
+    
+    def category_changed(self, category_id: str):
+        pass
+
+def _snapshot(obj, fields) -> Dict:
+    values = {field: getattr(obj, field, None) for field in fields}
+    return {field: str(value) if field.endswith("id") and value is not None else value for field, value in values.items()}
+
+def _table_name(obj):
+    table = getattr(type(obj), "__table__", None)
+    return table.name if table is not None else None
+
+def register_catalog_sync(handler: CatalogChangeHandler, session_class=Session):
+    """Feed `handler` every committed product, variant and category change.
+    
+    Changes are collected after each flush and applied only once the
+    transaction commits, so a rollback never leaves phantom entries behind.
+    Both the entity classes and main.py's ORM mirrors map the same tables,
+    so objects are matched by table name rather than class.
+    """
+    pending_key = ("catalog_changes", id(handler))
+    
+    @event.listens_for(session_class, "after_flush")
+    def collect(session, flush_context):
+        changes = session.info.setdefault(pending_key, [])
+        for obj in list(session.new) + list(session.dirty):
+            table = _table_name(obj)
+            if table == "products":
+                changes.append((handler.product_saved, _snapshot(obj, PRODUCT_FIELDS)))
+            elif table == "product_variants":
+                changes.append((handler.variant_saved, _snapshot(obj, VARIANT_FIELDS)))
+            elif table == "categories":
+                changes.append((handler.category_changed, str(obj.id)))
+        for obj in session.deleted:
+            table = _table_name(obj)
+            if table == "products":
+                changes.append((handler.product_deleted, str(obj.id)))
+            elif table == "product_variants":
+                changes.append((handler.variant_deleted, str(obj.id)))
+            elif table == "categories":
+                changes.append((handler.category_changed, str(obj.id)))
+    
+    @event.listens_for(session_class, "after_commit")
+    def apply(session):
+        for method, argument in session.info.pop(pending_key, []):
+            method(argument)
+    
+    @event.listens_for(session_class, "after_rollback")
+    def discard(session):
+        session.info.pop(pending_key, None)
+    
+    return collect, apply, discard
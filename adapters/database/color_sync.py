@@ -0,0 +1,56 @@
+from typing import Dict
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from domain.ports import ColorIndexPort
+from .catalog_sync import CatalogChangeHandler, register_catalog_sync
+from .entities import ProductEntity, ProductVariantEntity
+
+def product_key(product_id) -> str:
+    return f"product:{product_id}"
+
+def variant_key(variant_id) -> str:
+    return f"variant:{variant_id}"
+
+def load_colors(db: Session, index) -> int:
+    """Rebuild the index from every product's primary colour and every variant colour"""
+    with index.loading():
+        products = db.execute(select(ProductEntity.id, ProductEntity.color_primary)).all()
+        variants = db.execute(
+            select(ProductVariantEntity.id, ProductVariantEntity.product_id, ProductVariantEntity.color_code)
+        ).all()
+        index.bulk_load(
+            [(product_key(pid), pid, color, None) for pid, color in products]
+            + [(variant_key(vid), pid, color, vid) for vid, pid, color in variants]
+        )
+    return len(index)
+
+class ColorIndexSync(CatalogChangeHandler):
+    """Applies committed catalog changes to a colour index"""
+    
+    def __init__(self, index: ColorIndexPort):
+        self.index = index
+    
+    def product_saved(self, product: Dict):
+        self._upsert(product_key(product["id"]), product["id"], product["color_primary"], None)
+    
+    def product_deleted(self, product_id: str):
+        self.index.remove_product(product_id)
+    
+    def variant_saved(self, variant: Dict):
+        self._upsert(variant_key(variant["id"]), variant["product_id"], variant["color_code"], variant["id"])
+    
+    def variant_deleted(self, variant_id: str):
+        self.index.remove(variant_key(variant_id))
+    
+    def _upsert(self, key, product_id, color, variant_id):
+        if product_id is None or not color:
+            return
+        try:
+            self.index.upsert(key, product_id, color, variant_id)
+        except ValueError:
+            # Malformed colours are simply left out of the index
+            self.index.remove(key)
+
+def register_color_sync(index: ColorIndexPort, session_class=Session):
+    """Keep the colour index in step with committed product and variant changes"""
+    return register_catalog_sync(ColorIndexSync(index), session_class)
@@ -1,16 +1,38 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.orm import sessionmaker
 from .entities import Base
+from .routing import RoutingSession
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+# Comma-separated; when empty every read and write goes to DATABASE_URL
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# How long a client that just wrote keeps reading from the primary
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+# Compiled SQL kept per engine; every load combination of a product read is a distinct entry
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1000"))
+# psycopg 3 only (postgresql+psycopg://): server-side PREPARE a statement after this many runs on a
+# connection; 0 prepares on first use and -1 turns it off
+DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "5"))
+
+def connect_args(url: str) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return {"check_same_thread": False}
+    if parsed.get_backend_name() == "postgresql" and parsed.get_driver_name() == "psycopg":
+        return {"prepare_threshold": DB_PREPARE_THRESHOLD if DB_PREPARE_THRESHOLD >= 0 else None}
+    return {}
+
+def make_engine(url: str):
+    return create_engine(url, connect_args=connect_args(url), query_cache_size=DB_QUERY_CACHE_SIZE)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = make_engine(DATABASE_URL)
+replica_engines = [make_engine(url) for url in DATABASE_REPLICA_URLS]
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, primary=engine, replicas=replica_engines
+)
 
 def get_db():
     db = SessionLocal()
@@ -1,12 +1,32 @@
-from sqlalchemy import Column, String, Text, Integer, DateTime, Enum as SQLEnum, ForeignKey, Numeric, Boolean
+from sqlalchemy import DDL, event, select, Column, String, Text, Integer, DateTime, LargeBinary, Enum as SQLEnum, ForeignKey, Numeric, Boolean, Index, Computed
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql import func, text
+from datetime import datetime, timezone
 from domain.models import ProductStatus
 import uuid
 
 Base = declarative_base()
+# The autocomplete trigram indexes below need pg_trgm
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def category_path_default(context) -> str:
+    """Materialized path for a new category: its parent's path plus its own id"""
+    params = context.get_current_parameters()
+    parent_path = ""
+    if params.get("parent_id") is not None:
+        categories = CategoryEntity.__table__
+        parent_path = context.connection.execute(
+            select(categories.c.path).where(categories.c.id == params["parent_id"])
+        ).scalar() or ""
+    return f"{parent_path}{params['id']}/"
+
+def category_depth_default(context) -> int:
+    return context.get_current_parameters()["path"].count("/") - 1
 
 class CategoryEntity(Base):
     __tablename__ = "categories"
@@ -14,8 +34,17 @@ class CategoryEntity(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
+    parent_id = Column(UUID(as_uuid=True), ForeignKey("categories.id"), nullable=True)
+    # "<root id>/<child id>/.../<own id>/": a subtree is one prefix match on this column
+    path = Column(String(1024), nullable=False, default=category_path_default)
+    depth = Column(Integer, nullable=False, default=category_depth_default)
     
     products = relationship("ProductEntity", back_populates="category")
+    
+    __table_args__ = (
+        Index("ix_categories_path", "path", postgresql_ops={"path": "varchar_pattern_ops"}),
+        Index("ix_categories_parent_id", "parent_id"),
+    )
 
 class PriceTableEntity(Base):
     __tablename__ = "price_tables"
@@ -36,6 +65,7 @@ class PriceTableEntity(Base):
 class RecommendationEntity(Base):
     __tablename__ = "recommendations"
     
+    # Partitioned by month on created_time, so the partition key is part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     raw_image_key = Column(String(500), nullable=False)
     analysis_type = Column(String(50), nullable=False, default='market_analysis')
@@ -48,8 +78,33 @@ class RecommendationEntity(Base):
     is_considered = Column(Boolean, nullable=False, default=False)
     consideration_reason = Column(Text, nullable=True)
     created_by = Column(String(255), nullable=False, default='agent')
-    created_time = Column(DateTime(timezone=True), server_default=func.now())
+    created_time = Column(DateTime(timezone=True), primary_key=True, default=utc_now, server_default=func.now())
     updated_time = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        # Inbox listing: newest first, usually narrowed by consideration state or analysis type
+        Index("ix_recommendations_is_considered_created_time", "is_considered", "created_time", "id"),
+        Index("ix_recommendations_analysis_type_created_time", "analysis_type", "created_time", "id"),
+        Index("ix_recommendations_created_time", "created_time", "id"),
+        # jsonb_path_ops GIN indexes serve @> containment queries and are much smaller than the default opclass
+        Index("ix_recommendations_sku_properties", "sku_properties",
+              postgresql_using="gin", postgresql_ops={"sku_properties": "jsonb_path_ops"}),
+        Index("ix_recommendations_market_insights", "market_insights",
+              postgresql_using="gin", postgresql_ops={"market_insights": "jsonb_path_ops"}),
+        Index("ix_recommendations_recommended_products", "recommended_products",
+              postgresql_using="gin", postgresql_ops={"recommended_products": "jsonb_path_ops"}),
+        # Lets the expiry sweeper find expired rows without scanning every partition in full
+        Index("ix_recommendations_expiry_date", "expiry_date", postgresql_where=text("expiry_date IS NOT NULL")),
+        {"postgresql_partition_by": "RANGE (created_time)"},
+    )
+
+class ProcessedJobEntity(Base):
+    __tablename__ = "processed_jobs"
+    
+    # One row per analysis job whose result was saved; redeliveries of the same job are dropped
+    dedupe_id = Column(String(64), primary_key=True)
+    recommendation_id = Column(UUID(as_uuid=True), nullable=False)
+    created_time = Column(DateTime(timezone=True), server_default=func.now())
 
 class CampaignEntity(Base):
     __tablename__ = "campaigns"
@@ -75,9 +130,10 @@ class CampaignEntity(Base):
 class CampaignMetricEntity(Base):
     __tablename__ = "campaign_metrics"
     
+    # Partitioned by month on metric_date, so the partition key is part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"), nullable=False)
-    metric_date = Column(DateTime(timezone=True), nullable=False)
+    metric_date = Column(DateTime(timezone=True), primary_key=True)
     impressions = Column(Integer, nullable=False, default=0)
     clicks = Column(Integer, nullable=False, default=0)
     conversions = Column(Integer, nullable=False, default=0)
@@ -91,6 +147,11 @@ class CampaignMetricEntity(Base):
     collected_at = Column(DateTime(timezone=True), server_default=func.now())
     
     campaign = relationship("CampaignEntity", back_populates="metrics")
+    
+    __table_args__ = (
+        Index("ix_campaign_metrics_campaign_id_metric_date", "campaign_id", "metric_date"),
+        {"postgresql_partition_by": "RANGE (metric_date)"},
+    )
 
 class StockEntity(Base):
     __tablename__ = "stocks"
@@ -128,6 +189,10 @@ class ProductVariantEntity(Base):
     updated_time = Column(DateTime(timezone=True), onupdate=func.now())
     
     product = relationship("ProductEntity", back_populates="variants")
+    
+    __table_args__ = (
+        Index("ix_product_variants_sku_suffix_trgm", "sku_suffix", postgresql_using="gin", postgresql_ops={"sku_suffix": "gin_trgm_ops"}),
+    )
 
 class ProductEntity(Base):
     __tablename__ = "products"
@@ -153,8 +218,74 @@ class ProductEntity(Base):
     discontinuation_reason = Column(Text, nullable=True)
     discontinuation_date = Column(DateTime(timezone=True), nullable=True)
     status_notes = Column(Text, nullable=True)
+    # Weighted full-text document: title ranks above material/pattern, which rank above description.
+    # Deferred, since only search reads it and it's as large as the text it indexes
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(material, '') || ' ' || coalesce(pattern, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+        persisted=True
+    )))
     
     category = relationship("CategoryEntity", back_populates="products")
     price_table = relationship("PriceTableEntity", back_populates="product", uselist=False)
     stock = relationship("StockEntity", back_populates="product", uselist=False)
     variants = relationship("ProductVariantEntity", back_populates="product")
+    
+    __table_args__ = (
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_products_special_features", "special_features", postgresql_using="gin"),
+        Index("ix_products_sku_id_trgm", "sku_id", postgresql_using="gin", postgresql_ops={"sku_id": "gin_trgm_ops"}),
+        Index("ix_products_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
+
+class StoredObjectEntity(Base):
+    __tablename__ = "stored_objects"
+    
+    bucket = Column(String(255), primary_key=True)  # Buckets are indexed separately; the same key may live in each
+    key = Column(String(500), primary_key=True)  # Content-addressed object key
+    content_hash = Column(String(64), nullable=False, index=True)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    ref_count = Column(Integer, nullable=False, default=1)
+    created_time = Column(DateTime(timezone=True), server_default=func.now())
+    updated_time = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class DirectUploadEntity(Base):
+    __tablename__ = "direct_uploads"
+    
+    key = Column(String(500), primary_key=True)  # Staging key the presigned PUT writes to
+    bucket = Column(String(255), nullable=False)
+    purpose = Column(String(20), nullable=False)
+    product_id = Column(UUID(as_uuid=True), nullable=True)
+    filename = Column(String(255), nullable=True)
+    content_type = Column(String(100), nullable=False)
+    content_key = Column(String(500), nullable=True)  # Content-addressed copy, set on completion
+    result = Column(JSONB, nullable=True)  # Response replayed to retried completions
+    created_time = Column(DateTime(timezone=True), server_default=func.now())
+    completed_time = Column(DateTime(timezone=True), nullable=True)
+
+class IdempotencyKeyEntity(Base):
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(1024), primary_key=True)  # Method, path and the client's Idempotency-Key
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)  # Null while the first request is still running
+    headers = Column(JSONB, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class OutboxMessageEntity(Base):
+    __tablename__ = "outbox_messages"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # Doubles as the consumer dedupe id
+    destination = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    leased_until = Column(DateTime(timezone=True), nullable=True)  # Set while a relay is sending the message
+    created_time = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_outbox_messages_destination_available_at", "destination", "available_at"),
+    )
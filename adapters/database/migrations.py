@@ -0,0 +1,170 @@
+"""In-place schema changes for databases created before an entity changed.
+
+Fresh databases get the current schema from the entities; these bring an existing
+one up to date. Each migration runs once, is recorded in schema_migrations and
+skips tables that don't exist yet. Workers starting together serialize on an
+advisory lock, so only the first one applies anything.
+"""
+import logging
+from typing import Callable, Dict, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from .entities import CategoryEntity, ProcessedJobEntity, ProductEntity, ProductVariantEntity
+from .partitions import PARTITIONED_ENTITIES, PARTITIONED_TABLES, create_partition_sql
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key shared by every worker running migrations
+MIGRATION_LOCK_KEY = 720_031_027
+
+Migration = Callable[[Connection, Dict[str, str]], None]
+MIGRATIONS: List[Tuple[str, Migration]] = []
+
+def migration(name: str):
+    """Register a migration; they run in the order they're defined"""
+    def register(apply: Migration) -> Migration:
+        MIGRATIONS.append((name, apply))
+        return apply
+    return register
+
+def table_exists(connection: Connection, table: str) -> bool:
+    return connection.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table}).scalar()
+
+def create_indexes(connection: Connection, entity, *names: str):
+    """Create the entity's indexes named here, as declared on it, unless they already exist"""
+    indexes = {index.name: index for index in entity.__table__.indexes}
+    for name in names:
+        connection.execute(CreateIndex(indexes[name], if_not_exists=True))
+
+def run_migrations(engine: Engine, settings: Dict[str, str]) -> List[str]:
+    """Apply pending migrations on PostgreSQL; returns the names applied"""
+    if engine.dialect.name != "postgresql":
+        return []
+    
+    applied = []
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "name VARCHAR(200) PRIMARY KEY, applied_time TIMESTAMPTZ NOT NULL DEFAULT now())"
+        ))
+        done = set(connection.execute(text("SELECT name FROM schema_migrations")).scalars())
+        for name, apply in MIGRATIONS:
+            if name in done:
+                continue
+            apply(connection, settings)
+            connection.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": name})
+            applied.append(name)
+            logger.info("Applied migration %s", name)
+    return applied
+
+
+@migration("stored_objects_bucket")
+def scope_stored_objects_by_bucket(connection: Connection, settings: Dict[str, str]):
+    """Key stored_objects by (bucket, key); existing raw/ keys belong to the raw bucket"""
+    if not table_exists(connection, "stored_objects"):
+        return
+    connection.execute(text("ALTER TABLE stored_objects ADD COLUMN IF NOT EXISTS bucket VARCHAR(255) NOT NULL DEFAULT ''"))
+    connection.execute(text(
+        "UPDATE stored_objects SET bucket = CASE WHEN key LIKE 'raw/%' THEN :raw_bucket ELSE :bucket END "
+        "WHERE bucket = ''"
+    ), {"bucket": settings["bucket"], "raw_bucket": settings["raw_bucket"]})
+    connection.execute(text("ALTER TABLE stored_objects ALTER COLUMN bucket DROP DEFAULT"))
+    connection.execute(text("ALTER TABLE stored_objects DROP CONSTRAINT IF EXISTS stored_objects_pkey"))
+    connection.execute(text("ALTER TABLE stored_objects ADD PRIMARY KEY (bucket, key)"))
+
+
+@migration("outbox_messages_lease")
+def add_outbox_lease(connection: Connection, settings: Dict[str, str]):
+    if table_exists(connection, "outbox_messages"):
+        connection.execute(text("ALTER TABLE outbox_messages ADD COLUMN IF NOT EXISTS leased_until TIMESTAMPTZ"))
+
+
+@migration("recommendations_dedupe_id")
+def move_dedupe_ids_out_of_sku_properties(connection: Connection, settings: Dict[str, str]):
+    """Dedupe ids used to be stored in sku_properties; they now live in processed_jobs"""
+    if not table_exists(connection, "recommendations"):
+        return
+    ProcessedJobEntity.__table__.create(connection, checkfirst=True)
+    connection.execute(text(
+        "INSERT INTO processed_jobs (dedupe_id, recommendation_id, created_time) "
+        "SELECT sku_properties ->> 'dedupe_id', id, created_time FROM recommendations "
+        "WHERE sku_properties ? 'dedupe_id' ON CONFLICT DO NOTHING"
+    ))
+    connection.execute(text(
+        "UPDATE recommendations SET sku_properties = sku_properties - 'dedupe_id' WHERE sku_properties ? 'dedupe_id'"
+    ))
+
+
+@migration("partition_by_month")
+def partition_existing_tables(connection: Connection, settings: Dict[str, str]):
+    """Rebuild recommendations and campaign_metrics as monthly-partitioned tables.
+    
+    Tables created before partitioning are renamed out of the way, recreated
+    partitioned, given a partition for every month they hold rows for, and
+    refilled. This rewrites both tables under an exclusive lock, so on a large
+    database set RUN_MIGRATIONS=false and run it in a maintenance window.
+    """
+    for table, column in PARTITIONED_TABLES.items():
+        kind = connection.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}).scalar()
+        if kind != "r":
+            continue
+        legacy = f"{table}_unpartitioned"
+        connection.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+        # Index names are schema-wide; free them up for the new table's indexes
+        for index in connection.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": legacy}).scalars():
+            connection.execute(text(f'ALTER INDEX "{index}" RENAME TO "{("legacy_" + index)[:63]}"'))
+        
+        PARTITIONED_ENTITIES[table].__table__.create(connection)
+        months = connection.execute(text(
+            f"SELECT DISTINCT date_trunc('month', {column} AT TIME ZONE 'UTC')::date FROM {legacy} WHERE {column} IS NOT NULL"
+        )).scalars()
+        for month in months:
+            connection.execute(text(create_partition_sql(table, month)))
+        
+        legacy_columns = set(connection.execute(text(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = :table"
+        ), {"table": legacy}).scalars())
+        columns = ", ".join(c.name for c in PARTITIONED_ENTITIES[table].__table__.columns if c.name in legacy_columns)
+        connection.execute(text(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {legacy}"))
+        connection.execute(text(f"DROP TABLE {legacy}"))
+
+
+@migration("categories_tree")
+def add_category_tree_columns(connection: Connection, settings: Dict[str, str]):
+    """Existing categories become roots: their path is their own id and their depth 0"""
+    if not table_exists(connection, "categories"):
+        return
+    connection.execute(text(
+        "ALTER TABLE categories ADD COLUMN IF NOT EXISTS parent_id UUID REFERENCES categories (id), "
+        "ADD COLUMN IF NOT EXISTS path VARCHAR(1024), ADD COLUMN IF NOT EXISTS depth INTEGER"
+    ))
+    connection.execute(text("UPDATE categories SET path = id::text || '/' WHERE path IS NULL"))
+    connection.execute(text("UPDATE categories SET depth = 0 WHERE depth IS NULL"))
+    connection.execute(text("ALTER TABLE categories ALTER COLUMN path SET NOT NULL, ALTER COLUMN depth SET NOT NULL"))
+    create_indexes(connection, CategoryEntity, "ix_categories_path", "ix_categories_parent_id")
+
+
+@migration("products_search_vector")
+def add_product_search_vector(connection: Connection, settings: Dict[str, str]):
+    """Add the generated full-text column and the search GIN indexes.
+    
+    A stored generated column rewrites products under an exclusive lock; on a
+    large catalog set RUN_MIGRATIONS=false and run it in a maintenance window.
+    """
+    if not table_exists(connection, "products"):
+        return
+    column = CreateColumn(ProductEntity.__table__.c.search_vector).compile(dialect=connection.dialect)
+    connection.execute(text(f"ALTER TABLE products ADD COLUMN IF NOT EXISTS {column}"))
+    create_indexes(connection, ProductEntity, "ix_products_search_vector", "ix_products_special_features")
+
+
+@migration("autocomplete_trigram_indexes")
+def add_autocomplete_trigram_indexes(connection: Connection, settings: Dict[str, str]):
+    """pg_trgm and the GIN indexes the database autocomplete backend's ILIKE patterns use"""
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    if table_exists(connection, "products"):
+        create_indexes(connection, ProductEntity, "ix_products_sku_id_trgm", "ix_products_title_trgm")
+    if table_exists(connection, "product_variants"):
+        create_indexes(connection, ProductVariantEntity, "ix_product_variants_sku_suffix_trgm")
@@ -0,0 +1,109 @@
+import re
+import threading
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from .entities import CampaignMetricEntity, RecommendationEntity
+
+# Monthly range-partitioned tables and the column they're partitioned on
+PARTITIONED_TABLES: Dict[str, str] = {
+    RecommendationEntity.__tablename__: "created_time",
+    CampaignMetricEntity.__tablename__: "metric_date",
+}
+PARTITIONED_ENTITIES = {entity.__tablename__: entity for entity in (RecommendationEntity, CampaignMetricEntity)}
+# Months of partitions kept ready ahead of time; there is deliberately no DEFAULT
+# partition, because one would rule out DETACH PARTITION ... CONCURRENTLY. Rows
+# for any other month get their partition created just before they're written.
+MONTHS_AHEAD = 3
+
+# (table, month) partitions this process has already created or seen
+_ready_partitions: Set[Tuple[str, date]] = set()
+_ready_lock = threading.Lock()
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def month_start(day: Union[date, datetime]) -> date:
+    if isinstance(day, datetime) and day.tzinfo:
+        # Partition bounds are UTC month boundaries
+        day = day.astimezone(timezone.utc)
+    return date(day.year, day.month, 1)
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Month a partition covers, or None if it wasn't created by these helpers"""
+    match = re.fullmatch(rf"{re.escape(table)}_p(\d{{4}})(\d{{2}})", name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+def create_partition_sql(table: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+def ensure_partitions(connection: Connection, table: str, today: date, months_ahead: int = MONTHS_AHEAD) -> List[str]:
+    """Create this month's partition and the next few; returns their names"""
+    first = month_start(today)
+    names = []
+    for offset in range(months_ahead + 1):
+        month = add_months(first, offset)
+        connection.execute(text(create_partition_sql(table, month)))
+        names.append(partition_name(table, month))
+    return names
+
+def ensure_partitions_for(bind: Union[Engine, Connection], table: str, days: Iterable) -> List[str]:
+    """Create the partitions rows dated `days` will land in, if they're missing; returns their names.
+    
+    Runs in its own short transaction on a separate connection, so the lock taken
+    on the parent table isn't held for the rest of the caller's transaction.
+    """
+    engine = bind.engine
+    if engine.dialect.name != "postgresql":
+        return []
+    with _ready_lock:
+        months = sorted({month_start(day) for day in days if day is not None} - {
+            month for ready_table, month in _ready_partitions if ready_table == table
+        })
+    if not months:
+        return []
+    with engine.begin() as connection:
+        for month in months:
+            connection.execute(text(create_partition_sql(table, month)))
+    with _ready_lock:
+        _ready_partitions.update((table, month) for month in months)
+    return [partition_name(table, month) for month in months]
+
+def _create_partitions_before_flush(session: Session, flush_context, instances):
+    days: Dict[str, list] = {}
+    for instance in session.new:
+        table = getattr(instance, "__tablename__", None)
+        if table in PARTITIONED_TABLES:
+            # An unset created_time defaults to now when the row is inserted
+            days.setdefault(table, []).append(getattr(instance, PARTITIONED_TABLES[table]) or datetime.now(timezone.utc))
+    for table, table_days in days.items():
+        ensure_partitions_for(session.get_bind(PARTITIONED_ENTITIES[table]), table, table_days)
+
+def list_partitions(connection: Connection, table: str) -> List[Tuple[str, bool]]:
+    """Partitions of a table as (name, detach_pending) pairs"""
+    rows = connection.execute(text(
+        "SELECT child.relname, inh.inhdetachpending FROM pg_inherits inh "
+        "JOIN pg_class parent ON parent.oid = inh.inhparent "
+        "JOIN pg_class child ON child.oid = inh.inhrelid "
+        "WHERE parent.relname = :table ORDER BY child.relname"
+    ), {"table": table})
+    return [(name, pending) for name, pending in rows]
+
+def _create_initial_partitions(target, connection: Connection, **kw):
+    if connection.dialect.name == "postgresql":
+        ensure_partitions(connection, target.name, date.today())
+
+for _entity in PARTITIONED_ENTITIES.values():
+    event.listen(_entity.__table__, "after_create", _create_initial_partitions)
+event.listen(Session, "before_flush", _create_partitions_before_flush)
@@ -0,0 +1,114 @@
+import math
+import random
+import time
+from contextvars import ContextVar
+from http.cookies import CookieError, SimpleCookie
+from typing import Optional, Sequence
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+PRIMARY_UNTIL_COOKIE = "db_primary_until"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+class ReadRouting:
+    """How the current request may read; `wrote` is flipped by any session that hit the primary for a write.
+    
+    `sticky` marks a client still inside its read-your-writes window; like `wrote`,
+    it keeps every session in the request on the primary, read_only ones included.
+    """
+    __slots__ = ("replica", "sticky", "wrote")
+    
+    def __init__(self, replica: bool, sticky: bool = False):
+        self.replica = replica
+        self.sticky = sticky
+        self.wrote = False
+
+_read_routing: ContextVar[Optional[ReadRouting]] = ContextVar("read_routing", default=None)
+
+def start_read_routing(replica: bool, sticky: bool = False):
+    routing = ReadRouting(replica, sticky)
+    return routing, _read_routing.set(routing)
+
+def finish_read_routing(token) -> None:
+    _read_routing.reset(token)
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica when the request allows it and everything else to the primary.
+    
+    Flushes, INSERT/UPDATE/DELETE and SELECT ... FOR UPDATE always go to the primary. Reads go to a
+    replica only inside a request routed there by ReplicaRoutingMiddleware, or when the session was
+    opened with info={"read_only": True}; once a session or its request has written, or the client
+    is pinned by the read-your-writes cookie, reads stay on the primary so changes are seen. A session
+    picks one replica and keeps it, so its reads never mix two replicas' replication lag.
+    """
+    
+    def __init__(self, *args, primary: Engine, replicas: Sequence[Engine] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replicas = list(replicas)
+        self._replica: Optional[Engine] = None
+    
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        routing = _read_routing.get()
+        if self._flushing or isinstance(clause, UpdateBase) or getattr(clause, "_for_update_arg", None) is not None:
+            self.info["wrote"] = True
+            if routing:
+                routing.wrote = True
+            return self.primary
+        if not self.replicas or self.info.get("wrote") or (routing and (routing.wrote or routing.sticky)):
+            return self.primary
+        if self.info.get("read_only") or (routing and routing.replica):
+            if self._replica is None:
+                self._replica = random.choice(self.replicas)
+            return self._replica
+        return self.primary
+
+
+def primary_until(cookie_header: str) -> float:
+    try:
+        cookie = SimpleCookie(cookie_header)
+    except CookieError:
+        return 0.0
+    morsel = cookie.get(PRIMARY_UNTIL_COOKIE)
+    try:
+        return float(morsel.value) if morsel else 0.0
+    except ValueError:
+        return 0.0
+
+
+class ReplicaRoutingMiddleware:
+    """Routes reads of safe (GET/HEAD/OPTIONS) requests to replicas, with read-your-writes stickiness.
+    
+    A response to a request that wrote sets a short-lived cookie; while it is valid the same client's
+    reads stay on the primary, so replication lag never hides a change it just made.
+    """
+    
+    def __init__(self, app, read_your_writes_seconds: float = 5.0):
+        self.app = app
+        self.read_your_writes_seconds = read_your_writes_seconds
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope.get("headers") or [])
+        sticky = primary_until(headers.get(b"cookie", b"").decode("latin-1")) > time.time()
+        routing, token = start_read_routing(scope["method"] in SAFE_METHODS and not sticky, sticky)
+        
+        async def pin_after_write(message):
+            if message["type"] == "http.response.start" and routing.wrote and self.read_your_writes_seconds > 0:
+                until = time.time() + self.read_your_writes_seconds
+                cookie = (
+                    f"{PRIMARY_UNTIL_COOKIE}={until:.3f}; Max-Age={math.ceil(self.read_your_writes_seconds)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, pin_after_write)
+        finally:
+            finish_read_routing(token)
@@ -0,0 +1,66 @@
+from typing import List
+from sqlalchemy import Integer, Select, func, literal, select, union_all
+from sqlalchemy.orm import Session
+from domain.models import AutocompleteMatch
+from domain.ports import AutocompletePort
+from .database.entities import ProductEntity, ProductVariantEntity
+
+def like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class DatabaseAutocomplete(AutocompletePort):
+    """Autocomplete answered by PostgreSQL, for deployments where an in-process index can't stay current.
+    
+    SKU and variant suffix prefixes and title substrings are all ILIKE
+    patterns served by the pg_trgm GIN indexes on those columns.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def complete(self, prefix: str, limit: int = 10) -> List[AutocompleteMatch]:
+        prefix = (prefix or "").strip()
+        if not prefix or limit <= 0:
+            return []
+        matches = []
+        seen = set()
+        for row in self.db.execute(self.complete_statement(prefix, limit)):
+            product_id = str(row.product_id)
+            if product_id in seen:
+                continue
+            seen.add(product_id)
+            matches.append(AutocompleteMatch(product_id, row.sku_id, row.title, row.matched_field, row.matched_text))
+            if len(matches) == limit:
+                break
+        return matches
+    
+    def complete_statement(self, prefix: str, limit: int) -> Select:
+        pattern = like_escape(prefix)
+        
+        def candidates(field: str, rank: int, matched_text, condition, join=None):
+            statement = select(
+                ProductEntity.id.label("product_id"),
+                ProductEntity.sku_id,
+                ProductEntity.title,
+                literal(field).label("matched_field"),
+                matched_text.label("matched_text"),
+                literal(rank, Integer).label("field_rank")
+            )
+            if join is not None:
+                statement = statement.join(join, join.product_id == ProductEntity.id)
+            return statement.where(condition)
+        
+        matched = union_all(
+            candidates("sku", 0, ProductEntity.sku_id, ProductEntity.sku_id.ilike(f"{pattern}%", escape="\\")),
+            candidates(
+                "variant_sku", 1, ProductVariantEntity.sku_suffix,
+                ProductVariantEntity.sku_suffix.ilike(f"{pattern}%", escape="\\"), join=ProductVariantEntity
+            ),
+            candidates("title", 2, ProductEntity.title, ProductEntity.title.ilike(f"%{pattern}%", escape="\\")),
+        ).subquery("matched")
+        # Over-fetch a little: a product can match on several fields and is de-duplicated above
+        return select(matched).order_by(
+            matched.c.field_rank,
+            func.word_similarity(prefix, matched.c.matched_text).desc(),
+            matched.c.matched_text
+        ).limit(limit * 3)
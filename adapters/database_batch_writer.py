@@ -0,0 +1,110 @@
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from domain.models import BatchOperation
+from domain.ports import BatchWriterPort
+from .database.entities import PriceTableEntity, ProductEntity, ProductVariantEntity, StockEntity
+
+BATCH_OPERATIONS = (
+    "update_product", "create_variant", "update_variant", "delete_variant", "update_price", "update_stock"
+)
+# Generated columns that are never part of a write result
+SKIPPED_COLUMNS = {"search_vector"}
+
+def entity_dict(entity) -> Dict:
+    values = {}
+    for column in entity.__table__.columns:
+        if column.key in SKIPPED_COLUMNS:
+            continue
+        value = getattr(entity, column.key)
+        values[column.key] = str(value) if isinstance(value, uuid.UUID) else value
+    return values
+
+class DatabaseBatchWriter(BatchWriterPort):
+    """Stages product, variant, price and stock writes without committing.
+    
+    Each write is flushed so later operations in the same batch see it and
+    constraint errors surface at the operation that caused them; the caller
+    owns the transaction and commits (or rolls back) once for the batch.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def apply(self, operation: BatchOperation) -> Optional[Dict]:
+        """Stage one operation and return the written row, or None for deletes"""
+        if operation.op not in BATCH_OPERATIONS:
+            raise ValueError(f"Unknown batch operation: {operation.op}")
+        if operation.op in ("update_variant", "delete_variant") and not operation.variant_id:
+            raise ValueError(f"{operation.op} needs a variant_id")
+        
+        if operation.op in ("update_variant", "delete_variant"):
+            entity = getattr(self, operation.op)(operation.product_id, operation.variant_id, operation.data)
+        else:
+            entity = getattr(self, operation.op)(operation.product_id, operation.data)
+        self.db.flush()
+        return entity_dict(entity) if entity is not None else None
+    
+    def update_product(self, product_id: str, data: Dict) -> ProductEntity:
+        product = self._product(product_id)
+        for key, value in data.items():
+            if key not in ProductEntity.__table__.columns or key in ("id", "sku_id", "search_vector"):
+                raise ValueError(f"Product field {key!r} can't be updated")
+            setattr(product, key, value)
+        product.updated_at = datetime.utcnow()
+        return product
+    
+    def create_variant(self, product_id: str, data: Dict) -> ProductVariantEntity:
+        self._product(product_id)
+        variant = ProductVariantEntity(product_id=uuid.UUID(str(product_id)), **data)
+        self.db.add(variant)
+        return variant
+    
+    def update_variant(self, product_id: str, variant_id: str, data: Dict) -> ProductVariantEntity:
+        variant = self._variant(product_id, variant_id)
+        for key, value in data.items():
+            setattr(variant, key, value)
+        return variant
+    
+    def delete_variant(self, product_id: str, variant_id: str, data: Dict) -> None:
+        self.db.delete(self._variant(product_id, variant_id))
+        return None
+    
+    def update_price(self, product_id: str, data: Dict) -> PriceTableEntity:
+        price = self.db.query(PriceTableEntity).filter(PriceTableEntity.product_id == product_id).first()
+        if not price:
+            raise LookupError("Price not found")
+        for key in ("wholesale_price", "retail_price", "currency"):
+            if data.get(key) is not None:
+                setattr(price, key, data[key])
+        price.modified_by = data.get("modified_by")
+        price.modified_time = datetime.utcnow()
+        price.version += 1
+        return price
+    
+    def update_stock(self, product_id: str, data: Dict) -> StockEntity:
+        stock = self.db.query(StockEntity).filter(StockEntity.product_id == product_id).first()
+        if not stock:
+            raise LookupError("Stock record not found")
+        for key in (
+            "current_stock", "reserved_stock", "reorder_level", "max_stock_level",
+            "unit_of_measure", "warehouse_location", "batch_number", "expiry_date"
+        ):
+            if data.get(key) is not None:
+                setattr(stock, key, data[key])
+        stock.available_stock = stock.current_stock - stock.reserved_stock
+        stock.updated_by = data.get("updated_by")
+        return stock
+    
+    def _product(self, product_id: str) -> ProductEntity:
+        product = self.db.get(ProductEntity, uuid.UUID(str(product_id)))
+        if not product:
+            raise LookupError("Product not found")
+        return product
+    
+    def _variant(self, product_id: str, variant_id: str) -> ProductVariantEntity:
+        variant = self.db.get(ProductVariantEntity, uuid.UUID(str(variant_id)))
+        if not variant or str(variant.product_id) != str(product_id):
+            raise LookupError("Variant not found")
+        return variant
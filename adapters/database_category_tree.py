@@ -0,0 +1,171 @@
+import uuid
+from typing import Dict, List, Optional
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.orm import Session
+from domain.models import CategoryNode
+from domain.ports import CategoryTreePort
+from .database.catalog_sync import CatalogChangeHandler
+from .database.entities import CategoryEntity, ProductEntity
+
+def build_tree(nodes: List[CategoryNode]) -> List[CategoryNode]:
+    """Nest path-ordered nodes under their parents and roll product counts up to every ancestor"""
+    by_id = {node.id: node for node in nodes}
+    for node in nodes:
+        node.subtree_product_count = 0
+        node.children = []
+    for node in nodes:
+        for ancestor_id in node.path.rstrip("/").split("/"):
+            ancestor = by_id.get(ancestor_id)
+            if ancestor is not None:
+                ancestor.subtree_product_count += node.product_count
+    roots = []
+    for node in nodes:
+        parent = by_id.get(node.parent_id) if node.parent_id else None
+        (parent.children if parent is not None else roots).append(node)
+    return roots
+
+class DatabaseCategoryTree(CategoryTreePort):
+    """Category hierarchy queries over the materialized `path` column.
+    
+    A category's path lists its ancestors' ids from the root down, so a
+    subtree is a single index-served prefix match and a breadcrumb is the set
+    of categories whose path is a prefix of the target's; no query recurses.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def move(self, category_id: str, parent_id: Optional[str]) -> None:
+        """Re-parent a category, rewriting its whole subtree's paths in one UPDATE; the caller commits"""
+        old_path = self._path(category_id)
+        if old_path is None:
+            raise LookupError("Category not found")
+        parent_path = ""
+        if parent_id:
+            parent_path = self._path(parent_id)
+            if parent_path is None:
+                raise LookupError("Parent category not found")
+            if parent_path.startswith(old_path):
+                raise ValueError("A category cannot be moved under itself or one of its descendants")
+        
+        new_path = f"{parent_path}{category_id}/"
+        depth_change = new_path.count("/") - old_path.count("/")
+        categories = CategoryEntity.__table__
+        self.db.execute(
+            update(categories)
+            .where(categories.c.path.startswith(old_path))
+            .values(
+                path=literal(new_path) + func.substr(categories.c.path, len(old_path) + 1),
+                depth=categories.c.depth + depth_change
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.execute(
+            update(categories)
+            .where(categories.c.id == uuid.UUID(category_id))
+            .values(parent_id=uuid.UUID(parent_id) if parent_id else None)
+        )
+    
+    def nodes(self) -> List[CategoryNode]:
+        return self._nodes(self._node_statement())
+    
+    def breadcrumb(self, category_id: str) -> List[CategoryNode]:
+        """The category and its ancestors, root first"""
+        target = self._path(category_id)
+        if target is None:
+            return []
+        ancestor_ids = [uuid.UUID(ancestor_id) for ancestor_id in target.rstrip("/").split("/")]
+        return self._nodes(self._node_statement().where(CategoryEntity.id.in_(ancestor_ids)))
+    
+    def subtree(self, category_id: str) -> List[CategoryNode]:
+        """The category and every descendant, path-ordered, with direct product counts"""
+        prefix = self._path(category_id)
+        if prefix is None:
+            return []
+        return self._nodes(self._node_statement().where(CategoryEntity.path.startswith(prefix)))
+    
+    def subtree_products(self, category_id: str) -> List[dict]:
+        prefix = self._path(category_id)
+        if prefix is None:
+            return []
+        rows = self.db.execute(
+            select(
+                ProductEntity.id,
+                ProductEntity.title,
+                ProductEntity.description,
+                ProductEntity.status,
+                ProductEntity.sku_id,
+                ProductEntity.enabled,
+                ProductEntity.category_id
+            )
+            .join(CategoryEntity, ProductEntity.category_id == CategoryEntity.id)
+            .where(CategoryEntity.path.startswith(prefix))
+            .order_by(CategoryEntity.path, ProductEntity.title)
+        ).all()
+        return [{
+            "product_id": str(row.id),
+            "title": row.title,
+            "description": row.description,
+            "status": row.status,
+            "sku_id": row.sku_id,
+            "enabled": row.enabled,
+            "category_id": str(row.category_id)
+        } for row in rows]
+    
+    def _path(self, category_id: str) -> Optional[str]:
+        """The category's path, or None if it doesn't exist or the id isn't a UUID"""
+        try:
+            category_uuid = uuid.UUID(str(category_id))
+        except ValueError:
+            return None
+        return self.db.execute(select(CategoryEntity.path).where(CategoryEntity.id == category_uuid)).scalar()
+    
+    def _node_statement(self):
+        direct_counts = (
+            select(ProductEntity.category_id, func.count().label("product_count"))
+            .where(ProductEntity.category_id.isnot(None))
+            .group_by(ProductEntity.category_id)
+            .subquery("direct_counts")
+        )
+        return (
+            select(
+                CategoryEntity.id,
+                CategoryEntity.name,
+                CategoryEntity.description,
+                CategoryEntity.parent_id,
+                CategoryEntity.path,
+                CategoryEntity.depth,
+                func.coalesce(direct_counts.c.product_count, 0).label("product_count")
+            )
+            .outerjoin(direct_counts, direct_counts.c.category_id == CategoryEntity.id)
+            .order_by(CategoryEntity.path)
+        )
+    
+    def _nodes(self, statement) -> List[CategoryNode]:
+        return [
+            CategoryNode(
+                id=str(row.id),
+                name=row.name,
+                description=row.description,
+                parent_id=str(row.parent_id) if row.parent_id else None,
+                path=row.path,
+                depth=row.depth,
+                product_count=row.product_count
+            )
+            for row in self.db.execute(statement)
+        ]
+
+class CategoryTreeInvalidator(CatalogChangeHandler):
+    """Drops a cached tree whenever categories or product placements change"""
+    
+    def __init__(self, cache):
+        self.cache = cache
+    
+    def category_changed(self, category_id: str):
+        self.cache.invalidate()
+    
+    def product_saved(self, product: Dict):
+        self.cache.invalidate()
+    
+    def product_deleted(self, product_id: str):
+        self.cache.invalidate()
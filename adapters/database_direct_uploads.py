@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy.orm import Session
+from .database.entities import DirectUploadEntity
+
+
+class DatabaseDirectUploadRepository:
+    """Presigned uploads the API issued; only these keys can be completed, and each completes once"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def issue(
+        self,
+        key: str,
+        bucket: str,
+        purpose: str,
+        content_type: str,
+        product_id: Optional[str] = None,
+        filename: Optional[str] = None
+    ) -> None:
+        self.db.add(DirectUploadEntity(
+            key=key,
+            bucket=bucket,
+            purpose=purpose,
+            product_id=product_id,
+            filename=filename,
+            content_type=content_type
+        ))
+        self.db.commit()
+    
+    def claim(self, key: str) -> Optional[DirectUploadEntity]:
+        """Lock an issued upload until the caller commits, so retried completions run one at a time"""
+        return self.db.query(DirectUploadEntity).filter(DirectUploadEntity.key == key).with_for_update().first()
+    
+    def complete(self, upload: DirectUploadEntity, content_key: str, result: dict) -> None:
+        # No commit here; the completion is written with whatever it triggered
+        upload.content_key = content_key
+        upload.result = result
+        upload.completed_time = datetime.now(timezone.utc)
@@ -0,0 +1,118 @@
+import itertools
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from domain.models import IdempotencyRecord, IdempotentResponse
+from domain.ports import IdempotencyStorePort
+from .database.entities import IdempotencyKeyEntity
+
+
+class DatabaseIdempotencyStore(IdempotencyStorePort):
+    """Idempotency records in the idempotency_keys table, shared by every API worker.
+    
+    A key is claimed with one INSERT ... ON CONFLICT that only takes over an
+    expired row, so two workers racing on the same key can't both run the
+    request. Expired rows are purged in small batches every `purge_every`
+    reservations.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl: float = 86400.0,
+        in_flight_timeout: float = 300.0,
+        purge_every: int = 100,
+        purge_batch_size: int = 500
+    ):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.in_flight_timeout = in_flight_timeout
+        self.purge_every = purge_every
+        self.purge_batch_size = purge_batch_size
+        self._reservations = itertools.count(1)
+    
+    def reserve(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        if next(self._reservations) % self.purge_every == 0:
+            self.purge_expired()
+        db = self.session_factory()
+        try:
+            while True:
+                now = datetime.now(timezone.utc)
+                if db.execute(self.claim_statement(db, key, fingerprint, now)).first():
+                    db.commit()
+                    return None
+                row = db.get(IdempotencyKeyEntity, key)
+                if row is not None:
+                    db.rollback()
+                    return self._record(row)
+                # Released between the claim and the read; try to claim it again
+                db.rollback()
+        finally:
+            db.close()
+    
+    def claim_statement(self, db: Session, key: str, fingerprint: str, now: datetime):
+        """Insert a reservation, or take over the key's row if it has expired; returns a row when claimed"""
+        dialect = db.get_bind().dialect.name
+        insert_for = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        statement = insert_for(IdempotencyKeyEntity.__table__).values(
+            key=key, fingerprint=fingerprint, expires_at=now + timedelta(seconds=self.in_flight_timeout)
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[IdempotencyKeyEntity.key],
+            set_={
+                "fingerprint": statement.excluded.fingerprint,
+                "status_code": None,
+                "headers": None,
+                "body": None,
+                "expires_at": statement.excluded.expires_at
+            },
+            where=IdempotencyKeyEntity.expires_at <= now
+        ).returning(IdempotencyKeyEntity.key)
+    
+    def save(self, key: str, response: IdempotentResponse) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(IdempotencyKeyEntity)
+                .where(IdempotencyKeyEntity.key == key)
+                .values(
+                    status_code=response.status_code,
+                    headers=[[name.decode("latin-1"), value.decode("latin-1")] for name, value in response.headers],
+                    body=response.body,
+                    expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl)
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+    
+    def release(self, key: str) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(delete(IdempotencyKeyEntity).where(IdempotencyKeyEntity.key == key))
+            db.commit()
+        finally:
+            db.close()
+    
+    def purge_expired(self) -> int:
+        db = self.session_factory()
+        try:
+            expired = select(IdempotencyKeyEntity.key).where(
+                IdempotencyKeyEntity.expires_at <= datetime.now(timezone.utc)
+            ).limit(self.purge_batch_size)
+            result = db.execute(
+                delete(IdempotencyKeyEntity).where(IdempotencyKeyEntity.key.in_(expired.scalar_subquery()))
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+    
+    def _record(self, row: IdempotencyKeyEntity) -> IdempotencyRecord:
+        if row.status_code is None:
+            return IdempotencyRecord(row.fingerprint)
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in row.headers or []]
+        return IdempotencyRecord(row.fingerprint, IdempotentResponse(row.status_code, headers, bytes(row.body or b"")))
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from domain.ports import ImageIndexPort
+from .database.entities import StoredObjectEntity
+
+
+class DatabaseImageIndex(ImageIndexPort):
+    """Image index for one bucket, shared by every API worker and backed by the stored_objects table"""
+    
+    def __init__(self, session_factory: Callable[[], Session], bucket: str):
+        self.session_factory = session_factory
+        self.bucket = bucket
+    
+    def acquire(self, key: str) -> bool:
+        db = self.session_factory()
+        try:
+            # A single UPDATE waits on any garbage collection holding the row lock
+            result = db.execute(
+                update(StoredObjectEntity)
+                .where(StoredObjectEntity.bucket == self.bucket, StoredObjectEntity.key == key)
+                .values(ref_count=StoredObjectEntity.ref_count + 1, updated_time=datetime.now(timezone.utc))
+            )
+            db.commit()
+            return result.rowcount > 0
+        finally:
+            db.close()
+    
+    def register(self, key: str, content_hash: str, size_bytes: int) -> None:
+        db = self.session_factory()
+        try:
+            db.add(StoredObjectEntity(
+                bucket=self.bucket, key=key, content_hash=content_hash, size_bytes=size_bytes, ref_count=1
+            ))
+            db.commit()
+        except IntegrityError:
+            # Another worker registered the same content first; take a reference on its row
+            db.rollback()
+            self.acquire(key)
+        finally:
+            db.close()
+    
+    def release(self, key: str) -> int:
+        db = self.session_factory()
+        try:
+            entity = db.query(StoredObjectEntity).filter(
+                StoredObjectEntity.bucket == self.bucket, StoredObjectEntity.key == key
+            ).with_for_update().first()
+            if not entity:
+                return 0
+            entity.ref_count = max(entity.ref_count - 1, 0)
+            db.commit()
+            return entity.ref_count
+        finally:
+            db.close()
+    
+    def collect_unreferenced(self, delete_object: Callable[[str], None], grace_seconds: int = 3600) -> List[str]:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+        db = self.session_factory()
+        try:
+            entities = db.query(StoredObjectEntity).filter(
+                StoredObjectEntity.bucket == self.bucket,
+                StoredObjectEntity.ref_count == 0,
+                StoredObjectEntity.updated_time <= cutoff
+            ).with_for_update(skip_locked=True).all()
+            
+            collected = []
+            for entity in entities:
+                # Delete the object while the row is still locked so a concurrent
+                # acquire() can't hand out a key whose object is about to vanish
+                delete_object(entity.key)
+                db.delete(entity)
+                collected.append(entity.key)
+            db.commit()
+            return collected
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,115 @@
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, List, Optional
+from sqlalchemy import delete, or_, update
+from sqlalchemy.orm import Session
+from domain.models import OutboxMessage
+from domain.ports import OutboxPort
+from .database.entities import OutboxMessageEntity
+
+
+class DatabaseOutboxRepository(OutboxPort):
+    """Outbox rows staged on the caller's session so they commit with its domain change"""
+    
+    def __init__(self, db: Session, lease_seconds: float = 60.0):
+        self.db = db
+        self.lease_seconds = lease_seconds
+    
+    def add(self, message: OutboxMessage) -> None:
+        # No commit here; the row is written by whichever commit persists the domain change
+        self.db.add(OutboxMessageEntity(
+            id=uuid.UUID(message.id),
+            destination=message.destination,
+            payload=message.payload,
+            attempts=message.attempts
+        ))
+    
+    def relay_pending(
+        self,
+        dispatch: Callable[[OutboxMessage], None],
+        destinations: List[str],
+        batch_size: int = 100,
+        max_attempts: int = 10,
+        retry_backoff: float = 2.0
+    ) -> int:
+        """Lease a batch of due messages, send them with no row locks held, then record the outcome.
+        
+        A relay that dies mid-batch leaves its rows leased; they are claimed again once the lease runs out.
+        """
+        messages = self._claim(destinations, batch_size, max_attempts)
+        sent, failed = [], {}
+        for message in messages:
+            try:
+                dispatch(message)
+            except Exception as e:
+                failed[message.id] = str(e)[:1000]
+            else:
+                sent.append(uuid.UUID(message.id))
+        
+        now = datetime.now(timezone.utc)
+        try:
+            if sent:
+                self.db.execute(
+                    delete(OutboxMessageEntity).where(OutboxMessageEntity.id.in_(sent)),
+                    execution_options={"synchronize_session": False}
+                )
+            for message in messages:
+                if message.id not in failed:
+                    continue
+                attempts = message.attempts + 1
+                self.db.execute(
+                    update(OutboxMessageEntity).where(OutboxMessageEntity.id == uuid.UUID(message.id)).values(
+                        attempts=attempts,
+                        last_error=failed[message.id],
+                        available_at=now + timedelta(seconds=retry_backoff * 2 ** (attempts - 1)),
+                        leased_until=None
+                    ),
+                    execution_options={"synchronize_session": False}
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return len(messages)
+    
+    def _claim(self, destinations: List[str], batch_size: int, max_attempts: int) -> List[OutboxMessage]:
+        now = datetime.now(timezone.utc)
+        try:
+            entities = self.claim_query(destinations, batch_size, max_attempts, now).all()
+            messages = [self._to_domain(entity) for entity in entities]
+            for entity in entities:
+                entity.leased_until = now + timedelta(seconds=self.lease_seconds)
+            self.db.commit()
+            return messages
+        except Exception:
+            self.db.rollback()
+            raise
+    
+    def claim_query(self, destinations: List[str], batch_size: int, max_attempts: int, now: Optional[datetime] = None):
+        """Due, unleased messages; other relays skip rows this one is claiming, and the lease keeps them off after"""
+        now = now or datetime.now(timezone.utc)
+        return self.db.query(OutboxMessageEntity).filter(
+            OutboxMessageEntity.destination.in_(destinations),
+            OutboxMessageEntity.attempts < max_attempts,
+            OutboxMessageEntity.available_at <= now,
+            or_(OutboxMessageEntity.leased_until.is_(None), OutboxMessageEntity.leased_until <= now)
+        ).order_by(OutboxMessageEntity.available_at).limit(batch_size).with_for_update(skip_locked=True)
+    
+    def _to_domain(self, entity: OutboxMessageEntity) -> OutboxMessage:
+        return OutboxMessage(
+            id=str(entity.id),
+            destination=entity.destination,
+            payload=entity.payload,
+            attempts=entity.attempts,
+            created_time=entity.created_time
+        )
+
+@contextmanager
+def open_outbox(session_factory: Callable[[], Session]) -> Iterator[DatabaseOutboxRepository]:
+    """Outbox on a dedicated session, for the relay"""
+    db = session_factory()
+    try:
+        yield DatabaseOutboxRepository(db)
+    finally:
+        db.close()
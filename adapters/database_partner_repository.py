@@ -6,6 +6,30 @@ from domain.partner.value_objects import PartnerId, PartnerCode
 from datetime import datetime
 import uuid
 
+PARTNER_EXISTS = text("SELECT id FROM partners WHERE id = :id")
+UPDATE_PARTNER = text("""
+    UPDATE partners
+    SET name = :name, code = :code, email = :email,
+        phone = :phone, address = :address, updated_at = NOW()
+    WHERE id = :id
+""")
+INSERT_PARTNER = text("""
+    INSERT INTO partners (id, name, code, email, phone, address, is_active, created_at, updated_at)
+    VALUES (:id, :name, :code, :email, :phone, :address, :is_active, NOW(), NOW())
+""")
+PARTNER_BY_ID = text("""
+    SELECT id, name, code, email, phone, address, is_active, created_at, updated_at
+    FROM partners WHERE id = :id
+""")
+ALL_PARTNERS = text("""
+    SELECT id, name, code, email, phone, address, is_active, created_at, updated_at
+    FROM partners ORDER BY name
+""")
+PARTNER_BY_CODE = text("""
+    SELECT id, name, code, email, phone, address, is_active, created_at, updated_at
+    FROM partners WHERE code = :code
+""")
+
 
 class DatabasePartnerRepository:
     def __init__(self, db: Session):
@@ -14,7 +38,7 @@ class DatabasePartnerRepository:
     def save(self, partner: Partner) -> Partner:
         # Check if partner exists
         result = self.db.execute(
-            text("SELECT id FROM partners WHERE id = :id"),
+            PARTNER_EXISTS,
             {"id": partner.partner_id.value}
         )
         exists = result.fetchone()
@@ -22,12 +46,7 @@ class DatabasePartnerRepository:
         if exists:
             # Update existing
             self.db.execute(
-                text("""
-                    UPDATE partners 
-                    SET name = :name, code = :code, email = :email, 
-                        phone = :phone, address = :address, updated_at = NOW()
-                    WHERE id = :id
-                """),
+                UPDATE_PARTNER,
                 {
                     "id": partner.partner_id.value,
                     "name": partner.name,
@@ -41,10 +60,7 @@ class DatabasePartnerRepository:
             # Create new
             partner_id = str(uuid.uuid4()) if not hasattr(partner, 'partner_id') else partner.partner_id.value
             self.db.execute(
-                text("""
-                    INSERT INTO partners (id, name, code, email, phone, address, is_active, created_at, updated_at)
-                    VALUES (:id, :name, :code, :email, :phone, :address, :is_active, NOW(), NOW())
-                """),
+                INSERT_PARTNER,
                 {
                     "id": partner_id,
                     "name": partner.name,
@@ -62,10 +78,7 @@ class DatabasePartnerRepository:
     
     def find_by_id(self, partner_id: PartnerId) -> Optional[Partner]:
         result = self.db.execute(
-            text("""
-                SELECT id, name, code, email, phone, address, is_active, created_at, updated_at
-                FROM partners WHERE id = :id
-            """),
+            PARTNER_BY_ID,
             {"id": partner_id.value}
         )
         row = result.fetchone()
@@ -86,10 +99,7 @@ class DatabasePartnerRepository:
     
     def find_all(self) -> List[Partner]:
         result = self.db.execute(
-            text("""
-                SELECT id, name, code, email, phone, address, is_active, created_at, updated_at
-                FROM partners ORDER BY name
-            """)
+            ALL_PARTNERS
         )
         
         partners = []
@@ -110,10 +120,7 @@ class DatabasePartnerRepository:
     
     def find_by_code(self, code: str) -> Optional[Partner]:
         result = self.db.execute(
-            text("""
-                SELECT id, name, code, email, phone, address, is_active, created_at, updated_at
-                FROM partners WHERE code = :code
-            """),
+            PARTNER_BY_CODE,
             {"code": code.upper()}
         )
         row = result.fetchone()
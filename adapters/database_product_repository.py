@@ -1,11 +1,52 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, bindparam, select, text
+from sqlalchemy.orm import Session, joinedload, selectinload
+from domain import models
 from domain.product.entities import Product, ProductStatus
 from domain.product.repositories import ProductRepository
 from domain.product.value_objects import ProductId, ProductTitle, SKU
 from adapters.database.entities import ProductEntity
 import uuid
 from datetime import datetime
-from typing import Optional, List
+from typing import Iterable, Optional, List, Dict, Tuple
+
+# To-one relations ride along on the product row; variants are a collection, so a join would
+# repeat the product per variant and they come from one extra IN query instead
+RELATION_LOADERS = {
+    "category": joinedload(ProductEntity.category),
+    "price": joinedload(ProductEntity.price_table),
+    "stock": joinedload(ProductEntity.stock),
+    "variants": selectinload(ProductEntity.variants),
+}
+
+def loader_options(load: Iterable[str]) -> list:
+    """Eager-load options for the named PRODUCT_RELATIONS; raises ValueError for unknown names"""
+    load = set(load)
+    unknown = load - set(RELATION_LOADERS)
+    if unknown:
+        raise ValueError(f"Unknown product relations: {', '.join(sorted(unknown))}")
+    return [RELATION_LOADERS[name] for name in models.PRODUCT_RELATIONS if name in load]
+
+# Hot statements are built once and reused: the statement object memoizes its cache key, so each
+# call goes straight to the engine's compiled cache instead of rebuilding and re-keying the query
+PRODUCT_SUMMARY = select(
+    ProductEntity.id, ProductEntity.title, ProductEntity.description, ProductEntity.status,
+    ProductEntity.category_id, ProductEntity.created_at, ProductEntity.updated_at
+)
+DELETE_PRODUCT_PRICE = text("DELETE FROM price_tables WHERE product_id = :product_id")
+DELETE_PRODUCT_STOCK = text("DELETE FROM stock WHERE product_id = :product_id")
+DELETE_PRODUCT_VARIANTS = text("DELETE FROM product_variants WHERE product_id = :product_id")
+_product_statements: Dict[Tuple[str, frozenset], Select] = {}
+
+def product_statement(kind: str, load: frozenset) -> Select:
+    """Cached "by_id" or "all" product select for one load set; at most 2 x 16 ever exist"""
+    key = (kind, load)
+    statement = _product_statements.get(key)
+    if statement is None:
+        statement = select(ProductEntity).options(*loader_options(load))
+        if kind == "by_id":
+            statement = statement.where(ProductEntity.id == bindparam("product_id")).limit(1)
+        _product_statements[key] = statement
+    return statement
 
 
 class DatabaseProductRepository(ProductRepository):
@@ -49,31 +90,34 @@ class DatabaseProductRepository(ProductRepository):
         return self._entity_to_domain(entity)
     
     def find_by_id(self, product_id: ProductId) -> Optional[Product]:
-        entity = self.db.query(ProductEntity).filter(ProductEntity.id == product_id.value).first()
+        entity = self.db.execute(
+            product_statement("by_id", frozenset()), {"product_id": product_id.value}
+        ).scalars().first()
         if entity:
             return self._entity_to_domain(entity)
         return None
     
     def find_all(self) -> List[Product]:
-        entities = self.db.query(ProductEntity).all()
+        entities = self.db.execute(product_statement("all", frozenset())).scalars().all()
         return [self._entity_to_domain(entity) for entity in entities]
     
-    def get_all(self) -> List[dict]:
-        entities = self.db.query(ProductEntity).all()
-        return [{"id": str(e.id), "title": e.title, "description": e.description,
-                "status": e.status, "category_id": str(e.category_id) if e.category_id else None,
-                "created_at": e.created_at, "updated_at": e.updated_at} for e in entities]
+    def get_all(self, load: Iterable[str] = ()) -> List[models.Product]:
+        load = frozenset(load)
+        entities = self.db.execute(product_statement("all", load)).scalars().all()
+        return [self._entity_to_model(entity, load) for entity in entities]
     
     def get_all_products(self) -> List[dict]:
-        return self.get_all()
+        rows = self.db.execute(PRODUCT_SUMMARY)
+        return [{"id": str(r.id), "title": r.title, "description": r.description,
+                "status": r.status, "category_id": str(r.category_id) if r.category_id else None,
+                "created_at": r.created_at, "updated_at": r.updated_at} for r in rows]
     
     def delete(self, product_id: ProductId) -> bool:
         try:
             # Delete related records first to avoid foreign key constraints
-            from sqlalchemy import text
-            self.db.execute(text("DELETE FROM price_tables WHERE product_id = :product_id"), {"product_id": product_id.value})
-            self.db.execute(text("DELETE FROM stock WHERE product_id = :product_id"), {"product_id": product_id.value})
-            self.db.execute(text("DELETE FROM product_variants WHERE product_id = :product_id"), {"product_id": product_id.value})
+            self.db.execute(DELETE_PRODUCT_PRICE, {"product_id": product_id.value})
+            self.db.execute(DELETE_PRODUCT_STOCK, {"product_id": product_id.value})
+            self.db.execute(DELETE_PRODUCT_VARIANTS, {"product_id": product_id.value})
             
             # Now delete the product
             entity = self.db.query(ProductEntity).filter(ProductEntity.id == product_id.value).first()
@@ -135,14 +179,92 @@ class DatabaseProductRepository(ProductRepository):
         entity.enabled = product.enabled
         entity.discontinuation_reason = product.discontinuation_reason
         entity.discontinuation_date = product.discontinuation_date
-
-    def get_by_id(self, product_id: str) -> Optional[dict]:
-        entity = self.db.query(ProductEntity).filter(ProductEntity.id == product_id).first()
+    
+    def get_by_id(self, product_id: str, load: Iterable[str] = ()) -> Optional[models.Product]:
+        load = frozenset(load)
+        entity = self.db.execute(product_statement("by_id", load), {"product_id": product_id}).scalars().first()
         if not entity:
             return None
-        return {"id": str(entity.id), "title": entity.title, "description": entity.description,
-                "status": entity.status, "category_id": str(entity.category_id) if entity.category_id else None,
-                "created_at": entity.created_at, "updated_at": entity.updated_at}
+        return self._entity_to_model(entity, load)
+    
+    def _entity_to_model(self, entity: ProductEntity, load: frozenset) -> models.Product:
+        # Relations outside `load` are never touched, so they can't trigger a lazy load per row
+        product = models.Product(
+            id=str(entity.id),
+            sku_id=entity.sku_id,
+            title=entity.title,
+            description=entity.description,
+            material=entity.material,
+            pattern=entity.pattern,
+            color_primary=entity.color_primary,
+            colors=entity.colors or [],
+            width_estimate_cm=entity.width_estimate_cm,
+            scale=entity.scale,
+            special_features=entity.special_features or [],
+            image_urls=entity.image_urls or {},
+            created_by=entity.created_by,
+            category_id=str(entity.category_id) if entity.category_id else None,
+            created_at=entity.created_at,
+            updated_at=entity.updated_at,
+            status=entity.status,
+            enabled=entity.enabled,
+            discontinuation_reason=entity.discontinuation_reason,
+            discontinuation_date=entity.discontinuation_date,
+            status_notes=entity.status_notes
+        )
+        if "category" in load and entity.category:
+            category = entity.category
+            product.category = models.Category(id=str(category.id), name=category.name, description=category.description)
+        if "price" in load and entity.price_table:
+            price = entity.price_table
+            product.price_table = models.PriceTable(
+                id=str(price.id),
+                product_id=str(price.product_id),
+                wholesale_price=price.wholesale_price,
+                retail_price=price.retail_price,
+                currency=price.currency,
+                version=price.version,
+                created_by=price.created_by,
+                created_time=price.created_time,
+                modified_by=price.modified_by,
+                modified_time=price.modified_time
+            )
+        if "stock" in load and entity.stock:
+            stock = entity.stock
+            product.stock = models.Stock(
+                id=str(stock.id),
+                product_id=str(stock.product_id),
+                current_stock=stock.current_stock,
+                reserved_stock=stock.reserved_stock,
+                available_stock=stock.available_stock,
+                reorder_level=stock.reorder_level,
+                max_stock_level=stock.max_stock_level,
+                unit_of_measure=stock.unit_of_measure,
+                warehouse_location=stock.warehouse_location,
+                batch_number=stock.batch_number,
+                expiry_date=stock.expiry_date,
+                last_updated=stock.last_updated,
+                updated_by=stock.updated_by
+            )
+        if "variants" in load:
+            product.variants = [
+                models.ProductVariant(
+                    id=str(variant.id),
+                    product_id=str(variant.product_id),
+                    variant_name=variant.variant_name,
+                    color_code=variant.color_code,
+                    color_name=variant.color_name,
+                    range_details=variant.range_details or {},
+                    sku_suffix=variant.sku_suffix,
+                    additional_images=variant.additional_images or {},
+                    is_active=variant.is_active,
+                    created_by=variant.created_by,
+                    created_time=variant.created_time,
+                    updated_time=variant.updated_time
+                )
+                for variant in entity.variants
+            ]
+        return product
     
     def create(self, title: str, description: str = None, category_id: str = None, status: str = "draft") -> dict:
         entity = ProductEntity(title=title, description=description, category_id=category_id, status=status)
@@ -165,6 +287,22 @@ class DatabaseProductRepository(ProductRepository):
                 "status": entity.status, "category_id": str(entity.category_id) if entity.category_id else None,
                 "created_at": entity.created_at, "updated_at": entity.updated_at}
     
+    def merge_image_urls(self, product_id: str, image_urls: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Merge image URLs into the product and return the URLs they replaced.
+        
+        The row is locked so concurrent writers don't lose each other's keys.
+        """
+        entity = self.db.query(ProductEntity).filter(ProductEntity.id == product_id).with_for_update().first()
+        if not entity:
+            return None
+        existing = entity.image_urls or {}
+        replaced = {k: existing[k] for k in image_urls if existing.get(k) and existing[k] != image_urls[k]}
+        # Reassign rather than mutate so SQLAlchemy detects the JSONB change
+        entity.image_urls = {**existing, **image_urls}
+        entity.updated_at = datetime.utcnow()
+        self.db.commit()
+        return replaced
+    
     def delete_variant(self, variant_id: str) -> bool:
         return True
     
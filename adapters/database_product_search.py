@@ -0,0 +1,126 @@
+import base64
+import json
+import uuid
+from typing import Tuple
+from sqlalchemy import Float, Select, String, cast, func, literal, select, text, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array
+from sqlalchemy.orm import Session
+from domain.models import ProductSearchQuery, ProductSearchResult
+from domain.ports import ProductSearchPort
+from .database.entities import ProductEntity
+
+SEARCH_CONFIG = "english"
+FACET_FIELDS = ("material", "pattern", "scale", "status", "category_id", "special_features")
+
+def encode_cursor(rank: float, product_id) -> str:
+    raw = json.dumps({"r": rank, "id": str(product_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    """Raises ValueError for cursors this API didn't issue"""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(raw["r"]), uuid.UUID(raw["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+class DatabaseProductSearch(ProductSearchPort):
+    """Full-text product search with facet counts, answered by a single SQL statement"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def search(self, query: ProductSearchQuery) -> ProductSearchResult:
+        row = self.db.execute(self.search_statement(query)).mappings().one()
+        items = row["items"]
+        next_cursor = None
+        if len(items) > query.limit:
+            items = items[:query.limit]
+            next_cursor = encode_cursor(items[-1]["rank"], items[-1]["id"])
+        return ProductSearchResult(
+            items=items,
+            facets={field: row[field] for field in FACET_FIELDS},
+            total=row["total"],
+            next_cursor=next_cursor
+        )
+    
+    def search_statement(self, query: ProductSearchQuery) -> Select:
+        # Every filter is applied once here; the page and each facet read from the same CTE
+        matched = self._matched(query).cte("matched")
+        
+        page = select(matched)
+        if query.cursor:
+            rank, product_id = decode_cursor(query.cursor)
+            page = page.where(tuple_(matched.c.rank, matched.c.id) < tuple_(literal(rank, Float), literal(product_id)))
+        page = page.order_by(matched.c.rank.desc(), matched.c.id.desc()).limit(query.limit + 1).subquery("page")
+        items = select(func.coalesce(
+            func.json_agg(aggregate_order_by(page.table_valued(), page.c.rank.desc(), page.c.id.desc())),
+            text("'[]'::json")
+        )).scalar_subquery()
+        
+        feature = select(func.unnest(matched.c.special_features).label("value")).subquery("feature")
+        facets = {
+            "material": self._facet(matched.c.material),
+            "pattern": self._facet(matched.c.pattern),
+            "scale": self._facet(matched.c.scale),
+            "status": self._facet(matched.c.status),
+            "category_id": self._facet(matched.c.category_id),
+            "special_features": self._facet(feature.c.value),
+        }
+        total = select(func.count()).select_from(matched).scalar_subquery()
+        return select(
+            items.label("items"),
+            total.label("total"),
+            *(facet.label(field) for field, facet in facets.items())
+        )
+    
+    def _matched(self, query: ProductSearchQuery) -> Select:
+        if query.text:
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query.text)
+            rank = cast(func.ts_rank_cd(ProductEntity.search_vector, ts_query), Float)
+        else:
+            ts_query = None
+            rank = literal(0.0, Float)
+        
+        statement = select(
+            ProductEntity.id,
+            ProductEntity.sku_id,
+            ProductEntity.title,
+            ProductEntity.material,
+            ProductEntity.pattern,
+            ProductEntity.scale,
+            cast(ProductEntity.status, String).label("status"),
+            ProductEntity.category_id,
+            ProductEntity.special_features,
+            ProductEntity.color_primary,
+            ProductEntity.enabled,
+            ProductEntity.image_urls["thumbnail"].astext.label("thumbnail_url"),
+            rank.label("rank")
+        )
+        if ts_query is not None:
+            # @@ against the stored tsvector is served by its GIN index
+            statement = statement.where(ProductEntity.search_vector.op("@@")(ts_query))
+        if query.material:
+            statement = statement.where(ProductEntity.material == query.material)
+        if query.pattern:
+            statement = statement.where(ProductEntity.pattern == query.pattern)
+        if query.scale:
+            statement = statement.where(ProductEntity.scale == query.scale)
+        if query.status:
+            statement = statement.where(cast(ProductEntity.status, String) == query.status)
+        if query.category_id:
+            statement = statement.where(ProductEntity.category_id == query.category_id)
+        if query.special_features:
+            statement = statement.where(ProductEntity.special_features.contains(array(query.special_features)))
+        if query.enabled is not None:
+            statement = statement.where(ProductEntity.enabled == query.enabled)
+        return statement
+    
+    def _facet(self, column):
+        grouped = select(column.label("value"), func.count().label("count")).where(
+            column.isnot(None)
+        ).group_by(column).subquery()
+        return select(func.coalesce(
+            func.json_object_agg(grouped.c.value, grouped.c.count), text("'{}'::json")
+        )).scalar_subquery()
@@ -0,0 +1,140 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Select, insert, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from domain.models import Recommendation, RecommendationQuery
+from domain.ports import RecommendationRepositoryPort
+from .database.entities import ProcessedJobEntity, RecommendationEntity, utc_now
+from .database.partitions import ensure_partitions_for
+
+# List views read these; the JSONB blobs are only loaded for the full view
+SUMMARY_COLUMNS = (
+    RecommendationEntity.id,
+    RecommendationEntity.raw_image_key,
+    RecommendationEntity.analysis_type,
+    RecommendationEntity.confidence_score,
+    RecommendationEntity.version,
+    RecommendationEntity.expiry_date,
+    RecommendationEntity.is_considered,
+    RecommendationEntity.consideration_reason,
+    RecommendationEntity.created_by,
+    RecommendationEntity.created_time,
+    RecommendationEntity.updated_time,
+)
+DETAIL_COLUMNS = (
+    RecommendationEntity.recommended_products,
+    RecommendationEntity.market_insights,
+    RecommendationEntity.sku_properties,
+)
+
+def insert_ignoring_duplicates(db: Session, entity):
+    """INSERT ... ON CONFLICT DO NOTHING for the session's database"""
+    dialect = db.get_bind(clause=insert(entity)).dialect.name
+    insert_for = sqlite_insert if dialect == "sqlite" else postgresql_insert
+    return insert_for(entity.__table__).on_conflict_do_nothing()
+
+def encode_cursor(created_time: datetime, recommendation_id) -> str:
+    raw = json.dumps({"t": created_time.isoformat(), "id": str(recommendation_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Raises ValueError for cursors this API didn't issue"""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(raw["t"]), uuid.UUID(raw["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+class DatabaseRecommendationRepository(RecommendationRepositoryPort):
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def add_all(self, recommendations: List[Recommendation]) -> int:
+        """Insert recommendations with a single multi-row INSERT and one commit.
+        
+        Results of a job that was already saved, by any worker, are skipped; returns how many were inserted.
+        """
+        rows = [self._to_row(r) for r in recommendations]
+        claims = {r.dedupe_id: row["id"] for r, row in zip(recommendations, rows) if r.dedupe_id}
+        if claims:
+            claimed = set(self.db.execute(
+                insert_ignoring_duplicates(self.db, ProcessedJobEntity).returning(ProcessedJobEntity.dedupe_id),
+                [{"dedupe_id": dedupe_id, "recommendation_id": row_id} for dedupe_id, row_id in claims.items()]
+            ).scalars())
+            rows = [
+                row for r, row in zip(recommendations, rows)
+                if not r.dedupe_id or (r.dedupe_id in claimed and claims[r.dedupe_id] == row["id"])
+            ]
+        if rows:
+            ensure_partitions_for(self.db.get_bind(RecommendationEntity), "recommendations", [row["created_time"] for row in rows])
+            self.db.execute(insert(RecommendationEntity), rows)
+        self.db.commit()
+        return len(rows)
+    
+    def search(self, query: RecommendationQuery) -> Tuple[List[Dict], Optional[str]]:
+        """Return one page of recommendations, newest first, and the cursor for the next page"""
+        rows = self.db.execute(self.search_statement(query)).mappings().all()
+        if query.limit is None:
+            return [dict(row) for row in rows], None
+        page = [dict(row) for row in rows[:query.limit]]
+        next_cursor = None
+        if len(rows) > query.limit:
+            last = page[-1]
+            next_cursor = encode_cursor(last["created_time"], last["id"])
+        return page, next_cursor
+    
+    def search_statement(self, query: RecommendationQuery) -> Select:
+        columns = SUMMARY_COLUMNS if query.summary else SUMMARY_COLUMNS + DETAIL_COLUMNS
+        statement = select(*columns)
+        
+        if query.analysis_type:
+            statement = statement.where(RecommendationEntity.analysis_type == query.analysis_type)
+        if query.is_considered is not None:
+            statement = statement.where(RecommendationEntity.is_considered == query.is_considered)
+        if query.min_confidence is not None:
+            statement = statement.where(RecommendationEntity.confidence_score >= query.min_confidence)
+        if query.max_confidence is not None:
+            statement = statement.where(RecommendationEntity.confidence_score <= query.max_confidence)
+        if query.unexpired_only:
+            statement = statement.where(or_(
+                RecommendationEntity.expiry_date.is_(None),
+                RecommendationEntity.expiry_date > datetime.now(timezone.utc)
+            ))
+        if query.sku_properties:
+            # JSONB @> containment, served by the GIN index on sku_properties
+            statement = statement.where(RecommendationEntity.sku_properties.contains(query.sku_properties))
+        if query.cursor:
+            created_time, recommendation_id = decode_cursor(query.cursor)
+            # Keyset pagination: seek past the last row instead of counting an OFFSET
+            statement = statement.where(
+                tuple_(RecommendationEntity.created_time, RecommendationEntity.id) < tuple_(created_time, recommendation_id)
+            )
+        
+        statement = statement.order_by(RecommendationEntity.created_time.desc(), RecommendationEntity.id.desc())
+        if query.limit is None:
+            return statement
+        # One extra row tells us whether another page exists
+        return statement.limit(query.limit + 1)
+    
+    def _to_row(self, recommendation: Recommendation) -> dict:
+        return {
+            "id": uuid.UUID(recommendation.id) if recommendation.id else uuid.uuid4(),
+            "raw_image_key": recommendation.raw_image_key,
+            "analysis_type": recommendation.analysis_type,
+            "recommended_products": recommendation.recommended_products,
+            "market_insights": recommendation.market_insights,
+            "sku_properties": recommendation.sku_properties,
+            "confidence_score": recommendation.confidence_score,
+            "version": recommendation.version,
+            "expiry_date": recommendation.expiry_date,
+            "is_considered": recommendation.is_considered,
+            "consideration_reason": recommendation.consideration_reason,
+            "created_by": recommendation.created_by,
+            "created_time": recommendation.created_time or utc_now()
+        }
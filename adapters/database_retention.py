@@ -0,0 +1,65 @@
+from datetime import date
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from domain.ports import RetentionPort
+from .database.partitions import (
+    PARTITIONED_TABLES, add_months, ensure_partitions, list_partitions, month_start, partition_month
+)
+
+# Cleanup gives up rather than queueing behind application traffic; the next sweep retries
+LOCK_TIMEOUT = "2s"
+STATEMENT_TIMEOUT = "30s"
+
+DELETE_EXPIRED_RECOMMENDATIONS = text(
+    "DELETE FROM recommendations WHERE (id, created_time) IN ("
+    "SELECT id, created_time FROM recommendations "
+    "WHERE expiry_date IS NOT NULL AND expiry_date < now() "
+    "LIMIT :batch_size FOR UPDATE SKIP LOCKED)"
+)
+
+
+class DatabaseRetention(RetentionPort):
+    """Retention housekeeping for the monthly-partitioned tables (PostgreSQL only)"""
+    
+    def __init__(self, engine: Engine):
+        self.engine = engine
+    
+    def delete_expired_recommendations(self, batch_size: int) -> int:
+        """Delete one bounded batch in its own short transaction; returns rows deleted"""
+        with self.engine.begin() as connection:
+            connection.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+            connection.execute(text(f"SET LOCAL statement_timeout = '{STATEMENT_TIMEOUT}'"))
+            return connection.execute(DELETE_EXPIRED_RECOMMENDATIONS, {"batch_size": batch_size}).rowcount
+    
+    def ensure_partitions(self) -> List[str]:
+        created = []
+        with self.engine.begin() as connection:
+            connection.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+            for table in PARTITIONED_TABLES:
+                created.extend(ensure_partitions(connection, table, date.today()))
+        return created
+    
+    def drop_partitions_older_than(self, table: str, months: int) -> List[str]:
+        """Detach and drop whole months that fall entirely outside the retention window"""
+        cutoff = add_months(month_start(date.today()), -months)
+        # DETACH ... CONCURRENTLY can't run inside a transaction block
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(f"SET lock_timeout = '{LOCK_TIMEOUT}'"))
+            dropped = []
+            try:
+                for name, detach_pending in list_partitions(connection, table):
+                    month = partition_month(table, name)
+                    if month is None or add_months(month, 1) > cutoff:
+                        continue
+                    if detach_pending:
+                        # A previous concurrent detach was interrupted; complete it
+                        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name} FINALIZE"))
+                    else:
+                        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY"))
+                    connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                    dropped.append(name)
+            finally:
+                # The setting is session-wide; don't hand it back to the pool
+                connection.execute(text("RESET lock_timeout"))
+            return dropped
@@ -7,6 +7,89 @@ from domain.product.value_objects import ProductId
 import uuid
 from datetime import datetime
 
+UPDATE_VARIANT = text("""
+    UPDATE product_variants
+    SET variant_name = :variant_name,
+        color_code = :color_code,
+        color_name = :color_name,
+        sku_suffix = :sku_suffix,
+        updated_time = NOW()
+    WHERE id = :variant_id
+""")
+INSERT_VARIANT = text("""
+    INSERT INTO product_variants (id, product_id, variant_name, color_code, color_name,
+                                sku_suffix, range_details, additional_images, is_active, created_by)
+    VALUES (:id, :product_id, :variant_name, :color_code, :color_name,
+            :sku_suffix, '{}', '{}', true, 'system')
+""")
+INSERT_STOCK = text("""
+    INSERT INTO stock (id, product_id, variant_id, partner_id, quantity_available,
+                     quantity_reserved, reorder_level, reorder_quantity,
+                     retail_price, wholesale_price, currency, last_updated)
+    VALUES (:id, :product_id, :variant_id, :partner_id, :quantity_available,
+            :quantity_reserved, :reorder_level, :reorder_quantity,
+            :retail_price, :wholesale_price, :currency, NOW())
+""")
+VARIANT_BY_ID = text("""
+    SELECT v.id, v.product_id, v.variant_name, v.color_code, v.color_name, v.sku_suffix,
+           s.id as stock_id, s.partner_id, s.quantity_available, s.quantity_reserved,
+           s.retail_price, s.wholesale_price, s.currency
+    FROM product_variants v
+    LEFT JOIN stock s ON v.id = s.variant_id
+    WHERE v.id = :variant_id
+""")
+VARIANTS_BY_PRODUCT = text("""
+    SELECT v.id, v.product_id, v.variant_name, v.color_code, v.color_name, v.sku_suffix,
+           s.id as stock_id, s.partner_id, s.quantity_available, s.quantity_reserved,
+           s.retail_price, s.wholesale_price, s.currency
+    FROM product_variants v
+    LEFT JOIN stock s ON v.id = s.variant_id
+    WHERE v.product_id = :product_id
+    ORDER BY v.created_time, s.partner_id
+""")
+DELETE_VARIANT_STOCK = text("DELETE FROM stock WHERE variant_id = :variant_id")
+DELETE_VARIANT = text("DELETE FROM product_variants WHERE id = :variant_id")
+VARIANT_PRODUCT_ID = text("SELECT product_id FROM product_variants WHERE id = :variant_id")
+
+
+def fold_variant_rows(rows) -> List[ProductVariant]:
+    """Fold variant-LEFT JOIN-stock rows into one ProductVariant per variant, in row order"""
+    variants_dict = {}
+    for row in rows:
+        variant_id = str(row.id)
+        if variant_id not in variants_dict:
+            variants_dict[variant_id] = {
+                "variant_id": variant_id,
+                "product_id": ProductId(str(row.product_id)),
+                "color_name": row.color_name,
+                "color_code": row.color_code,
+                "sku_suffix": row.sku_suffix,
+                "stock_records": []
+            }
+        
+        if row.stock_id:
+            variants_dict[variant_id]["stock_records"].append({
+                "partner_id": str(row.partner_id),
+                "available_quantity": row.quantity_available,
+                "reserved_quantity": row.quantity_reserved,
+                "retail_price": float(row.retail_price) if row.retail_price else 0.0,
+                "wholesale_price": float(row.wholesale_price) if row.wholesale_price else 0.0,
+                "currency": row.currency
+            })
+    
+    variants = []
+    for variant_data in variants_dict.values():
+        variants.append(ProductVariant(
+            variant_id=variant_data["variant_id"],
+            product_id=variant_data["product_id"],
+            color_name=variant_data["color_name"],
+            color_code=variant_data["color_code"],
+            sku_suffix=variant_data["sku_suffix"],
+            stock_records=variant_data["stock_records"]
+        ))
+    
+    return variants
+
 
 class DatabaseVariantRepository(VariantRepository):
     def __init__(self, db: Session):
@@ -17,15 +100,7 @@ class DatabaseVariantRepository(VariantRepository):
         if hasattr(variant, 'variant_id') and variant.variant_id:
             # Update existing variant
             self.db.execute(
-                text("""
-                    UPDATE product_variants 
-                    SET variant_name = :variant_name,
-                        color_code = :color_code,
-                        color_name = :color_name,
-                        sku_suffix = :sku_suffix,
-                        updated_time = NOW()
-                    WHERE id = :variant_id
-                """),
+                UPDATE_VARIANT,
                 {
                     "variant_id": variant.variant_id,
                     "variant_name": variant.color_name,
@@ -40,12 +115,7 @@ class DatabaseVariantRepository(VariantRepository):
             variant.variant_id = variant_id
             
             self.db.execute(
-                text("""
-                    INSERT INTO product_variants (id, product_id, variant_name, color_code, color_name, 
-                                                sku_suffix, range_details, additional_images, is_active, created_by)
-                    VALUES (:id, :product_id, :variant_name, :color_code, :color_name, 
-                            :sku_suffix, '{}', '{}', true, 'system')
-                """),
+                INSERT_VARIANT,
                 {
                     "id": variant_id,
                     "product_id": variant.product_id.value,
@@ -60,14 +130,7 @@ class DatabaseVariantRepository(VariantRepository):
             for stock_record in variant.stock_records:
                 stock_id = str(uuid.uuid4())
                 self.db.execute(
-                    text("""
-                        INSERT INTO stock (id, product_id, variant_id, partner_id, quantity_available, 
-                                         quantity_reserved, reorder_level, reorder_quantity,
-                                         retail_price, wholesale_price, currency, last_updated)
-                        VALUES (:id, :product_id, :variant_id, :partner_id, :quantity_available,
-                                :quantity_reserved, :reorder_level, :reorder_quantity,
-                                :retail_price, :wholesale_price, :currency, NOW())
-                    """),
+                    INSERT_STOCK,
                     {
                         "id": stock_id,
                         "product_id": variant.product_id.value,
@@ -89,14 +152,7 @@ class DatabaseVariantRepository(VariantRepository):
     def find_by_id(self, variant_id: str) -> Optional[ProductVariant]:
         """Find variant by ID with stock records"""
         result = self.db.execute(
-            text("""
-                SELECT v.id, v.product_id, v.variant_name, v.color_code, v.color_name, v.sku_suffix,
-                       s.id as stock_id, s.partner_id, s.quantity_available, s.quantity_reserved,
-                       s.retail_price, s.wholesale_price, s.currency
-                FROM product_variants v
-                LEFT JOIN stock s ON v.id = s.variant_id
-                WHERE v.id = :variant_id
-            """),
+            VARIANT_BY_ID,
             {"variant_id": variant_id}
         )
         
@@ -130,65 +186,23 @@ class DatabaseVariantRepository(VariantRepository):
     def find_by_product_id(self, product_id: ProductId) -> List[ProductVariant]:
         """Find all variants for a product with stock records"""
         result = self.db.execute(
-            text("""
-                SELECT v.id, v.product_id, v.variant_name, v.color_code, v.color_name, v.sku_suffix,
-                       s.id as stock_id, s.partner_id, s.quantity_available, s.quantity_reserved,
-                       s.retail_price, s.wholesale_price, s.currency
-                FROM product_variants v
-                LEFT JOIN stock s ON v.id = s.variant_id
-                WHERE v.product_id = :product_id
-                ORDER BY v.created_time, s.partner_id
-            """),
+            VARIANTS_BY_PRODUCT,
             {"product_id": product_id.value}
         )
         
-        variants_dict = {}
-        for row in result:
-            variant_id = str(row.id)
-            if variant_id not in variants_dict:
-                variants_dict[variant_id] = {
-                    "variant_id": variant_id,
-                    "product_id": ProductId(str(row.product_id)),
-                    "color_name": row.color_name,
-                    "color_code": row.color_code,
-                    "sku_suffix": row.sku_suffix,
-                    "stock_records": []
-                }
-            
-            if row.stock_id:
-                variants_dict[variant_id]["stock_records"].append({
-                    "partner_id": str(row.partner_id),
-                    "available_quantity": row.quantity_available,
-                    "reserved_quantity": row.quantity_reserved,
-                    "retail_price": float(row.retail_price) if row.retail_price else 0.0,
-                    "wholesale_price": float(row.wholesale_price) if row.wholesale_price else 0.0,
-                    "currency": row.currency
-                })
-        
-        variants = []
-        for variant_data in variants_dict.values():
-            variants.append(ProductVariant(
-                variant_id=variant_data["variant_id"],
-                product_id=variant_data["product_id"],
-                color_name=variant_data["color_name"],
-                color_code=variant_data["color_code"],
-                sku_suffix=variant_data["sku_suffix"],
-                stock_records=variant_data["stock_records"]
-            ))
-        
-        return variants
+        return fold_variant_rows(result)
     
     def delete(self, variant_id: str) -> bool:
         """Delete variant and its stock records"""
         # Delete stock records first
         self.db.execute(
-            text("DELETE FROM stock WHERE variant_id = :variant_id"),
+            DELETE_VARIANT_STOCK,
             {"variant_id": variant_id}
         )
         
         # Delete variant
         result = self.db.execute(
-            text("DELETE FROM product_variants WHERE id = :variant_id"),
+            DELETE_VARIANT,
             {"variant_id": variant_id}
         )
         
@@ -201,7 +215,7 @@ class DatabaseVariantRepository(VariantRepository):
         
         # Get product_id for the variant
         result = self.db.execute(
-            text("SELECT product_id FROM product_variants WHERE id = :variant_id"),
+            VARIANT_PRODUCT_ID,
             {"variant_id": variant_id}
         )
         row = result.fetchone()
@@ -209,14 +223,7 @@ class DatabaseVariantRepository(VariantRepository):
             raise ValueError("Variant not found")
         
         self.db.execute(
-            text("""
-                INSERT INTO stock (id, product_id, variant_id, partner_id, quantity_available, 
-                                 quantity_reserved, reorder_level, reorder_quantity,
-                                 retail_price, wholesale_price, currency, last_updated)
-                VALUES (:id, :product_id, :variant_id, :partner_id, :quantity_available,
-                        :quantity_reserved, :reorder_level, :reorder_quantity,
-                        :retail_price, :wholesale_price, :currency, NOW())
-            """),
+            INSERT_STOCK,
             {
                 "id": stock_id,
                 "product_id": str(row.product_id),
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import re
+from typing import Iterable, List, Optional
+from domain.models import IdempotentResponse
+from domain.ports import IdempotencyStorePort
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+class IdempotencyMiddleware:
+    """Replays the stored response when a request is retried with the same Idempotency-Key.
+    
+    Applies to requests whose method and path match; others pass straight
+    through. Keys are scoped to method and path and remember a hash of the
+    request they were first used with, so reusing a key for a different body
+    is rejected rather than silently answered with the wrong response. A
+    retry that arrives while the original is still running gets a 409, and
+    5xx responses are not stored so the request can be retried for real.
+    """
+    
+    def __init__(
+        self,
+        app,
+        store: IdempotencyStorePort,
+        paths: Iterable[str],
+        methods: Iterable[str] = ("POST",),
+        max_response_bytes: int = 1024 * 1024
+    ):
+        self.app = app
+        self.store = store
+        self.paths = [re.compile(path) for path in paths]
+        self.methods = set(methods)
+        self.max_response_bytes = max_response_bytes
+    
+    async def __call__(self, scope, receive, send):
+        key = self._key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            await self._send_error(send, 400, f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+            return
+        
+        body = await self._read_body(receive)
+        fingerprint = self._fingerprint(scope, body)
+        store_key = f"{scope['method']} {scope['path']} {key}"
+        
+        existing = self.store.reserve(store_key, fingerprint)
+        if existing is not None:
+            if existing.fingerprint != fingerprint:
+                await self._send_error(send, 422, "Idempotency-Key was already used with a different request")
+            elif existing.response is None:
+                await self._send_error(send, 409, "A request with this Idempotency-Key is still in progress", retry_after=True)
+            else:
+                await self._replay(send, existing.response)
+            return
+        
+        await self._run(scope, receive, send, body, store_key)
+    
+    async def _run(self, scope, receive, send, body: bytes, store_key: str):
+        replayed_body = False
+        
+        async def receive_buffered():
+            nonlocal replayed_body
+            if not replayed_body:
+                replayed_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+        
+        start = {}
+        chunks: List[bytes] = []
+        size = 0
+        
+        async def capture(message):
+            nonlocal size
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body" and size <= self.max_response_bytes:
+                chunks.append(message.get("body", b""))
+                size += len(chunks[-1])
+            await send(message)
+        
+        try:
+            await self.app(scope, receive_buffered, capture)
+        except BaseException:
+            self.store.release(store_key)
+            raise
+        
+        status = start.get("status", 500)
+        if status >= 500 or size > self.max_response_bytes:
+            self.store.release(store_key)
+        else:
+            self.store.save(store_key, IdempotentResponse(status, list(start.get("headers", [])), b"".join(chunks)))
+    
+    def _fingerprint(self, scope, body: bytes) -> str:
+        content_type = self._header(scope, b"content-type") or b""
+        boundary = re.search(rb"boundary=\"?([^\";]+)", content_type)
+        if boundary:
+            # Clients pick a fresh multipart boundary per attempt; it isn't part of the request's meaning
+            body = body.replace(boundary.group(1), b"")
+            content_type = content_type.replace(boundary.group(1), b"")
+        return hashlib.sha256(b"\n".join([scope.get("query_string", b""), content_type, body])).hexdigest()
+    
+    def _key(self, scope) -> Optional[str]:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            return None
+        if not any(path.fullmatch(scope["path"]) for path in self.paths):
+            return None
+        key = self._header(scope, HEADER)
+        return key.decode("latin-1").strip() if key else None
+    
+    def _header(self, scope, name: bytes) -> Optional[bytes]:
+        for header, value in scope.get("headers", []):
+            if header == name:
+                return value
+        return None
+    
+    async def _read_body(self, receive) -> bytes:
+        parts = []
+        while True:
+            message = await receive()
+            parts.append(message.get("body", b""))
+            if not message.get("more_body"):
+                return b"".join(parts)
+    
+    async def _replay(self, send, response: IdempotentResponse):
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": response.headers + [(b"idempotent-replayed", b"true")]
+        })
+        await send({"type": "http.response.body", "body": response.body})
+    
+    async def _send_error(self, send, status: int, detail: str, retry_after: bool = False):
+        body = json.dumps({"detail": detail}).encode()
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        if retry_after:
+            headers.append((b"retry-after", b"1"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
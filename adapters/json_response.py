@@ -0,0 +1,60 @@
+from decimal import Decimal
+from typing import Any, Iterable, List, Mapping, Optional, Type
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Match what Pydantic's JSON mode produces: UTC datetimes end in "Z", Decimals become strings
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes; UUIDs, datetimes, enums and dataclasses are handled natively by orjson"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson instead of the standard library encoder"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def model_fields(model: Type[BaseModel]) -> List[str]:
+    return list(model.model_fields)
+
+def rows_response(
+    rows: Iterable[Any],
+    model: Type[BaseModel],
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> FastJSONResponse:
+    """Serialize database rows straight to the `model` shape without building a model per row.
+    
+    Rows come from typed columns, so only the first one is checked: it must
+    have every model field, and its serialized form must validate against the
+    model. A renamed column or a shape mismatch then raises instead of
+    shipping nulls. Rows may be mappings or objects with attributes.
+    """
+    fields = model_fields(model)
+    items = []
+    for row in rows:
+        if isinstance(row, Mapping):
+            if not items:
+                check_fields(model, fields, [field for field in fields if field not in row])
+            items.append({field: row.get(field) for field in fields})
+        else:
+            if not items:
+                check_fields(model, fields, [field for field in fields if not hasattr(row, field)])
+            items.append({field: getattr(row, field, None) for field in fields})
+        if len(items) == 1:
+            model.model_validate_json(dumps(items[0]))
+    return FastJSONResponse(items, status_code=status_code, headers=headers)
+
+def check_fields(model: Type[BaseModel], fields: List[str], missing: List[str]):
+    if missing:
+        raise ValueError(f"Rows for {model.__name__} have no {', '.join(missing)}")
@@ -0,0 +1,62 @@
+import hashlib
+import hmac
+import os
+import shutil
+import time
+from typing import Dict, Optional
+from urllib.parse import quote
+from .content_addressing import CHUNK_SIZE, object_key
+
+class LocalPresignedUploadMixin:
+    """Local stand-in for S3 presigned PUT uploads used by the mock storage adapters.
+    
+    Upload URLs point back at the API's /uploads/local route and carry an HMAC
+    signature over the bucket, key and expiry, mirroring how S3 validates them.
+    Expects the adapter to provide bucket_name, index, upload_base_url,
+    signing_secret and _file_path().
+    """
+    
+    def create_presigned_upload(self, key: str, content_type: str, expiration: int = 900) -> Dict[str, object]:
+        """Return a signed local URL the client can PUT the image bytes to"""
+        expires = int(time.time()) + expiration
+        signature = self._sign(key, expires)
+        url = (
+            f"{self.upload_base_url}/uploads/local/{self.bucket_name}/{quote(key)}"
+            f"?expires={expires}&signature={signature}"
+        )
+        return {"url": url, "method": "PUT", "headers": {"Content-Type": content_type}}
+    
+    def write_presigned_upload(self, key: str, expires: int, signature: str, data: bytes) -> bool:
+        """Accept a direct upload if its signature is valid and unexpired"""
+        if expires < time.time() or not hmac.compare_digest(signature, self._sign(key, expires)):
+            return False
+        with open(self._file_path(key), 'wb') as f:
+            f.write(data)
+        return True
+    
+    def confirm_upload(self, key: str, content_type: str) -> Optional[str]:
+        """Copy a direct upload to its content-addressed key and take a reference; returns that key"""
+        file_path = self._file_path(key)
+        if not os.path.exists(file_path):
+            return None
+        hasher = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            head = f.read(12)
+            f.seek(0)
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        stored_key = object_key(hasher.hexdigest(), head, content_type)
+        if not self.index.acquire(stored_key):
+            shutil.copyfile(file_path, self._file_path(stored_key))
+            self.index.register(stored_key, hasher.hexdigest(), os.path.getsize(file_path))
+        return stored_key
+    
+    def discard_upload(self, key: str) -> None:
+        """Remove the staging copy of a completed direct upload"""
+        file_path = self._file_path(key)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    
+    def _sign(self, key: str, expires: int) -> str:
+        message = f"{self.bucket_name}:{key}:{expires}".encode()
+        return hmac.new(self.signing_secret.encode(), message, hashlib.sha256).hexdigest()
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from domain.models import IdempotencyRecord, IdempotentResponse
+from domain.ports import IdempotencyStorePort
+
+class MemoryIdempotencyStore(IdempotencyStorePort):
+    """Bounded, TTL'd idempotency records for a single process.
+    
+    Least recently used finished keys are evicted once `max_entries` is
+    reached; reservations still in flight are kept until their request ends
+    or `in_flight_timeout` passes, so a crashed request can't block its key
+    forever. Each process has its own store; see DatabaseIdempotencyStore for
+    one shared between workers.
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl: float = 86400.0, in_flight_timeout: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.in_flight_timeout = in_flight_timeout
+        self._records: "OrderedDict[str, Tuple[float, IdempotencyRecord]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def reserve(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._records.get(key)
+            if entry and entry[0] > now:
+                self._records.move_to_end(key)
+                return entry[1]
+            self._records[key] = (now + self.in_flight_timeout, IdempotencyRecord(fingerprint))
+            self._records.move_to_end(key)
+            self._evict(now)
+            return None
+    
+    def save(self, key: str, response: IdempotentResponse) -> None:
+        with self._lock:
+            entry = self._records.get(key)
+            if entry:
+                self._records[key] = (time.monotonic() + self.ttl, IdempotencyRecord(entry[1].fingerprint, response))
+    
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._records.pop(key, None)
+    
+    def _evict(self, now: float):
+        # Expired records are usually the oldest, so trimming from the front is cheap
+        while self._records:
+            oldest_key, (expires_at, _) = next(iter(self._records.items()))
+            if expires_at > now:
+                break
+            del self._records[oldest_key]
+        # Only finished records are evicted for size: dropping a reservation would let a retry run twice
+        excess = len(self._records) - self.max_entries
+        if excess > 0:
+            victims = []
+            for key, (_, record) in self._records.items():
+                if record.response is not None:
+                    victims.append(key)
+                    if len(victims) == excess:
+                        break
+            for key in victims:
+                del self._records[key]
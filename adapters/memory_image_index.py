@@ -0,0 +1,57 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from domain.ports import ImageIndexPort
+from domain.models import StoredObject
+
+class MemoryImageIndex(ImageIndexPort):
+    def __init__(self):
+        self._objects: Dict[str, StoredObject] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, key: str) -> bool:
+        with self._lock:
+            stored = self._objects.get(key)
+            if not stored:
+                return False
+            stored.ref_count += 1
+            stored.updated_time = datetime.utcnow()
+            return True
+    
+    def register(self, key: str, content_hash: str, size_bytes: int) -> None:
+        with self._lock:
+            stored = self._objects.get(key)
+            if stored:
+                # Two uploads of the same new content raced; both hold a reference
+                stored.ref_count += 1
+                stored.updated_time = datetime.utcnow()
+                return
+            self._objects[key] = StoredObject(
+                key=key,
+                content_hash=content_hash,
+                size_bytes=size_bytes,
+                ref_count=1,
+                created_time=datetime.utcnow(),
+                updated_time=datetime.utcnow()
+            )
+    
+    def release(self, key: str) -> int:
+        with self._lock:
+            stored = self._objects.get(key)
+            if not stored:
+                return 0
+            stored.ref_count = max(stored.ref_count - 1, 0)
+            stored.updated_time = datetime.utcnow()
+            return stored.ref_count
+    
+    def collect_unreferenced(self, delete_object: Callable[[str], None], grace_seconds: int = 3600) -> List[str]:
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        collected = []
+        # Holding the lock while deleting keeps acquire() from resurrecting a key mid-delete
+        with self._lock:
+            for key, stored in list(self._objects.items()):
+                if stored.ref_count == 0 and stored.updated_time <= cutoff:
+                    delete_object(key)
+                    del self._objects[key]
+                    collected.append(key)
+        return collected
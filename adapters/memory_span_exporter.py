@@ -0,0 +1,27 @@
+import threading
+from collections import deque
+from typing import List
+from domain.models import Span
+from domain.ports import SpanExporterPort
+
+class InMemorySpanExporter(SpanExporterPort):
+    """Keeps the most recent finished spans for tests and local debugging"""
+    
+    def __init__(self, max_spans: int = 10000):
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+    
+    def shutdown(self) -> None:
+        pass
+    
+    def finished(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+    
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
@@ -0,0 +1,42 @@
+import hashlib
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Union
+from domain.models import ProductAnalysisJob, RawImageAnalysisJob, Recommendation
+from domain.ports import JobAnalyzerPort
+
+class MockJobAnalyzer(JobAnalyzerPort):
+    """Stands in for the GenAI agent; latency simulates model inference time"""
+    
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+    
+    def analyze(self, job: Union[ProductAnalysisJob, RawImageAnalysisJob]) -> Recommendation:
+        if self.latency:
+            time.sleep(self.latency)
+        
+        if isinstance(job, RawImageAnalysisJob):
+            image_key = job.raw_image_key
+            sku_properties = {"filename": job.filename}
+        else:
+            image_key = job.image_urls.get("raw") or next(iter(job.image_urls.values()), "")
+            sku_properties = {"product_id": job.product_id, "sku_id": job.sku_id}
+        
+        # Deterministic per image so repeated runs produce comparable output
+        score = int(hashlib.sha256(image_key.encode()).hexdigest()[:2], 16) / 255
+        print(f"Mock analyzer: Analyzed {job.analysis_type} job for {image_key}")
+        return Recommendation(
+            id=None,
+            raw_image_key=image_key,
+            analysis_type=job.analysis_type,
+            recommended_products=[],
+            market_insights={"source": "mock"},
+            sku_properties=sku_properties,
+            confidence_score=Decimal(f"{score:.2f}"),
+            version=1,
+            expiry_date=datetime.utcnow() + timedelta(days=30),
+            is_considered=False,
+            consideration_reason=None,
+            created_by="agent"
+        )
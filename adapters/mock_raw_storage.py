@@ -1,29 +1,51 @@
 import os
-import uuid
+from typing import Optional
 from domain.models import ImageUpload
+from domain.ports import ImageIndexPort
+from .content_addressing import content_hash, content_key
+from .memory_image_index import MemoryImageIndex
+from .local_presign import LocalPresignedUploadMixin
 
-class MockRawImageStorageAdapter:
-    def __init__(self, bucket_name: str = "test", region: str = "us-east-1"):
+class MockRawImageStorageAdapter(LocalPresignedUploadMixin):
+    def __init__(
+        self,
+        bucket_name: str = "test",
+        region: str = "us-east-1",
+        index: Optional[ImageIndexPort] = None,
+        upload_base_url: str = "http://localhost:8000",
+        signing_secret: str = "mock-upload-secret"
+    ):
         self.bucket_name = bucket_name
         self.region = region
         self.base_path = "/tmp/mock_raw_images"
+        self.index = index or MemoryImageIndex()
+        self.upload_base_url = upload_base_url
+        self.signing_secret = signing_secret
         os.makedirs(self.base_path, exist_ok=True)
     
     def store_raw_image(self, image: ImageUpload) -> str:
         """Store raw image in unprocessed bucket"""
-        key = f"raw/{uuid.uuid4()}.jpg"
-        file_path = os.path.join(self.base_path, key.replace('/', '_'))
+        digest, size = content_hash(image)
+        key = content_key(digest, image)
+        if self.index.acquire(key):
+            return key
         
-        # Save file locally
-        with open(file_path, 'wb') as f:
-            image.content.seek(0)
-            f.write(image.content.read())
+        file_path = self._file_path(key)
+        if not os.path.exists(file_path):
+            # Save file locally
+            with open(file_path, 'wb') as f:
+                image.content.seek(0)
+                f.write(image.content.read())
         
+        self.index.register(key, digest, size)
         return key
     
     def get_raw_image_url(self, key: str) -> str:
         """Return mock S3 URL for raw image"""
         return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
+    
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.base_path, key.replace('/', '_'))
 
 class MockRawStorageAdapter(MockRawImageStorageAdapter):
     """Alias for compatibility"""
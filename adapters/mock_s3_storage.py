@@ -1,27 +1,31 @@
 import os
-import uuid
-from typing import Dict
+from typing import Dict, List, Optional
 from domain.models import ImageUpload
-from domain.ports import StoragePort
+from domain.ports import StoragePort, ImageIndexPort
+from .content_addressing import content_hash, content_key
+from .memory_image_index import MemoryImageIndex
+from .local_presign import LocalPresignedUploadMixin
 
-class MockS3StorageAdapter(StoragePort):
-    def __init__(self, bucket_name: str, region: str = "us-east-1"):
+class MockS3StorageAdapter(LocalPresignedUploadMixin, StoragePort):
+    def __init__(
+        self,
+        bucket_name: str,
+        region: str = "us-east-1",
+        index: Optional[ImageIndexPort] = None,
+        upload_base_url: str = "http://localhost:8000",
+        signing_secret: str = "mock-upload-secret"
+    ):
         self.bucket_name = bucket_name
         self.region = region
         self.base_path = "/tmp/mock_s3"
+        self.index = index or MemoryImageIndex()
+        self.upload_base_url = upload_base_url
+        self.signing_secret = signing_secret
         os.makedirs(self.base_path, exist_ok=True)
     
     def store_image(self, image: ImageUpload) -> str:
         """Store image locally and return mock S3 key"""
-        key = f"images/{uuid.uuid4()}.jpg"
-        file_path = os.path.join(self.base_path, key.replace('/', '_'))
-        
-        # Save file locally
-        with open(file_path, 'wb') as f:
-            image.content.seek(0)
-            f.write(image.content.read())
-        
-        return key
+        return self._store_deduplicated(image)
     
     def get_image_url(self, key: str) -> str:
         """Return mock S3 URL"""
@@ -31,14 +35,39 @@ class MockS3StorageAdapter(StoragePort):
         """Store multiple images and return mock URLs"""
         image_urls = {}
         for img_type, image in images.items():
-            key = f"products/{img_type}/{uuid.uuid4()}.jpg"
-            file_path = os.path.join(self.base_path, key.replace('/', '_'))
-            
+            key = self._store_deduplicated(image)
+            image_urls[img_type] = self.get_image_url(key)
+        
+        return image_urls
+    
+    def release_image(self, url_or_key: str) -> None:
+        """Drop one reference to a stored image"""
+        self.index.release(url_or_key.replace(self.get_image_url(""), ""))
+    
+    def collect_garbage(self, grace_seconds: int = 3600) -> List[str]:
+        """Delete images no product references any more"""
+        return self.index.collect_unreferenced(self._delete_file, grace_seconds)
+    
+    def _store_deduplicated(self, image: ImageUpload) -> str:
+        digest, size = content_hash(image)
+        key = content_key(digest, image)
+        if self.index.acquire(key):
+            return key
+        
+        file_path = self._file_path(key)
+        if not os.path.exists(file_path):
             # Save file locally
             with open(file_path, 'wb') as f:
                 image.content.seek(0)
                 f.write(image.content.read())
-            
-            image_urls[img_type] = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
         
-        return image_urls
+        self.index.register(key, digest, size)
+        return key
+    
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.base_path, key.replace('/', '_'))
+    
+    def _delete_file(self, key: str):
+        file_path = self._file_path(key)
+        if os.path.exists(file_path):
+            os.remove(file_path)
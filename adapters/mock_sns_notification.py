@@ -1,10 +1,16 @@
+import itertools
 import json
+from collections import deque
 from domain.models import RawImageAnalysisJob
 
+# Only the most recent messages are kept for inspection
+MAX_RECORDED_MESSAGES = 1000
+
 class MockSNSNotificationAdapter:
     def __init__(self, topic_arn: str):
         self.topic_arn = topic_arn
-        self.notifications = []
+        self.notifications = deque(maxlen=MAX_RECORDED_MESSAGES)
+        self._message_ids = itertools.count(1)
     
     def send_notification(self, job: RawImageAnalysisJob):
         """Mock SNS notification - just log it"""
@@ -12,8 +18,10 @@ class MockSNSNotificationAdapter:
             "raw_image_key": job.raw_image_key,
             "filename": job.filename,
             "analysis_type": job.analysis_type,
+            "dedupe_id": job.dedupe_id,
+            "traceparent": job.traceparent,
             "topic_arn": self.topic_arn
         }
         self.notifications.append(message)
         print(f"Mock SNS: Sent notification for raw image analysis {job.raw_image_key}")
-        return {"MessageId": f"mock-{len(self.notifications)}"}
+        return {"MessageId": f"mock-{next(self._message_ids)}"}
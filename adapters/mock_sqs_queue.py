@@ -1,25 +1,44 @@
 import json
+from collections import deque
+from typing import Dict, List
 from domain.models import ProcessingJob, ProductAnalysisJob
 from domain.ports import QueuePort, ProductAnalysisQueuePort
 
+# Only the most recent messages are kept for inspection
+MAX_RECORDED_MESSAGES = 1000
+
+def record_batch(messages: deque, queue_url: str, entries: List[Dict]) -> Dict:
+    """Mock SendMessageBatch - decode each entry and keep it like a single send"""
+    for entry in entries:
+        messages.append(json.loads(entry["MessageBody"]))
+    print(f"Mock SQS: Sent batch of {len(entries)} messages to {queue_url}")
+    return {
+        "Successful": [{"Id": entry["Id"], "MessageId": f"mock-{entry['Id']}"} for entry in entries],
+        "Failed": []
+    }
+
 class MockSQSQueueAdapter(QueuePort):
     def __init__(self, queue_url: str):
         self.queue_url = queue_url
-        self.messages = []
+        self.messages = deque(maxlen=MAX_RECORDED_MESSAGES)
     
     def queue_job(self, job: ProcessingJob):
         """Mock message sending - just log it"""
         message = {
             "image_key": job.image_key,
-            "filename": job.filename
+            "filename": job.filename,
+            "traceparent": job.traceparent
         }
         self.messages.append(message)
         print(f"Mock SQS: Queued processing job for {job.filename}")
+    
+    def send_message_batch(self, QueueUrl: str, Entries: List[Dict]) -> Dict:
+        return record_batch(self.messages, QueueUrl, Entries)
 
 class MockSQSAnalysisQueueAdapter(ProductAnalysisQueuePort):
     def __init__(self, queue_url: str):
         self.queue_url = queue_url
-        self.messages = []
+        self.messages = deque(maxlen=MAX_RECORDED_MESSAGES)
     
     def queue_analysis(self, job: ProductAnalysisJob):
         """Mock analysis queue - just log it"""
@@ -27,7 +46,12 @@ class MockSQSAnalysisQueueAdapter(ProductAnalysisQueuePort):
             "product_id": job.product_id,
             "sku_id": job.sku_id,
             "image_urls": job.image_urls,
-            "analysis_type": job.analysis_type
+            "analysis_type": job.analysis_type,
+            "dedupe_id": job.dedupe_id,
+            "traceparent": job.traceparent
         }
         self.messages.append(message)
         print(f"Mock SQS: Queued analysis job for product {job.product_id}")
+    
+    def send_message_batch(self, QueueUrl: str, Entries: List[Dict]) -> Dict:
+        return record_batch(self.messages, QueueUrl, Entries)
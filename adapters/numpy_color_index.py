@@ -0,0 +1,176 @@
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from domain.models import ColorMatch
+from domain.ports import ColorIndexPort
+
+HEX_COLOR = re.compile(r"^#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})$")
+# sRGB -> XYZ (D65) and the D65 reference white
+RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+WHITE_POINT = np.array([0.95047, 1.0, 1.08883])
+
+def normalize_hex(hex_color: str) -> str:
+    """Return #rrggbb in lower case; raises ValueError for anything else"""
+    match = HEX_COLOR.match((hex_color or "").strip())
+    if not match:
+        raise ValueError(f"Invalid hex color: {hex_color!r}")
+    digits = match.group(1).lower()
+    if len(digits) == 3:
+        digits = "".join(c * 2 for c in digits)
+    return f"#{digits}"
+
+def hex_to_lab(hex_colors: Sequence[str]) -> np.ndarray:
+    """Convert hex colors to CIE Lab, vectorised over the whole sequence"""
+    rgb = np.array(
+        [[int(h[i:i + 2], 16) for i in (1, 3, 5)] for h in map(normalize_hex, hex_colors)],
+        dtype=np.float64
+    ).reshape(-1, 3) / 255.0
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ RGB_TO_XYZ.T / WHITE_POINT
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    lab = np.empty_like(f)
+    lab[:, 0] = 116 * f[:, 1] - 16
+    lab[:, 1] = 500 * (f[:, 0] - f[:, 1])
+    lab[:, 2] = 200 * (f[:, 1] - f[:, 2])
+    return lab.astype(np.float32)
+
+class NumpyColorIndex(ColorIndexPort):
+    """Nearest-colour lookup over a compact float32 Lab array.
+    
+    Distances are CIE76 delta E (Euclidean in Lab), computed for every row in
+    one vectorised pass; at 100k colours that is a ~1 ms scan, which beats
+    maintaining a k-d tree under frequent single-row updates. Rows are kept
+    dense by moving the last row into any removed slot. Changes made while a
+    reload reads its snapshot are replayed over it, so none are lost.
+    """
+    
+    def __init__(self, initial_capacity: int = 1024):
+        self._lab = np.zeros((initial_capacity, 3), dtype=np.float32)
+        self._keys: List[str] = []
+        self._entries: List[tuple] = []  # (product_id, variant_id, hex) per row
+        self._rows: Dict[str, int] = {}
+        self._pending: Optional[List[tuple]] = None  # changes made during a reload
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def upsert(self, key: str, product_id: str, hex_color: str, variant_id: Optional[str] = None) -> None:
+        hex_color = normalize_hex(hex_color)
+        lab = hex_to_lab([hex_color])[0]
+        with self._lock:
+            self._record("upsert", key, product_id, hex_color, variant_id)
+            row = self._rows.get(key)
+            if row is None:
+                row = len(self._keys)
+                self._grow(row + 1)
+                self._keys.append(key)
+                self._entries.append(None)
+                self._rows[key] = row
+            self._lab[row] = lab
+            self._entries[row] = (str(product_id), str(variant_id) if variant_id else None, hex_color)
+    
+    @contextmanager
+    def loading(self):
+        """Wrap reading a snapshot and its bulk_load so changes made meanwhile are replayed"""
+        with self._lock:
+            self._pending = []
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._pending = None
+    
+    def bulk_load(self, entries: Sequence[tuple]) -> None:
+        """Replace the index with (key, product_id, hex, variant_id) tuples in one conversion"""
+        valid = []
+        for key, product_id, hex_color, variant_id in entries:
+            try:
+                valid.append((key, str(product_id), normalize_hex(hex_color), str(variant_id) if variant_id else None))
+            except ValueError:
+                continue
+        lab = hex_to_lab([entry[2] for entry in valid]) if valid else np.zeros((0, 3), dtype=np.float32)
+        with self._lock:
+            self._lab = np.zeros((max(len(valid), 1024), 3), dtype=np.float32)
+            self._lab[:len(valid)] = lab
+            self._keys = [entry[0] for entry in valid]
+            self._entries = [(product_id, variant_id, hex_color) for _, product_id, hex_color, variant_id in valid]
+            self._rows = {key: row for row, key in enumerate(self._keys)}
+            self._replay()
+    
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._record("remove", key)
+            self._remove_row(key)
+    
+    def remove_product(self, product_id: str) -> None:
+        product_id = str(product_id)
+        with self._lock:
+            self._record("remove_product", product_id)
+            for key in [k for k, entry in zip(self._keys, self._entries) if entry[0] == product_id]:
+                self._remove_row(key)
+    
+    def nearest(self, hex_color: str, k: int = 10) -> List[ColorMatch]:
+        """Up to k products ordered by closest colour; a product's best-matching colour wins"""
+        target = hex_to_lab([hex_color])[0]
+        with self._lock:
+            size = len(self._keys)
+            if not size or k <= 0:
+                return []
+            distances = np.sqrt(((self._lab[:size] - target) ** 2).sum(axis=1))
+            entries = list(self._entries)
+        
+        # Over-fetch so a product matched by several variants doesn't crowd out others
+        candidates = min(size, k * 4)
+        while True:
+            rows = np.argpartition(distances, candidates - 1)[:candidates] if candidates < size else np.arange(size)
+            rows = rows[np.argsort(distances[rows], kind="stable")]
+            matches = []
+            seen = set()
+            for row in rows:
+                product_id, variant_id, matched_hex = entries[row]
+                if product_id in seen:
+                    continue
+                seen.add(product_id)
+                matches.append(ColorMatch(product_id, variant_id, matched_hex, round(float(distances[row]), 3)))
+                if len(matches) == k:
+                    return matches
+            if candidates >= size:
+                return matches
+            candidates = min(size, candidates * 4)
+    
+    def _record(self, method: str, *args):
+        if self._pending is not None:
+            self._pending.append((method, args))
+    
+    def _replay(self):
+        pending, self._pending = self._pending or [], None
+        for method, args in pending:
+            getattr(self, method)(*args)
+    
+    def _grow(self, needed: int):
+        if needed > len(self._lab):
+            grown = np.zeros((max(needed, len(self._lab) * 2), 3), dtype=np.float32)
+            grown[:len(self._keys)] = self._lab[:len(self._keys)]
+            self._lab = grown
+    
+    def _remove_row(self, key: str):
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self._keys) - 1
+        if row != last:
+            # Keep rows dense: move the last row into the freed slot
+            moved_key = self._keys[last]
+            self._lab[row] = self._lab[last]
+            self._keys[row] = moved_key
+            self._entries[row] = self._entries[last]
+            self._rows[moved_key] = row
+        self._keys.pop()
+        self._entries.pop()
@@ -0,0 +1,119 @@
+import json
+import logging
+import queue
+import threading
+import urllib.request
+from typing import Dict, List, Optional
+from domain.models import Span
+from domain.ports import SpanExporterPort
+
+logger = logging.getLogger(__name__)
+
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+STATUS_CODES = {"unset": 0, "ok": 1, "error": 2}
+
+def attribute_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def attributes(values: Dict) -> List[Dict]:
+    return [{"key": key, "value": attribute_value(value)} for key, value in values.items() if value is not None]
+
+def otlp_span(span: Span) -> Dict:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": SPAN_KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_time),
+        "endTimeUnixNano": str(span.end_time or span.start_time),
+        "attributes": attributes(span.attributes),
+        "status": {"code": STATUS_CODES.get(span.status, 0)},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    if span.status_message:
+        encoded["status"]["message"] = span.status_message
+    return encoded
+
+def otlp_request(spans: List[Span], service_name: str) -> Dict:
+    """An OTLP/JSON ExportTraceServiceRequest for one batch of spans"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": attributes({"service.name": service_name})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [otlp_span(span) for span in spans]}],
+        }]
+    }
+
+class OTLPHttpSpanExporter(SpanExporterPort):
+    """Ships spans to an OpenTelemetry collector as OTLP/HTTP JSON from a background thread.
+    
+    Spans are batched up to `batch_size` or every `flush_interval` seconds.
+    When the collector is slow or down the buffer fills and further spans are
+    dropped (and counted) rather than slowing requests down.
+    """
+    
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str,
+        headers: Optional[Dict[str, str]] = None,
+        batch_size: int = 512,
+        flush_interval: float = 2.0,
+        max_buffered: int = 4096,
+        timeout: float = 5.0
+    ):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.dropped = 0
+        self._pending: queue.Queue = queue.Queue(maxsize=max_buffered)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="otlp-span-exporter", daemon=True)
+        self._thread.start()
+    
+    def export(self, spans: List[Span]) -> None:
+        for span in spans:
+            try:
+                self._pending.put_nowait(span)
+            except queue.Full:
+                self.dropped += 1
+    
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self._thread.join(self.timeout + self.flush_interval)
+    
+    def _run(self):
+        while not self._stopped.is_set() or not self._pending.empty():
+            batch = self._next_batch()
+            if batch:
+                self._send(batch)
+    
+    def _next_batch(self) -> List[Span]:
+        try:
+            batch = [self._pending.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _send(self, batch: List[Span]):
+        body = json.dumps(otlp_request(batch, self.service_name)).encode()
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except Exception as e:
+            logger.warning("Dropped %d spans, OTLP export to %s failed: %s", len(batch), self.url, e)
@@ -0,0 +1,35 @@
+import io
+from typing import Dict, List, Optional, Tuple
+from PIL import Image, ImageOps
+from domain.ports import ImageProcessorPort
+
+# name -> (max width, max height, JPEG quality)
+DERIVATIVE_SPECS: Dict[str, Tuple[int, int, int]] = {
+    "thumbnail": (320, 320, 80),
+    "web": (1280, 1280, 82),
+    "zoom": (2400, 2400, 90),
+}
+
+class PillowImageProcessor(ImageProcessorPort):
+    def __init__(self, specs: Optional[Dict[str, Tuple[int, int, int]]] = None):
+        self.specs = specs or DERIVATIVE_SPECS
+
+    def rendition_names(self) -> List[str]:
+        return list(self.specs)
+
+    def render_derivatives(self, content: bytes) -> Dict[str, bytes]:
+        """Resize a raw image into JPEG renditions with EXIF metadata stripped"""
+        renditions = {}
+        with Image.open(io.BytesIO(content)) as source:
+            # Bake the EXIF orientation into the pixels before the metadata is dropped
+            oriented = ImageOps.exif_transpose(source).convert("RGB")
+
+        for name, (width, height, quality) in self.specs.items():
+            rendition = oriented.copy()
+            rendition.thumbnail((width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            # No exif= argument, so the re-encoded file carries no metadata
+            rendition.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+            renditions[name] = buffer.getvalue()
+
+        return renditions
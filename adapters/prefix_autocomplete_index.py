@@ -0,0 +1,169 @@
+import re
+import threading
+from contextlib import contextmanager
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+from domain.models import AutocompleteMatch
+from domain.ports import AutocompletePort
+
+# Fields in the order their matches are offered
+FIELDS = ("sku", "variant_sku", "title")
+WORD = re.compile(r"\w+")
+MAX_TERM_LENGTH = 64
+
+def title_terms(title: str) -> List[str]:
+    """Every word-initial tail of the title, so "silk sa" finds "Red Silk Saree" """
+    lowered = (title or "").lower()
+    return sorted({lowered[match.start():][:MAX_TERM_LENGTH] for match in WORD.finditer(lowered)})
+
+class PrefixAutocompleteIndex(AutocompletePort):
+    """In-memory autocomplete over SKUs, variant SKU suffixes and title words.
+    
+    Each field is a sorted list of (term, owner) tuples, so a lookup is one
+    bisect plus a short forward scan, and a single write is an insort. All
+    matching is case-insensitive; SKUs are stored upper-cased like the SKU
+    value object. Changes made while a reload reads its snapshot are replayed
+    over it. The index is per process, so deployments running several
+    workers should use the database-backed lookup instead.
+    """
+    
+    def __init__(self):
+        self._terms: Dict[str, List[Tuple[str, str]]] = {field: [] for field in FIELDS}
+        self._products: Dict[str, Tuple[str, str]] = {}  # product_id -> (sku_id, title)
+        self._variants: Dict[str, Tuple[str, str]] = {}  # variant_id -> (product_id, sku_suffix)
+        self._owned: Dict[str, List[Tuple[str, Tuple[str, str]]]] = {}
+        self._pending: Optional[List[tuple]] = None  # changes made during a reload
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self._products)
+    
+    @contextmanager
+    def loading(self):
+        """Wrap reading a snapshot and its bulk_load so changes made meanwhile are replayed"""
+        with self._lock:
+            self._pending = []
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._pending = None
+    
+    def bulk_load(self, products: Iterable[Tuple[str, str, str]], variants: Iterable[Tuple[str, str, str]]):
+        """Replace the index with (id, sku_id, title) products and (id, product_id, sku_suffix) variants"""
+        terms: Dict[str, List[Tuple[str, str]]] = {field: [] for field in FIELDS}
+        owned: Dict[str, List[Tuple[str, Tuple[str, str]]]] = {}
+        product_records = {}
+        variant_records = {}
+        for product_id, sku_id, title in products:
+            product_id = str(product_id)
+            product_records[product_id] = ((sku_id or "").upper(), title or "")
+            owned[f"product:{product_id}"] = self._product_entries(product_id, sku_id, title)
+        for variant_id, product_id, sku_suffix in variants:
+            variant_id = str(variant_id)
+            variant_records[variant_id] = (str(product_id), sku_suffix or "")
+            owned[f"variant:{variant_id}"] = self._variant_entries(variant_id, sku_suffix)
+        for entries in owned.values():
+            for field, entry in entries:
+                terms[field].append(entry)
+        for entries in terms.values():
+            entries.sort()
+        with self._lock:
+            self._terms, self._owned = terms, owned
+            self._products, self._variants = product_records, variant_records
+            pending, self._pending = self._pending or [], None
+            for method, args in pending:
+                getattr(self, method)(*args)
+    
+    def upsert_product(self, product_id: str, sku_id: str, title: str):
+        product_id = str(product_id)
+        with self._lock:
+            self._record("upsert_product", product_id, sku_id, title)
+            self._replace(f"product:{product_id}", self._product_entries(product_id, sku_id, title))
+            self._products[product_id] = ((sku_id or "").upper(), title or "")
+    
+    def remove_product(self, product_id: str):
+        product_id = str(product_id)
+        with self._lock:
+            self._record("remove_product", product_id)
+            self._replace(f"product:{product_id}", [])
+            self._products.pop(product_id, None)
+            for variant_id in [v for v, (owner, _) in self._variants.items() if owner == product_id]:
+                self.remove_variant(variant_id)
+    
+    def upsert_variant(self, variant_id: str, product_id: str, sku_suffix: str):
+        variant_id = str(variant_id)
+        with self._lock:
+            self._record("upsert_variant", variant_id, product_id, sku_suffix)
+            self._replace(f"variant:{variant_id}", self._variant_entries(variant_id, sku_suffix))
+            self._variants[variant_id] = (str(product_id), sku_suffix or "")
+    
+    def remove_variant(self, variant_id: str):
+        variant_id = str(variant_id)
+        with self._lock:
+            self._record("remove_variant", variant_id)
+            self._replace(f"variant:{variant_id}", [])
+            self._variants.pop(variant_id, None)
+    
+    def complete(self, prefix: str, limit: int = 10) -> List[AutocompleteMatch]:
+        """Up to `limit` products, SKU matches first, then variant SKUs, then titles"""
+        prefix = (prefix or "").strip().lower()
+        if not prefix or limit <= 0:
+            return []
+        
+        matches: List[AutocompleteMatch] = []
+        seen = set()
+        with self._lock:
+            for field in FIELDS:
+                terms = self._terms[field]
+                position = bisect_left(terms, (prefix,))
+                while position < len(terms) and terms[position][0].startswith(prefix):
+                    match = self._match(field, terms[position][1])
+                    position += 1
+                    if match is None or match.product_id in seen:
+                        continue
+                    seen.add(match.product_id)
+                    matches.append(match)
+                    if len(matches) == limit:
+                        return matches
+        return matches
+    
+    def _record(self, method: str, *args):
+        if self._pending is not None:
+            self._pending.append((method, args))
+    
+    def _match(self, field: str, owner: str) -> Optional[AutocompleteMatch]:
+        if field == "variant_sku":
+            product_id, sku_suffix = self._variants[owner]
+            matched_text = sku_suffix
+        else:
+            product_id = owner
+            matched_text = None
+        product = self._products.get(product_id)
+        if product is None:
+            # A variant whose product hasn't been indexed yet
+            return None
+        sku_id, title = product
+        if matched_text is None:
+            matched_text = sku_id if field == "sku" else title
+        return AutocompleteMatch(product_id, sku_id, title, field, matched_text)
+    
+    def _product_entries(self, product_id: str, sku_id: str, title: str):
+        entries = [("title", (term, product_id)) for term in title_terms(title)]
+        if sku_id:
+            entries.append(("sku", (sku_id.lower(), product_id)))
+        return entries
+    
+    def _variant_entries(self, variant_id: str, sku_suffix: str):
+        return [("variant_sku", (sku_suffix.lower(), variant_id))] if sku_suffix else []
+    
+    def _replace(self, owner_key: str, entries):
+        for field, entry in self._owned.pop(owner_key, []):
+            terms = self._terms[field]
+            position = bisect_left(terms, entry)
+            if position < len(terms) and terms[position] == entry:
+                del terms[position]
+        for field, entry in entries:
+            insort(self._terms[field], entry)
+        if entries:
+            self._owned[owner_key] = entries
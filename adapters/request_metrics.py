@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class RequestStats:
+    """Database work attributed to the request currently being served"""
+    __slots__ = ("statements", "db_seconds", "statement_counts")
+    
+    def __init__(self, track_statements: bool):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.statement_counts: Optional[Counter] = Counter() if track_statements else None
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+    
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        # Counts are stored per bucket and made cumulative when rendered
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(values: Dict[str, str]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in values.items())
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class RequestMetrics:
+    """Per-route request metrics rendered in the Prometheus text exposition format.
+    
+    Routes are labelled by their path template (e.g. /products/{product_id})
+    so label cardinality stays bounded. A request that runs more than
+    `n_plus_one_threshold` SQL statements is counted and logged together
+    with its most repeated statement, the usual sign of an N+1 query.
+    """
+    
+    def __init__(self, n_plus_one_threshold: int = 50):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._statements: Dict[Tuple[str, str], Histogram] = {}
+        self._db_seconds: Dict[Tuple[str, str], Histogram] = {}
+        self._response_bytes: Dict[Tuple[str, str], Histogram] = {}
+        self._requests: Counter = Counter()
+        self._n_plus_one: Counter = Counter()
+        self._lock = threading.Lock()
+    
+    def instrument_engine(self, engine: Engine):
+        """Count statements and time spent in the database for the request in progress"""
+        
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if _current_request.get() is not None:
+                conn.info.setdefault("query_start", []).append(time.perf_counter())
+        
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            stats = _current_request.get()
+            if stats is None or not conn.info.get("query_start"):
+                return
+            stats.db_seconds += time.perf_counter() - conn.info["query_start"].pop()
+            stats.statements += 1
+            if stats.statement_counts is not None:
+                stats.statement_counts[statement] += 1
+    
+    def start_request(self) -> Tuple[RequestStats, object]:
+        stats = RequestStats(track_statements=self.n_plus_one_threshold > 0)
+        return stats, _current_request.set(stats)
+    
+    def finish_request(self, token, stats: RequestStats, method: str, route: str, status: int, seconds: float, response_bytes: int):
+        _current_request.reset(token)
+        key = (method, route)
+        with self._lock:
+            self._histogram(self._latency, key, LATENCY_BUCKETS).observe(seconds)
+            self._histogram(self._statements, key, STATEMENT_BUCKETS).observe(stats.statements)
+            self._histogram(self._db_seconds, key, LATENCY_BUCKETS).observe(stats.db_seconds)
+            self._histogram(self._response_bytes, key, BYTES_BUCKETS).observe(response_bytes)
+            self._requests[(method, route, str(status))] += 1
+            suspected = 0 < self.n_plus_one_threshold < stats.statements
+            if suspected:
+                self._n_plus_one[key] += 1
+        if suspected:
+            statement, repeats = stats.statement_counts.most_common(1)[0]
+            logger.warning(
+                "Possible N+1: %s %s ran %d SQL statements (%.1f ms in the database); repeated %d times: %s",
+                method, route, stats.statements, stats.db_seconds * 1000, repeats, " ".join(statement.split())[:300]
+            )
+    
+    def render(self) -> str:
+        with self._lock:
+            lines: List[str] = []
+            self._render_histograms(lines, "http_request_duration_seconds", "Request latency by route", self._latency)
+            self._render_histograms(lines, "http_request_db_statements", "SQL statements run per request", self._statements)
+            self._render_histograms(lines, "http_request_db_seconds", "Time spent in the database per request", self._db_seconds)
+            self._render_histograms(lines, "http_response_size_bytes", "Response body size", self._response_bytes)
+            lines.append("# HELP http_requests_total Requests served")
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route, status), count in sorted(self._requests.items()):
+                lines.append(f"http_requests_total{{{_labels({'method': method, 'route': route, 'status': status})}}} {count}")
+            lines.append(f"# HELP http_requests_n_plus_one_total Requests exceeding {self.n_plus_one_threshold} SQL statements")
+            lines.append("# TYPE http_requests_n_plus_one_total counter")
+            for (method, route), count in sorted(self._n_plus_one.items()):
+                lines.append(f"http_requests_n_plus_one_total{{{_labels({'method': method, 'route': route})}}} {count}")
+        return "\n".join(lines) + "\n"
+    
+    def _histogram(self, family: Dict, key, buckets) -> Histogram:
+        histogram = family.get(key)
+        if histogram is None:
+            histogram = family[key] = Histogram(buckets)
+        return histogram
+    
+    def _render_histograms(self, lines: List[str], name: str, help_text: str, family: Dict):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (method, route), histogram in sorted(family.items()):
+            labels = {"method": method, "route": route}
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{{{_labels({**labels, 'le': _number(bound)})}}} {cumulative}")
+            lines.append(f"{name}_bucket{{{_labels({**labels, 'le': '+Inf'})}}} {histogram.count}")
+            lines.append(f"{name}_sum{{{_labels(labels)}}} {_number(histogram.sum)}")
+            lines.append(f"{name}_count{{{_labels(labels)}}} {histogram.count}")
+
+class MetricsMiddleware:
+    """Times each HTTP request and attributes its SQL and response bytes to the matched route"""
+    
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        response_bytes = 0
+        
+        async def measure(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+        
+        stats, token = self.metrics.start_request()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, measure)
+        finally:
+            route = scope.get("route")
+            self.metrics.finish_request(
+                token, stats, scope["method"], getattr(route, "path", "unmatched"), status,
+                time.perf_counter() - started, response_bytes
+            )
@@ -1,45 +1,55 @@
 import boto3
-from uuid import uuid4
-from typing import Dict
-from domain.ports import StoragePort
+import hashlib
+from botocore.exceptions import ClientError
+from typing import Dict, List, Optional
+from domain.ports import StoragePort, ImageIndexPort
 from domain.models import ImageUpload
+from .content_addressing import CHUNK_SIZE, content_hash, content_key, object_key
+from .memory_image_index import MemoryImageIndex
 
 class S3StorageAdapter(StoragePort):
-    def __init__(self, bucket_name: str, region: str = "us-east-1"):
+    def __init__(self, bucket_name: str, region: str = "us-east-1", index: Optional[ImageIndexPort] = None):
         self.s3 = boto3.client('s3')
         self.bucket_name = bucket_name
         self.region = region
+        self.index = index or MemoryImageIndex()
     
     def store_image(self, image: ImageUpload) -> str:
-        key = f"images/{uuid4()}-{image.filename}"
-        self.s3.upload_fileobj(
-            image.content,
-            self.bucket_name,
-            key,
-            ExtraArgs={'ContentType': image.content_type}
-        )
-        return key
+        return self._store_deduplicated(image)
     
     def store_product_images(self, images: Dict[str, ImageUpload]) -> Dict[str, str]:
         """Store multiple images and return URLs"""
         image_urls = {}
         
         for image_type, image in images.items():
-            key = f"products/{image_type}/{uuid4()}-{image.filename}"
-            
-            self.s3.upload_fileobj(
-                image.content,
-                self.bucket_name,
-                key,
-                ExtraArgs={'ContentType': image.content_type}
-            )
+            key = self._store_deduplicated(image)
             
             # Generate public URL
-            url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
-            image_urls[image_type] = url
+            image_urls[image_type] = self.get_image_url(key)
         
         return image_urls
     
+    def store_raw_image(self, image: ImageUpload) -> str:
+        """Store raw image in unprocessed bucket"""
+        return self._store_deduplicated(image)
+    
+    def get_image_url(self, key: str) -> str:
+        return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
+    
+    def get_raw_image_url(self, key: str) -> str:
+        return self.get_image_url(key)
+    
+    def release_image(self, url_or_key: str) -> None:
+        """Drop one reference to a stored image"""
+        self.index.release(url_or_key.replace(self.get_image_url(""), ""))
+    
+    def collect_garbage(self, grace_seconds: int = 3600) -> List[str]:
+        """Delete objects no product references any more"""
+        return self.index.collect_unreferenced(
+            lambda key: self.s3.delete_object(Bucket=self.bucket_name, Key=key),
+            grace_seconds
+        )
+    
     def get_presigned_url(self, key: str, expiration: int = 3600) -> str:
         """Generate presigned URL for private access"""
         return self.s3.generate_presigned_url(
@@ -47,3 +57,76 @@ class S3StorageAdapter(StoragePort):
             Params={'Bucket': self.bucket_name, 'Key': key},
             ExpiresIn=expiration
         )
+    
+    def create_presigned_upload(self, key: str, content_type: str, expiration: int = 900) -> Dict[str, object]:
+        """Generate presigned PUT URL so clients upload straight to the bucket"""
+        url = self.s3.generate_presigned_url(
+            'put_object',
+            Params={'Bucket': self.bucket_name, 'Key': key, 'ContentType': content_type},
+            ExpiresIn=expiration
+        )
+        # The signature covers Content-Type, so the client must send the same header
+        return {"url": url, "method": "PUT", "headers": {"Content-Type": content_type}}
+    
+    def confirm_upload(self, key: str, content_type: str) -> Optional[str]:
+        """Copy a direct upload to its content-addressed key and take a reference; returns that key"""
+        try:
+            body = self.s3.get_object(Bucket=self.bucket_name, Key=key)['Body']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        # ETags aren't content hashes for multipart uploads, so hash the bytes like any other upload
+        hasher = hashlib.sha256()
+        head = b""
+        size = 0
+        for chunk in body.iter_chunks(CHUNK_SIZE):
+            if not size:
+                head = chunk[:12]
+            hasher.update(chunk)
+            size += len(chunk)
+        stored_key = object_key(hasher.hexdigest(), head, content_type)
+        if self.index.acquire(stored_key):
+            return stored_key
+        
+        if not self._object_exists(stored_key):
+            self.s3.copy_object(
+                Bucket=self.bucket_name,
+                Key=stored_key,
+                CopySource={'Bucket': self.bucket_name, 'Key': key},
+                ContentType=content_type,
+                MetadataDirective='REPLACE'
+            )
+        self.index.register(stored_key, hasher.hexdigest(), size)
+        return stored_key
+    
+    def discard_upload(self, key: str) -> None:
+        """Delete the staging copy of a completed direct upload"""
+        self.s3.delete_object(Bucket=self.bucket_name, Key=key)
+    
+    def _store_deduplicated(self, image: ImageUpload) -> str:
+        digest, size = content_hash(image)
+        key = content_key(digest, image)
+        if self.index.acquire(key):
+            return key
+        
+        # The object may predate the index (or live in another worker's memory index)
+        if not self._object_exists(key):
+            self.s3.upload_fileobj(
+                image.content,
+                self.bucket_name,
+                key,
+                ExtraArgs={'ContentType': image.content_type}
+            )
+        
+        self.index.register(key, digest, size)
+        return key
+    
+    def _object_exists(self, key: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
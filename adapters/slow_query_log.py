@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+from domain.models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+# Plans only, never ANALYZE: capturing one must not run the query a second time
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN (FORMAT JSON) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+EXPLAINABLE = ("SELECT", "WITH")
+LIBRARY_PATHS = (os.sep + "sqlalchemy" + os.sep, "site-packages", os.path.abspath(__file__))
+MAX_STATEMENT_LENGTH = 4000
+MAX_CACHED_PLANS = 500
+MAX_PENDING_PLANS = 100
+
+def redact(parameters):
+    """Replace bind values with their type names so no customer data reaches the log"""
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {name: redact_value(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(p) if isinstance(p, (dict, list, tuple)) else redact_value(p) for p in parameters]
+    return redact_value(parameters)
+
+def redact_value(value) -> Optional[str]:
+    return None if value is None else f"<{type(value).__name__}>"
+
+def call_site() -> Optional[str]:
+    for frame in reversed(traceback.extract_stack()):
+        if not any(path in frame.filename for path in LIBRARY_PATHS):
+            return f"{frame.filename}:{frame.lineno} in {frame.name}"
+    return None
+
+class SlowQueryLog:
+    """Captures statements slower than a threshold into a bounded ring buffer.
+    
+    Each capture records the statement, its redacted bind parameters and the
+    application frame that issued it, and is written to the log as JSON. For
+    SELECTs an EXPLAIN plan is fetched by a background thread on its own
+    unpooled connection, so neither the slow request nor the shared pool
+    waits on it; the entry is logged once its plan arrives. Plans are cached
+    per statement for `explain_ttl` seconds to keep a hot slow query from
+    doubling its own load, and captures beyond `MAX_PENDING_PLANS` queued
+    ones go without a plan.
+    """
+    
+    def __init__(self, threshold_ms: float = 200, capacity: int = 100, explain: bool = True, explain_ttl: float = 300):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.explain_ttl = explain_ttl
+        self._entries = deque(maxlen=capacity)
+        self._plans: Dict[str, tuple] = {}
+        self._explain_engines: Dict[int, Engine] = {}
+        self._pending = queue.Queue(maxsize=MAX_PENDING_PLANS)
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def instrument_engine(self, engine: Engine):
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+        
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info.get("slow_query_start")
+            if not started:
+                return
+            elapsed = time.perf_counter() - started.pop()
+            if elapsed >= self.threshold:
+                self.record(engine, statement, parameters, elapsed, executemany)
+    
+    def record(self, engine: Engine, statement: str, parameters, elapsed: float, executemany: bool = False) -> SlowQuery:
+        entry = SlowQuery(
+            statement=statement[:MAX_STATEMENT_LENGTH],
+            parameters=redact(parameters),
+            duration_ms=round(elapsed * 1000, 3),
+            call_site=call_site()
+        )
+        with self._lock:
+            self._entries.append(entry)
+        if executemany or not self._explainable(engine, statement):
+            self._log(entry)
+            return entry
+        
+        cached = self._cached_plan(statement)
+        if cached is not None:
+            entry.plan = cached
+            self._log(entry)
+            return entry
+        try:
+            self._pending.put_nowait((entry, engine, statement, parameters))
+        except queue.Full:
+            self._log(entry)
+            return entry
+        self._start_worker()
+        return entry
+    
+    def recent(self, limit: Optional[int] = None) -> List[SlowQuery]:
+        """Newest first"""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def wait_for_plans(self):
+        """Block until every queued EXPLAIN has been attached to its entry"""
+        self._pending.join()
+    
+    def _explainable(self, engine: Engine, statement: str) -> bool:
+        return (
+            self.explain
+            and engine.dialect.name in EXPLAIN_PREFIXES
+            and statement.lstrip().upper().startswith(EXPLAINABLE)
+        )
+    
+    def _cached_plan(self, statement: str):
+        with self._lock:
+            cached = self._plans.get(statement)
+        if cached and time.monotonic() - cached[0] < self.explain_ttl:
+            return cached[1]
+        return None
+    
+    def _start_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._explain_pending, name="slow-query-explain", daemon=True)
+                self._worker.start()
+    
+    def _explain_pending(self):
+        while True:
+            entry, engine, statement, parameters = self._pending.get()
+            try:
+                entry.plan = self._cached_plan(statement)
+                if entry.plan is None:
+                    entry.plan = self._plan(engine, statement, parameters)
+                self._log(entry)
+            except Exception:
+                logger.exception("Slow query plan capture failed")
+            finally:
+                self._pending.task_done()
+    
+    def _plan(self, engine: Engine, statement: str, parameters):
+        explain_engine = self._explain_engines.get(id(engine))
+        if explain_engine is None:
+            # Unpooled and uninstrumented: EXPLAINs never hold one of the app's connections or time themselves
+            explain_engine = create_engine(engine.url, poolclass=NullPool)
+            self._explain_engines[id(engine)] = explain_engine
+        try:
+            with explain_engine.connect() as connection:
+                rows = connection.exec_driver_sql(EXPLAIN_PREFIXES[engine.dialect.name] + statement, parameters or ()).fetchall()
+        except Exception as e:
+            logger.debug("Could not EXPLAIN slow query: %s", e)
+            return None
+        
+        plan = rows[0][0] if len(rows) == 1 and len(rows[0]) == 1 else [list(row) for row in rows]
+        with self._lock:
+            if len(self._plans) >= MAX_CACHED_PLANS:
+                self._plans.clear()
+            self._plans[statement] = (time.monotonic(), plan)
+        return plan
+    
+    def _log(self, entry: SlowQuery):
+        logger.warning("Slow query: %s", json.dumps(asdict(entry), default=str))
@@ -0,0 +1,160 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+from domain.models import ReceivedJob, RawImageAnalysisJob
+from domain.ports import JobSourcePort
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_messages (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    body TEXT NOT NULL,
+    visible_at REAL NOT NULL,
+    receive_count INTEGER NOT NULL DEFAULT 0,
+    receipt_handle TEXT,
+    last_error TEXT,
+    sent_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_queue_messages_queue_visible_at ON queue_messages (queue, visible_at);
+CREATE INDEX IF NOT EXISTS ix_queue_messages_receipt_handle ON queue_messages (receipt_handle);
+"""
+
+class SQLiteJobQueue(JobSourcePort):
+    """Local SQS stand-in backed by a SQLite file.
+    
+    Speaks enough of the boto3 SQS client (send_message, send_message_batch)
+    to sit behind the SQS queue adapters, and implements JobSourcePort with
+    long polling, visibility timeouts and a dead-letter queue so the analysis
+    consumer can be exercised and load-tested without AWS. Several processes
+    may share one file; receives take a write lock so each message is handed
+    to a single consumer at a time.
+    """
+    
+    def __init__(self, path: str, queue_name: str = "analysis", poll_interval: float = 0.1):
+        self.path = path
+        self.queue_name = queue_name
+        self.dead_letter_name = f"{queue_name}-dlq"
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._sent = threading.Condition()
+        with self._connection() as db:
+            db.executescript(SCHEMA)
+    
+    def send_message(self, QueueUrl: str, MessageBody: str, **kwargs) -> Dict:
+        message_id = str(uuid.uuid4())
+        now = time.time()
+        with self._connection() as db:
+            db.execute(
+                "INSERT INTO queue_messages (id, queue, body, visible_at, sent_at) VALUES (?, ?, ?, ?, ?)",
+                (message_id, self.queue_name, MessageBody, now, now)
+            )
+        self._notify_sent()
+        return {"MessageId": message_id}
+    
+    def send_message_batch(self, QueueUrl: str, Entries: List[Dict]) -> Dict:
+        now = time.time()
+        rows = [(str(uuid.uuid4()), self.queue_name, entry["MessageBody"], now, now) for entry in Entries]
+        with self._connection() as db:
+            db.executemany(
+                "INSERT INTO queue_messages (id, queue, body, visible_at, sent_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        self._notify_sent()
+        return {
+            "Successful": [{"Id": entry["Id"], "MessageId": row[0]} for entry, row in zip(Entries, rows)],
+            "Failed": []
+        }
+    
+    def receive(self, max_messages: int = 10, wait_seconds: int = 20, visibility_timeout: int = 60) -> List[ReceivedJob]:
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            jobs = self._claim(max_messages, visibility_timeout)
+            remaining = deadline - time.monotonic()
+            if jobs or remaining <= 0:
+                return jobs
+            # Sends from this process wake us straight away; other processes are picked up by polling
+            with self._sent:
+                self._sent.wait(min(self.poll_interval, remaining))
+    
+    def delete(self, receipt_handle: str) -> None:
+        with self._connection() as db:
+            db.execute("DELETE FROM queue_messages WHERE receipt_handle = ?", (receipt_handle,))
+    
+    def extend_visibility(self, receipt_handle: str, visibility_timeout: int) -> None:
+        with self._connection() as db:
+            db.execute(
+                "UPDATE queue_messages SET visible_at = ? WHERE receipt_handle = ?",
+                (time.time() + visibility_timeout, receipt_handle)
+            )
+    
+    def dead_letter(self, job: ReceivedJob, reason: str) -> None:
+        with self._connection() as db:
+            db.execute(
+                "UPDATE queue_messages SET queue = ?, last_error = ?, receipt_handle = NULL WHERE receipt_handle = ?",
+                (self.dead_letter_name, reason[:1000], job.receipt_handle)
+            )
+    
+    def depth(self, queue_name: Optional[str] = None) -> int:
+        """Messages waiting or in flight on the queue (or on the named queue, e.g. the DLQ)"""
+        with self._connection() as db:
+            row = db.execute(
+                "SELECT COUNT(*) FROM queue_messages WHERE queue = ?", (queue_name or self.queue_name,)
+            ).fetchone()
+        return row[0]
+    
+    def _claim(self, max_messages: int, visibility_timeout: int) -> List[ReceivedJob]:
+        now = time.time()
+        db = self._connection()
+        # BEGIN IMMEDIATE takes the write lock up front so two consumers can't claim the same rows
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute(
+                "SELECT id, body, receive_count FROM queue_messages "
+                "WHERE queue = ? AND visible_at <= ? ORDER BY visible_at LIMIT ?",
+                (self.queue_name, now, max_messages)
+            ).fetchall()
+            jobs = []
+            for message_id, body, receive_count in rows:
+                receipt_handle = str(uuid.uuid4())
+                db.execute(
+                    "UPDATE queue_messages SET visible_at = ?, receive_count = ?, receipt_handle = ? WHERE id = ?",
+                    (now + visibility_timeout, receive_count + 1, receipt_handle, message_id)
+                )
+                jobs.append(ReceivedJob(message_id, receipt_handle, body, receive_count + 1))
+            db.execute("COMMIT")
+            return jobs
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+    
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; autocommit mode with explicit transactions in _claim
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+    
+    def _notify_sent(self):
+        with self._sent:
+            self._sent.notify_all()
+
+class SQLiteNotificationAdapter:
+    """Delivers raw image notifications onto a local queue, like an SNS topic with an SQS subscription"""
+    
+    def __init__(self, queue: SQLiteJobQueue):
+        self.queue = queue
+    
+    def send_notification(self, job: RawImageAnalysisJob):
+        message = {
+            "raw_image_key": job.raw_image_key,
+            "filename": job.filename,
+            "analysis_type": job.analysis_type,
+            "dedupe_id": job.dedupe_id,
+            "traceparent": job.traceparent
+        }
+        return self.queue.send_message(QueueUrl=self.queue.queue_name, MessageBody=json.dumps(message))
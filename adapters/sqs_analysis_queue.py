@@ -1,29 +1,53 @@
 import boto3
 import json
+from typing import Dict
 from domain.ports import ProductAnalysisQueuePort
 from domain.models import ProductAnalysisJob
+from .sqs_send_buffer import SQSSendBuffer
 
 class SQSAnalysisQueueAdapter(ProductAnalysisQueuePort):
-    def __init__(self, queue_url: str):
-        self.sqs = boto3.client('sqs')
+    def __init__(self, queue_url: str, client=None):
+        self.sqs = client or boto3.client('sqs')
         self.queue_url = queue_url
     
     def queue_analysis(self, job: ProductAnalysisJob) -> None:
+        self.sqs.send_message(QueueUrl=self.queue_url, **self._build_entry(job))
+    
+    def _build_entry(self, job: ProductAnalysisJob) -> Dict:
         message = {
             'product_id': job.product_id,
             'sku_id': job.sku_id,
             'image_urls': job.image_urls,
             'analysis_type': job.analysis_type,
+            'dedupe_id': job.dedupe_id,
+            'traceparent': job.traceparent,
             'timestamp': str(job.__dict__.get('timestamp', 'now'))
         }
         
-        self.sqs.send_message(
-            QueueUrl=self.queue_url,
-            MessageBody=json.dumps(message),
-            MessageAttributes={
+        entry = {
+            'MessageBody': json.dumps(message),
+            'MessageAttributes': {
                 'analysis_type': {
                     'StringValue': job.analysis_type,
                     'DataType': 'String'
                 }
             }
-        )
+        }
+        if job.dedupe_id and self.queue_url.endswith('.fifo'):
+            # FIFO queues drop redelivered outbox messages themselves
+            entry['MessageDeduplicationId'] = job.dedupe_id
+            entry['MessageGroupId'] = job.product_id
+        return entry
+
+class BufferedSQSAnalysisQueueAdapter(SQSAnalysisQueueAdapter):
+    """Queues analysis jobs through a client-side buffer that sends them in batches"""
+    
+    def __init__(self, queue_url: str, client=None, **buffer_options):
+        super().__init__(queue_url, client)
+        self.buffer = SQSSendBuffer(self.sqs, queue_url, **buffer_options)
+    
+    def queue_analysis(self, job: ProductAnalysisJob) -> None:
+        self.buffer.put(self._build_entry(job))
+    
+    def close(self):
+        self.buffer.close()
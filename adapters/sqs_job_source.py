@@ -0,0 +1,55 @@
+import boto3
+from typing import List, Optional
+from domain.models import ReceivedJob
+from domain.ports import JobSourcePort
+
+# SQS caps long polling at 20 seconds and receives at 10 messages per call
+MAX_WAIT_SECONDS = 20
+MAX_RECEIVE_MESSAGES = 10
+
+class SQSJobSource(JobSourcePort):
+    def __init__(self, queue_url: str, dead_letter_queue_url: Optional[str] = None, client=None):
+        self.sqs = client or boto3.client('sqs')
+        self.queue_url = queue_url
+        self.dead_letter_queue_url = dead_letter_queue_url
+    
+    def receive(self, max_messages: int = 10, wait_seconds: int = 20, visibility_timeout: int = 60) -> List[ReceivedJob]:
+        response = self.sqs.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=min(max_messages, MAX_RECEIVE_MESSAGES),
+            WaitTimeSeconds=min(wait_seconds, MAX_WAIT_SECONDS),
+            VisibilityTimeout=visibility_timeout,
+            AttributeNames=['ApproximateReceiveCount']
+        )
+        return [
+            ReceivedJob(
+                message_id=message['MessageId'],
+                receipt_handle=message['ReceiptHandle'],
+                body=message['Body'],
+                receive_count=int(message.get('Attributes', {}).get('ApproximateReceiveCount', 1))
+            )
+            for message in response.get('Messages', [])
+        ]
+    
+    def delete(self, receipt_handle: str) -> None:
+        self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=receipt_handle)
+    
+    def extend_visibility(self, receipt_handle: str, visibility_timeout: int) -> None:
+        self.sqs.change_message_visibility(
+            QueueUrl=self.queue_url,
+            ReceiptHandle=receipt_handle,
+            VisibilityTimeout=visibility_timeout
+        )
+    
+    def dead_letter(self, job: ReceivedJob, reason: str) -> None:
+        if not self.dead_letter_queue_url:
+            # Leave it to the queue's redrive policy on the next receives
+            return
+        self.sqs.send_message(
+            QueueUrl=self.dead_letter_queue_url,
+            MessageBody=job.body,
+            MessageAttributes={
+                'failure_reason': {'StringValue': reason[:256] or 'unknown', 'DataType': 'String'}
+            }
+        )
+        self.delete(job.receipt_handle)
@@ -1,19 +1,35 @@
 import boto3
 import json
+from typing import Dict
 from domain.ports import QueuePort
 from domain.models import ProcessingJob
+from .sqs_send_buffer import SQSSendBuffer
 
 class SQSQueueAdapter(QueuePort):
-    def __init__(self, queue_url: str):
-        self.sqs = boto3.client('sqs')
+    def __init__(self, queue_url: str, client=None):
+        self.sqs = client or boto3.client('sqs')
         self.queue_url = queue_url
     
     def queue_job(self, job: ProcessingJob) -> None:
+        self.sqs.send_message(QueueUrl=self.queue_url, **self._build_entry(job))
+    
+    def _build_entry(self, job: ProcessingJob) -> Dict:
         message = {
             'image_key': job.image_key,
-            'filename': job.filename
+            'filename': job.filename,
+            'traceparent': job.traceparent
         }
-        self.sqs.send_message(
-            QueueUrl=self.queue_url,
-            MessageBody=json.dumps(message)
-        )
+        return {'MessageBody': json.dumps(message)}
+
+class BufferedSQSQueueAdapter(SQSQueueAdapter):
+    """Queues jobs through a client-side buffer that sends them in batches"""
+    
+    def __init__(self, queue_url: str, client=None, **buffer_options):
+        super().__init__(queue_url, client)
+        self.buffer = SQSSendBuffer(self.sqs, queue_url, **buffer_options)
+    
+    def queue_job(self, job: ProcessingJob) -> None:
+        self.buffer.put(self._build_entry(job))
+    
+    def close(self):
+        self.buffer.close()
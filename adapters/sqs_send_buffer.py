@@ -0,0 +1,153 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# SQS limits for a single SendMessageBatch call
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_BYTES = 256 * 1024
+
+class SendBufferFullError(Exception):
+    """Raised when the send buffer is full"""
+    pass
+
+def entry_size(entry: Dict) -> int:
+    size = len(entry['MessageBody'].encode('utf-8'))
+    for name, attribute in entry.get('MessageAttributes', {}).items():
+        size += len(name) + len(attribute.get('DataType', '')) + len(str(attribute.get('StringValue', '')))
+    return size
+
+class SQSSendBuffer:
+    """Coalesces queued messages into SendMessageBatch calls on a background thread.
+    
+    A batch is sent once it holds 10 entries, would exceed 256 KB, or the
+    flush interval elapses. Entries SQS reports as failed are retried with
+    exponential backoff. When the buffer is full, put() raises SendBufferFullError
+    straight away, without blocking the caller's event loop, so clients back off
+    instead of memory growing.
+    """
+    
+    def __init__(
+        self,
+        client,
+        queue_url: str,
+        flush_interval: float = 0.05,
+        max_buffered: int = 1000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.1,
+        on_failure: Optional[Callable[[List[Dict], str], None]] = None
+    ):
+        self.client = client
+        self.queue_url = queue_url
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.on_failure = on_failure or self._log_failure
+        self._pending: queue.Queue = queue.Queue(maxsize=max_buffered)
+        self._carry: Optional[Dict] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def put(self, entry: Dict) -> None:
+        """Buffer one entry with MessageBody and optional MessageAttributes"""
+        if entry_size(entry) > MAX_BATCH_BYTES:
+            raise ValueError("Message exceeds the SQS size limit")
+        self._ensure_started()
+        try:
+            self._pending.put_nowait(entry)
+        except queue.Full:
+            raise SendBufferFullError(f"SQS send buffer for {self.queue_url} is full")
+    
+    def flush(self) -> None:
+        """Block until every buffered entry has been sent or given up on"""
+        if self._thread:
+            self._pending.join()
+    
+    def close(self) -> None:
+        if not self._thread:
+            return
+        self.flush()
+        self._stopped.set()
+        self._thread.join()
+    
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sqs-send-buffer", daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            try:
+                self._send(batch)
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+    
+    def _collect_batch(self) -> List[Dict]:
+        first = self._carry
+        self._carry = None
+        if first is None:
+            try:
+                first = self._pending.get(timeout=self.flush_interval)
+            except queue.Empty:
+                return []
+        
+        batch = [first]
+        batch_bytes = entry_size(first)
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < MAX_BATCH_ENTRIES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            size = entry_size(entry)
+            if batch_bytes + size > MAX_BATCH_BYTES:
+                # Starts the next batch, which also accounts for its task_done
+                self._carry = entry
+                break
+            batch.append(entry)
+            batch_bytes += size
+        return batch
+    
+    def _send(self, batch: List[Dict]):
+        entries = {str(i): entry for i, entry in enumerate(batch)}
+        error = ""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+            try:
+                response = self.client.send_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[{'Id': entry_id, **entry} for entry_id, entry in entries.items()]
+                )
+            except Exception as e:
+                error = str(e)
+                continue
+            
+            retryable = {}
+            for failure in response.get('Failed', []):
+                error = failure.get('Message', failure.get('Code', 'unknown error'))
+                if failure.get('SenderFault'):
+                    # Malformed entries will never succeed; report them straight away
+                    self.on_failure([entries[failure['Id']]], error)
+                else:
+                    retryable[failure['Id']] = entries[failure['Id']]
+            entries = retryable
+            if not entries:
+                return
+        
+        self.on_failure(list(entries.values()), error)
+    
+    def _log_failure(self, entries: List[Dict], error: str):
+        logger.error("Dropped %d SQS message(s) for %s: %s", len(entries), self.queue_url, error)
@@ -0,0 +1,97 @@
+import functools
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MAX_STATEMENT_LENGTH = 2000
+
+def instrument_engine(engine: Engine, tracer):
+    """A client span per SQL statement, parented to whatever span is current"""
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        span = tracer.start_span(f"db {operation}", "client", {
+            "db.system": engine.dialect.name,
+            "db.operation": operation,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+        })
+        conn.info.setdefault("trace_spans", []).append(span)
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            tracer.end_span(spans.pop())
+    
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        spans = exception_context.connection.info.get("trace_spans") if exception_context.connection else None
+        if spans:
+            tracer.end_span(spans.pop(), exception_context.original_exception)
+
+class TracedAdapter:
+    """Proxies an adapter, wrapping each public method call in a client span named component.method"""
+    
+    def __init__(self, target, component: str, tracer):
+        self._target = target
+        self._component = component
+        self._tracer = tracer
+    
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+        
+        @functools.wraps(attribute)
+        def traced_call(*args, **kwargs):
+            with self._tracer.span(f"{self._component}.{name}", "client", component=self._component):
+                return attribute(*args, **kwargs)
+        return traced_call
+
+def traced(target, component: str, tracer):
+    """Wrap `target` for tracing; returns it untouched when tracing is off or it is None"""
+    if target is None or not tracer.enabled:
+        return target
+    return TracedAdapter(target, component, tracer)
+
+class TracingMiddleware:
+    """Opens a server span per HTTP request, continuing any incoming W3C traceparent"""
+    
+    def __init__(self, app, tracer):
+        self.app = app
+        self.tracer = tracer
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope.get("headers") or [])
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1") or None
+        span = self.tracer.start_span(scope["method"], "server", {
+            "http.request.method": scope["method"],
+            "url.path": scope["path"],
+        }, traceparent)
+        
+        async def record_status(message):
+            if message["type"] == "http.response.start":
+                span.attributes["http.response.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    span.status = "error"
+            await send(message)
+        
+        token = self.tracer.activate(span)
+        error = None
+        try:
+            await self.app(scope, receive, record_status)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.tracer.deactivate(token)
+            route = scope.get("route")
+            if route is not None:
+                # Named after the route template once routing has matched it
+                span.name = f"{scope['method']} {route.path}"
+                span.attributes["http.route"] = route.path
+            self.tracer.end_span(span, error)
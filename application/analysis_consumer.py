@@ -0,0 +1,259 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from domain.models import ProductAnalysisJob, RawImageAnalysisJob, ReceivedJob, Recommendation
+from domain.ports import JobSourcePort, JobAnalyzerPort
+from .tracing import Tracer
+
+logger = logging.getLogger(__name__)
+
+class PoisonMessageError(Exception):
+    """Raised for messages that can never be processed and go straight to the dead-letter queue"""
+    pass
+
+def parse_job(body: str) -> Union[ProductAnalysisJob, RawImageAnalysisJob]:
+    """Turn a queue message body into its analysis job, unwrapping SNS envelopes"""
+    try:
+        message = json.loads(body)
+        if message.get("Type") == "Notification" and "Message" in message:
+            message = json.loads(message["Message"])
+    except (TypeError, ValueError) as e:
+        raise PoisonMessageError(f"Message body is not JSON: {e}")
+    
+    job_class = RawImageAnalysisJob if "raw_image_key" in message else ProductAnalysisJob
+    known = {field.name for field in fields(job_class)}
+    try:
+        return job_class(**{k: v for k, v in message.items() if k in known})
+    except TypeError as e:
+        raise PoisonMessageError(f"Message is not a {job_class.__name__}: {e}")
+
+class AnalysisJobConsumer:
+    """Consumes analysis jobs from a queue and stores the resulting recommendations.
+    
+    A poller long-polls the source for as many messages as there are free
+    workers, so at most `concurrency` jobs are in flight. Results are saved in
+    batches of `batch_size` (or every `flush_interval` seconds) and a message
+    is only deleted once its result is committed, giving at-least-once
+    processing. Visibility is extended for jobs still in flight, failed jobs
+    are retried after `retry_delay`, and messages received `max_receives`
+    times or that can't be parsed are dead-lettered.
+    """
+    
+    def __init__(
+        self,
+        source: JobSourcePort,
+        analyzer: JobAnalyzerPort,
+        save_results: Callable[[List[Recommendation]], None],
+        concurrency: int = 4,
+        batch_size: int = 25,
+        flush_interval: float = 1.0,
+        wait_seconds: int = 20,
+        visibility_timeout: int = 60,
+        retry_delay: int = 10,
+        max_receives: int = 5,
+        tracer: Optional[Tracer] = None
+    ):
+        self.source = source
+        self.analyzer = analyzer
+        self.save_results = save_results
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.wait_seconds = wait_seconds
+        self.visibility_timeout = visibility_timeout
+        self.retry_delay = retry_delay
+        self.max_receives = max_receives
+        self.tracer = tracer or Tracer()
+        self._slots = threading.Semaphore(concurrency)
+        self._workers: Optional[ThreadPoolExecutor] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._results: List[Tuple[ReceivedJob, Recommendation]] = []
+        # receipt handle -> monotonic time its visibility was last set
+        self._in_flight: Dict[str, float] = {}
+        self._last_flush = time.monotonic()
+        # Outbox redeliveries reuse their dedupe id. Saving enforces it across workers and restarts;
+        # remembering recent ones here only saves re-analysing repeats this process already saved
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._seen_limit = 10000
+        self.processed = 0
+        self.dead_lettered = 0
+    
+    def start(self):
+        if self._thread is None:
+            self._stopped.clear()
+            self._workers = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="analysis-worker")
+            self._thread = threading.Thread(target=self._run, name="analysis-consumer", daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop polling, let in-flight jobs finish and save their results"""
+        if not self._thread:
+            return
+        self._stopped.set()
+        self._thread.join(timeout)
+        self._workers.shutdown(wait=True)
+        self.flush()
+        self._thread = None
+    
+    def poll_once(self) -> int:
+        """Receive up to one message per free worker and hand them out; returns how many arrived"""
+        free = self._acquire_slots()
+        if not free:
+            return 0
+        try:
+            jobs = self.source.receive(free, self.wait_seconds, self.visibility_timeout)
+        except Exception:
+            self._release_slots(free)
+            raise
+        self._release_slots(free - len(jobs))
+        
+        now = time.monotonic()
+        with self._lock:
+            for job in jobs:
+                self._in_flight[job.receipt_handle] = now
+        for job in jobs:
+            self._workers.submit(self._process, job)
+        return len(jobs)
+    
+    def flush(self):
+        """Save buffered results in one batch, then delete their messages"""
+        with self._lock:
+            batch, self._results = self._results, []
+            self._last_flush = time.monotonic()
+        if not batch:
+            return
+        
+        try:
+            self.save_results([recommendation for _, recommendation in batch])
+        except Exception:
+            # Messages stay on the queue and are redelivered once their visibility lapses
+            logger.exception("Failed to save %d recommendation(s)", len(batch))
+            with self._lock:
+                for job, _ in batch:
+                    self._in_flight.pop(job.receipt_handle, None)
+            return
+        
+        for job, recommendation in batch:
+            self._finish(job)
+            if recommendation.dedupe_id:
+                self._remember(recommendation.dedupe_id)
+        self.processed += len(batch)
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.poll_once()
+                self._extend_expiring()
+                if time.monotonic() - self._last_flush >= self.flush_interval:
+                    self.flush()
+            except Exception:
+                logger.exception("Analysis consumer poll failed")
+                self._stopped.wait(1)
+    
+    def _process(self, job: ReceivedJob):
+        try:
+            self._handle(job)
+        finally:
+            self._slots.release()
+    
+    def _handle(self, job: ReceivedJob):
+        try:
+            analysis_job = parse_job(job.body)
+        except PoisonMessageError as e:
+            self._dead_letter(job, str(e))
+            return
+        
+        if analysis_job.dedupe_id and self._is_duplicate(analysis_job.dedupe_id):
+            self._finish(job)
+            return
+        
+        try:
+            # Continues the trace of the request that queued the job
+            with self.tracer.span(
+                f"analysis.process {analysis_job.analysis_type}", "consumer",
+                traceparent=analysis_job.traceparent, **{"messaging.message.id": job.message_id}
+            ):
+                recommendation = self.analyzer.analyze(analysis_job)
+        except Exception as e:
+            if job.receive_count >= self.max_receives:
+                self._dead_letter(job, f"Failed after {job.receive_count} attempts: {e}")
+            else:
+                logger.warning("Analysis of message %s failed, retrying: %s", job.message_id, e)
+                self._retry_later(job)
+            return
+        
+        recommendation.dedupe_id = analysis_job.dedupe_id
+        with self._lock:
+            self._results.append((job, recommendation))
+            full = len(self._results) >= self.batch_size
+        if full:
+            self.flush()
+    
+    def _finish(self, job: ReceivedJob):
+        with self._lock:
+            self._in_flight.pop(job.receipt_handle, None)
+        try:
+            self.source.delete(job.receipt_handle)
+        except Exception:
+            logger.exception("Failed to delete message %s", job.message_id)
+    
+    def _retry_later(self, job: ReceivedJob):
+        with self._lock:
+            self._in_flight.pop(job.receipt_handle, None)
+        try:
+            self.source.extend_visibility(job.receipt_handle, self.retry_delay)
+        except Exception:
+            logger.exception("Failed to reschedule message %s", job.message_id)
+    
+    def _dead_letter(self, job: ReceivedJob, reason: str):
+        logger.error("Dead-lettering message %s: %s", job.message_id, reason)
+        with self._lock:
+            self._in_flight.pop(job.receipt_handle, None)
+        self.source.dead_letter(job, reason)
+        self.dead_lettered += 1
+    
+    def _extend_expiring(self):
+        """Keep jobs that are still running or awaiting a flush from being redelivered"""
+        now = time.monotonic()
+        with self._lock:
+            expiring = [
+                receipt for receipt, since in self._in_flight.items()
+                if now - since >= self.visibility_timeout / 2
+            ]
+            for receipt in expiring:
+                self._in_flight[receipt] = now
+        for receipt in expiring:
+            try:
+                self.source.extend_visibility(receipt, self.visibility_timeout)
+            except Exception:
+                logger.exception("Failed to extend visibility")
+    
+    def _acquire_slots(self) -> int:
+        # Block briefly for the first free worker, then take whatever else is free
+        if not self._slots.acquire(timeout=0.5):
+            return 0
+        free = 1
+        while free < self.concurrency and self._slots.acquire(blocking=False):
+            free += 1
+        return free
+    
+    def _release_slots(self, count: int):
+        for _ in range(count):
+            self._slots.release()
+    
+    def _is_duplicate(self, dedupe_id: str) -> bool:
+        with self._lock:
+            return dedupe_id in self._seen
+    
+    def _remember(self, dedupe_id: str):
+        with self._lock:
+            self._seen[dedupe_id] = None
+            if len(self._seen) > self._seen_limit:
+                self._seen.popitem(last=False)
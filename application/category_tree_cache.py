@@ -0,0 +1,38 @@
+import threading
+import time
+from typing import Callable, List, Optional
+from domain.models import CategoryNode
+
+class CategoryTreeCache:
+    """Holds the assembled category tree between changes.
+    
+    Local writes invalidate it immediately; `ttl` bounds how stale it can
+    get when another process changed the catalog. Concurrent misses share
+    one rebuild.
+    """
+    
+    def __init__(self, load: Callable[[], List[CategoryNode]], ttl: float = 300.0):
+        self.load = load
+        self.ttl = ttl
+        self._tree: Optional[List[CategoryNode]] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    def get(self) -> List[CategoryNode]:
+        tree = self._tree
+        if tree is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return tree
+        with self._lock:
+            if self._tree is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._tree
+            generation = self._generation
+            tree = self.load()
+            # An invalidation that raced the load means this tree may already be stale
+            if generation == self._generation:
+                self._tree, self._loaded_at = tree, time.monotonic()
+            return tree
+    
+    def invalidate(self):
+        self._generation += 1
+        self._tree = None
@@ -0,0 +1,87 @@
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+from domain.models import ImageUpload
+from domain.ports import StoragePort, ImageProcessorPort
+
+logger = logging.getLogger(__name__)
+
+class ImageDerivativeService:
+    """Renders thumbnail/zoom/web renditions off the request path.
+
+    Resizing runs in a process pool so it scales across cores; uploading the
+    results and recording their URLs happens on a small I/O thread pool.
+    """
+
+    def __init__(
+        self,
+        storage: StoragePort,
+        processor: ImageProcessorPort,
+        on_complete: Callable[[str, Dict[str, str]], None],
+        max_workers: Optional[int] = None
+    ):
+        self.storage = storage
+        self.processor = processor
+        self.on_complete = on_complete
+        self.max_workers = max_workers
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-derivatives")
+        self._lock = threading.Lock()
+
+    @property
+    def renditions(self) -> List[str]:
+        return self.processor.rendition_names()
+
+    def submit(self, product_id: str, raw_image: ImageUpload, skip: Iterable[str] = ()) -> Future:
+        """Queue rendition generation for a raw upload; renditions named in skip are not stored"""
+        raw_image.content.seek(0)
+        content = raw_image.content.read()
+        # Rewind so the caller can still store the raw upload itself
+        raw_image.content.seek(0)
+
+        skip = set(skip)
+        future = self._get_process_pool().submit(self.processor.render_derivatives, content)
+        future.add_done_callback(
+            lambda done: self._io_pool.submit(self._store, product_id, raw_image.filename, done, skip)
+        )
+        return future
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._process_pool:
+                self._process_pool.shutdown(wait=wait)
+                self._process_pool = None
+        self._io_pool.shutdown(wait=wait)
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        # Created lazily so importing the app never forks workers
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+
+    def _store(self, product_id: str, filename: str, rendered: Future, skip: set):
+        try:
+            renditions = rendered.result()
+            stem = os.path.splitext(filename or "image")[0]
+            uploads = {
+                name: ImageUpload(
+                    filename=f"{stem}-{name}.jpg",
+                    content=io.BytesIO(data),
+                    content_type="image/jpeg"
+                )
+                for name, data in renditions.items() if name not in skip
+            }
+            if not uploads:
+                return
+            image_urls = self.storage.store_product_images(uploads)
+            self.on_complete(product_id, image_urls)
+        except Exception:
+            logger.exception("Failed to generate image derivatives for product %s", product_id)
@@ -0,0 +1,119 @@
+import logging
+import threading
+import uuid
+from dataclasses import asdict
+from typing import Callable, ContextManager, Dict, Optional
+from domain.models import OutboxMessage, ProductAnalysisJob, RawImageAnalysisJob
+from domain.ports import OutboxPort, ProductAnalysisQueuePort
+from .tracing import Tracer, current_traceparent
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_ANALYSIS = "product_analysis"
+RAW_IMAGE_ANALYSIS = "raw_image_analysis"
+
+def product_analysis_message(job: ProductAnalysisJob) -> OutboxMessage:
+    return OutboxMessage(id=str(uuid.uuid4()), destination=PRODUCT_ANALYSIS, payload=traced_payload(job))
+
+def raw_image_analysis_message(job: RawImageAnalysisJob) -> OutboxMessage:
+    return OutboxMessage(id=str(uuid.uuid4()), destination=RAW_IMAGE_ANALYSIS, payload=traced_payload(job))
+
+def traced_payload(job) -> Dict:
+    """The job as a dict, carrying the current trace so its relay and analysis join it"""
+    return {**asdict(job), "traceparent": job.traceparent or current_traceparent()}
+
+def job_dispatchers(
+    analysis_queue: ProductAnalysisQueuePort,
+    notifications=None
+) -> Dict[str, Callable[[OutboxMessage], None]]:
+    """Map outbox destinations to the queue/SNS adapters; the outbox id becomes the dedupe id"""
+    dispatchers = {
+        PRODUCT_ANALYSIS: lambda message: analysis_queue.queue_analysis(
+            ProductAnalysisJob(**{**message.payload, "dedupe_id": message.id})
+        )
+    }
+    if notifications is not None:
+        dispatchers[RAW_IMAGE_ANALYSIS] = lambda message: notifications.send_notification(
+            RawImageAnalysisJob(**{**message.payload, "dedupe_id": message.id})
+        )
+    return dispatchers
+
+class OutboxRelay:
+    """Drains committed outbox rows to the queue/SNS adapters on a background thread.
+    
+    Requests only write the outbox row, so queue latency and outages stay off
+    the request path. A message is deleted once its send succeeds; failed sends
+    are retried with exponential backoff until max_attempts, after which the
+    row is left in place for inspection. Delivery is at-least-once, so
+    consumers should dedupe on the job's dedupe_id.
+    """
+    
+    def __init__(
+        self,
+        open_outbox: Callable[[], ContextManager[OutboxPort]],
+        dispatchers: Dict[str, Callable[[OutboxMessage], None]],
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        max_attempts: int = 10,
+        retry_backoff: float = 2.0,
+        tracer: Optional[Tracer] = None
+    ):
+        self.open_outbox = open_outbox
+        self.dispatchers = dispatchers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.tracer = tracer or Tracer()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        if not self._thread:
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def notify(self):
+        """Wake the relay after committing new outbox rows instead of waiting for the next poll"""
+        self._wake.set()
+    
+    def relay_once(self) -> int:
+        """Send pending messages until a batch comes back short; returns how many were claimed"""
+        claimed = 0
+        while True:
+            with self.open_outbox() as outbox:
+                count = outbox.relay_pending(
+                    self._dispatch,
+                    list(self.dispatchers),
+                    self.batch_size,
+                    self.max_attempts,
+                    self.retry_backoff
+                )
+            claimed += count
+            if count < self.batch_size:
+                return claimed
+    
+    def _dispatch(self, message: OutboxMessage):
+        with self.tracer.span(
+            f"outbox.relay {message.destination}", "producer",
+            traceparent=message.payload.get("traceparent"), **{"messaging.message.id": message.id}
+        ):
+            self.dispatchers[message.destination](message)
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.relay_once()
+            except Exception:
+                logger.exception("Outbox relay pass failed")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
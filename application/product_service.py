@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from domain.models import Product, ProductStatus, ProductAnalysisJob
 from domain.ports import ProductRepositoryPort, ProductAnalysisQueuePort
 
@@ -21,8 +21,11 @@ class ProductService:
         
         return created_product
     
-    def get_product(self, product_id: str) -> Optional[Product]:
-        return self.repository.get_by_id(product_id)
+    def get_product(self, product_id: str, load: Iterable[str] = ()) -> Optional[Product]:
+        return self.repository.get_by_id(product_id, load=load)
+    
+    def list_products(self, load: Iterable[str] = ()) -> List[Product]:
+        return self.repository.get_all(load=load)
     
     def get_all_products(self) -> List[dict]:
         return self.repository.get_all_products()
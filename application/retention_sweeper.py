@@ -0,0 +1,84 @@
+import logging
+import threading
+from typing import Dict, Optional
+from domain.ports import RetentionPort
+
+logger = logging.getLogger(__name__)
+
+class RetentionSweeper:
+    """Periodically trims expired recommendations and old monthly partitions.
+    
+    Expired recommendations are deleted in batches of `batch_size`, each in its
+    own short transaction with a pause in between, and a sweep stops after
+    `max_batches` so it never monopolises the database. Partitions older than
+    their table's retention are detached concurrently and dropped, and the
+    upcoming months' partitions are created ahead of time.
+    """
+    
+    def __init__(
+        self,
+        retention: RetentionPort,
+        retention_months: Dict[str, int],
+        interval: float = 3600.0,
+        batch_size: int = 1000,
+        max_batches: int = 100,
+        batch_pause: float = 0.1
+    ):
+        self.retention = retention
+        self.retention_months = retention_months
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.batch_pause = batch_pause
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="retention-sweeper", daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        if not self._thread:
+            return
+        self._stopped.set()
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def sweep(self) -> Dict[str, object]:
+        """Run one sweep; each step is independent so one failing doesn't block the rest"""
+        summary: Dict[str, object] = {}
+        try:
+            summary["partitions_ensured"] = self.retention.ensure_partitions()
+        except Exception:
+            logger.exception("Creating upcoming partitions failed")
+        
+        try:
+            summary["expired_recommendations_deleted"] = self._delete_expired()
+        except Exception:
+            logger.exception("Deleting expired recommendations failed")
+        
+        dropped = []
+        for table, months in self.retention_months.items():
+            try:
+                dropped.extend(self.retention.drop_partitions_older_than(table, months))
+            except Exception:
+                logger.exception("Dropping old %s partitions failed", table)
+        summary["partitions_dropped"] = dropped
+        return summary
+    
+    def _delete_expired(self) -> int:
+        total = 0
+        for _ in range(self.max_batches):
+            deleted = self.retention.delete_expired_recommendations(self.batch_size)
+            total += deleted
+            if deleted < self.batch_size or self._stopped.wait(self.batch_pause):
+                break
+        return total
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            summary = self.sweep()
+            logger.info("Retention sweep finished: %s", summary)
+            self._stopped.wait(self.interval)
@@ -1,5 +1,6 @@
 from domain.models import ImageUpload, ProcessingJob
 from domain.ports import StoragePort, QueuePort
+from .tracing import current_traceparent
 
 class Service:
     """Base service class for compatibility"""
@@ -12,6 +13,6 @@ class ImageProcessingService:
     
     def upload_and_queue(self, image: ImageUpload) -> str:
         image_key = self.storage.store_image(image)
-        job = ProcessingJob(image_key=image_key, filename=image.filename)
+        job = ProcessingJob(image_key=image_key, filename=image.filename, traceparent=current_traceparent())
         self.queue.queue_job(job)
         return image_key
@@ -0,0 +1,116 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+from domain.models import Span
+from domain.ports import SpanExporterPort
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def format_traceparent(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(trace_id, parent span_id) from a W3C traceparent header, or None if it is malformed"""
+    parts = (value or "").strip().lower().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        if int(parts[1], 16) == 0 or int(parts[2], 16) == 0:
+            return None
+    except ValueError:
+        return None
+    return parts[1], parts[2]
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def current_traceparent() -> Optional[str]:
+    """Trace context to stamp on queued jobs so their processing joins the request's trace"""
+    span = _current_span.get()
+    return format_traceparent(span) if span else None
+
+class Tracer:
+    """Creates OpenTelemetry-compatible spans and hands finished ones to an exporter.
+    
+    Spans nest through a contextvar, so work done in FastAPI's threadpool and
+    in asyncio tasks is parented to the request span automatically; threads
+    started by background workers begin new traces unless given a
+    traceparent. Without an exporter every call is a no-op that yields None.
+    """
+    
+    def __init__(self, exporter: Optional[SpanExporterPort] = None):
+        self.exporter = exporter
+    
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+    
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: Optional[Dict] = None,
+        traceparent: Optional[str] = None
+    ) -> Optional[Span]:
+        """Start a span under `traceparent` if given, else under the current span"""
+        if self.exporter is None:
+            return None
+        remote = parse_traceparent(traceparent) if traceparent else None
+        parent = _current_span.get()
+        if remote:
+            trace_id, parent_id = remote
+        elif parent:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent_id,
+            kind=kind,
+            start_time=time.time_ns(),
+            attributes=dict(attributes or {})
+        )
+    
+    def end_span(self, span: Optional[Span], error: Optional[BaseException] = None):
+        if span is None:
+            return
+        span.end_time = time.time_ns()
+        if error is not None:
+            span.status = "error"
+            span.status_message = f"{type(error).__name__}: {error}"
+        try:
+            self.exporter.export([span])
+        except Exception:
+            logger.exception("Span export failed")
+    
+    def activate(self, span: Optional[Span]):
+        """Make `span` the parent of spans started in this context; returns a token for deactivate"""
+        return _current_span.set(span) if span else None
+    
+    def deactivate(self, token):
+        if token is not None:
+            _current_span.reset(token)
+    
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", traceparent: Optional[str] = None, **attributes) -> Iterator[Optional[Span]]:
+        span = self.start_span(name, kind, attributes, traceparent)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span, error)
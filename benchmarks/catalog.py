@@ -0,0 +1,186 @@
+"""Deterministic synthetic catalogs for load tests.
+
+The same CatalogSpec produces the same rows throughout a calendar month, so
+runs against different commits see identical data. Dates are anchored to the
+start of the current month, which keeps campaign metrics inside the months
+the partitioned tables cover. generate_catalog() inserts them with
+executemany in chunks and skips the work if the spec's catalog is already
+present, which lets a database be reused across runs.
+"""
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List
+from sqlalchemy import column, select, table
+from sqlalchemy.engine import Engine
+from adapters.database.entities import (
+    CampaignEntity, CampaignMetricEntity, CategoryEntity, PriceTableEntity, ProductEntity, ProductVariantEntity,
+    StockEntity
+)
+from adapters.database.partitions import ensure_partitions_for, month_start
+from domain.models import ProductStatus
+
+MATERIALS = ["silk", "cotton", "linen", "wool", "chiffon", "georgette", "velvet", "jute"]
+PATTERNS = ["floral", "paisley", "ikat", "block print", "stripes", "checks", "solid", "bandhani"]
+SCALES = ["small", "medium", "large"]
+FEATURES = ["handwoven", "organic", "zari", "embroidered", "reversible", "azo-free"]
+PLATFORMS = ["instagram", "facebook", "twitter"]
+CATEGORY_NAMES = ["Sarees", "Dupattas", "Fabrics", "Home", "Stoles", "Quilts"]
+
+partners = table(
+    "partners", column("id"), column("name"), column("code"), column("email"), column("is_active")
+)
+partner_stock = table(
+    "stock", column("id"), column("product_id"), column("variant_id"), column("partner_id"), column("partner_sku"),
+    column("quantity_available"), column("quantity_reserved"), column("reorder_level"),
+    column("wholesale_price"), column("retail_price"), column("currency")
+)
+
+@dataclass(frozen=True)
+class CatalogSpec:
+    products: int = 1000
+    variants_per_product: int = 4
+    partners: int = 10
+    campaigns: int = 20
+    metric_days: int = 90
+    seed: int = 42
+    
+    @property
+    def sku_prefix(self) -> str:
+        return f"BENCH-{self.seed}-"
+
+def stable_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+def random_hex(rng: random.Random) -> str:
+    return "#%06x" % rng.getrandbits(24)
+
+def catalog_rows(spec: CatalogSpec) -> Dict[str, List[dict]]:
+    """Rows per table name for `spec`; identical for identical specs"""
+    rng = random.Random(spec.seed)
+    now = datetime.combine(month_start(datetime.now(timezone.utc)), time.min, tzinfo=timezone.utc)
+    rows: Dict[str, List[dict]] = {name: [] for name in (
+        "categories", "partners", "products", "product_variants", "stocks", "price_tables", "stock",
+        "campaigns", "campaign_metrics"
+    )}
+    
+    category_ids = []
+    for name in CATEGORY_NAMES:
+        category_id = stable_uuid(rng)
+        category_ids.append(category_id)
+        rows["categories"].append({
+            "id": category_id, "name": f"{name} {spec.seed}", "description": None, "parent_id": None,
+            "path": f"{category_id}/", "depth": 0
+        })
+    
+    partner_ids = []
+    for i in range(spec.partners):
+        partner_id = stable_uuid(rng)
+        partner_ids.append(partner_id)
+        rows["partners"].append({
+            "id": partner_id, "name": f"Partner {i}", "code": f"{spec.sku_prefix}P{i:04d}",
+            "email": f"partner{i}@example.com", "is_active": True
+        })
+    
+    for i in range(spec.products):
+        product_id = stable_uuid(rng)
+        sku_id = f"{spec.sku_prefix}{i:06d}"
+        material, pattern = rng.choice(MATERIALS), rng.choice(PATTERNS)
+        colors = [random_hex(rng) for _ in range(3)]
+        rows["products"].append({
+            "id": product_id,
+            "sku_id": sku_id,
+            "title": f"{pattern.title()} {material} {rng.choice(CATEGORY_NAMES).lower()} {i}",
+            "description": f"Synthetic {material} product with a {pattern} pattern",
+            "material": material,
+            "pattern": pattern,
+            "color_primary": colors[0],
+            "colors": colors,
+            "width_estimate_cm": rng.randint(40, 280),
+            "scale": rng.choice(SCALES),
+            "special_features": rng.sample(FEATURES, rng.randint(0, 3)),
+            "image_urls": {"thumbnail": f"https://cdn.example.com/{sku_id}/thumb.jpg"},
+            "created_by": "benchmark",
+            "category_id": rng.choice(category_ids),
+            "status": rng.choice([ProductStatus.DRAFT, ProductStatus.PUBLISHED, ProductStatus.PUBLISHED]),
+            "enabled": True,
+        })
+        retail = Decimal(rng.randint(500, 20000))
+        rows["stocks"].append({
+            "id": stable_uuid(rng), "product_id": product_id, "current_stock": rng.randint(0, 500),
+            "reserved_stock": 0, "available_stock": 0, "updated_by": "benchmark"
+        })
+        rows["price_tables"].append({
+            "id": stable_uuid(rng), "product_id": product_id, "wholesale_price": retail * Decimal("0.6"),
+            "retail_price": retail, "currency": "INR", "created_by": "benchmark"
+        })
+        
+        for v in range(spec.variants_per_product):
+            variant_id = stable_uuid(rng)
+            color = random_hex(rng)
+            rows["product_variants"].append({
+                "id": variant_id, "product_id": product_id, "variant_name": f"Variant {v}", "color_code": color,
+                "color_name": f"Colour {color}", "range_details": {}, "sku_suffix": f"V{v:02d}",
+                "additional_images": {}, "is_active": True, "created_by": "benchmark"
+            })
+            if partner_ids:
+                rows["stock"].append({
+                    "id": stable_uuid(rng), "product_id": product_id, "variant_id": variant_id,
+                    "partner_id": rng.choice(partner_ids), "partner_sku": f"{sku_id}-V{v:02d}",
+                    "quantity_available": rng.randint(0, 200), "quantity_reserved": 0, "reorder_level": 10,
+                    "wholesale_price": retail * Decimal("0.6"), "retail_price": retail, "currency": "INR"
+                })
+    
+    for i in range(spec.campaigns):
+        campaign_id = stable_uuid(rng)
+        start = now - timedelta(days=spec.metric_days)
+        rows["campaigns"].append({
+            "id": campaign_id, "name": f"{spec.sku_prefix}Campaign {i}", "platform": rng.choice(PLATFORMS),
+            "campaign_type": "awareness", "target_audience": {}, "budget": Decimal(rng.randint(1000, 50000)),
+            "currency": "INR", "start_date": start, "end_date": now, "status": "active", "creative_assets": {},
+            "created_by": "benchmark"
+        })
+        for day in range(spec.metric_days):
+            impressions = rng.randint(1000, 100000)
+            clicks = rng.randint(0, impressions // 20)
+            spend = Decimal(rng.randint(100, 5000))
+            rows["campaign_metrics"].append({
+                "id": stable_uuid(rng), "campaign_id": campaign_id, "metric_date": start + timedelta(days=day),
+                "impressions": impressions, "clicks": clicks, "conversions": rng.randint(0, clicks),
+                "spend": spend, "reach": impressions // 2, "engagement": clicks * 2,
+                "ctr": Decimal(clicks) / Decimal(impressions), "cpc": spend / max(clicks, 1),
+                "cpm": spend * 1000 / impressions, "additional_metrics": {}
+            })
+    return rows
+
+def generate_catalog(engine: Engine, spec: CatalogSpec, chunk_size: int = 1000) -> bool:
+    """Insert the catalog for `spec`; returns False if it was already there"""
+    with engine.connect() as connection:
+        exists = connection.execute(
+            select(ProductEntity.id).where(ProductEntity.sku_id == f"{spec.sku_prefix}{0:06d}")
+        ).first()
+    if exists:
+        return False
+    rows = catalog_rows(spec)
+    ensure_partitions_for(
+        engine, CampaignMetricEntity.__tablename__, [row["metric_date"] for row in rows["campaign_metrics"]]
+    )
+    with engine.begin() as connection:
+        tables = {
+            "categories": CategoryEntity.__table__,
+            "partners": partners,
+            "products": ProductEntity.__table__,
+            "product_variants": ProductVariantEntity.__table__,
+            "stocks": StockEntity.__table__,
+            "price_tables": PriceTableEntity.__table__,
+            "stock": partner_stock,
+            "campaigns": CampaignEntity.__table__,
+            "campaign_metrics": CampaignMetricEntity.__table__,
+        }
+        # Parents before children, so foreign keys hold at every step
+        for name, target in tables.items():
+            for start in range(0, len(rows[name]), chunk_size):
+                connection.execute(target.insert(), rows[name][start:start + chunk_size])
+    return True
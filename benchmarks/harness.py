@@ -0,0 +1,59 @@
+"""Minimal timing and memory harness for micro-benchmarks.
+
+Each case is timed best-of-`repeat` with the garbage collector paused, then
+run once more under tracemalloc to record peak traced memory and the number
+of memory blocks still held by its result.
+"""
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, List
+
+@dataclass
+class Measurement:
+    name: str
+    rows: int
+    best_ms: float
+    per_row_us: float
+    peak_kib: float
+    retained_blocks_per_row: float
+
+def measure(name: str, rows: int, function: Callable[[], object], repeat: int = 5) -> Measurement:
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.take_snapshot()
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+        retained = tracemalloc.take_snapshot().compare_to(baseline, "filename")
+    finally:
+        tracemalloc.stop()
+    del result
+    
+    best = min(timings)
+    return Measurement(
+        name=name,
+        rows=rows,
+        best_ms=round(best * 1000, 3),
+        per_row_us=round(best * 1e6 / rows, 3),
+        peak_kib=round(peak / 1024, 1),
+        retained_blocks_per_row=round(sum(stat.count_diff for stat in retained) / rows, 2)
+    )
+
+def print_table(measurements: List[Measurement]):
+    print(f"{'case':<32} {'rows':>7} {'best ms':>10} {'us/row':>8} {'peak KiB':>10} {'blocks/row':>10}")
+    for m in measurements:
+        print(f"{m.name:<32} {m.rows:>7} {m.best_ms:>10} {m.per_row_us:>8} {m.peak_kib:>10} {m.retained_blocks_per_row:>10}")
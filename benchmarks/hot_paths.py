@@ -0,0 +1,110 @@
+"""Micro-benchmarks for the per-row mapping code behind list endpoints.
+
+Covers ORM entity -> domain Product, variant/stock row folding, domain ->
+GraphQL and domain -> response model conversion, and ValueObject equality
+and hashing, at several row counts. Compare representation changes by
+saving runs with --json and diffing them.
+
+    python -m benchmarks.hot_paths                  # 1k, 10k and 100k rows
+    python -m benchmarks.hot_paths 1000 --json before.json
+"""
+import argparse
+import json
+import uuid
+from collections import namedtuple
+from dataclasses import asdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence
+from .harness import Measurement, measure, print_table
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+VariantRow = namedtuple("VariantRow", [
+    "id", "product_id", "variant_name", "color_code", "color_name", "sku_suffix", "stock_id", "partner_id",
+    "quantity_available", "quantity_reserved", "retail_price", "wholesale_price", "currency"
+])
+
+def product_entities(count: int) -> list:
+    from adapters.database.entities import ProductEntity
+    
+    now = datetime.now(timezone.utc)
+    return [ProductEntity(
+        id=uuid.uuid4(), sku_id=f"SKU-{i:06d}", title=f"Block print quilt {i}", description="Hand block printed",
+        material="cotton", pattern="floral", color_primary="#aa3355", colors=["#aa3355", "#ffffff"],
+        width_estimate_cm=220, scale="large", special_features=["handwoven"], image_urls={"thumbnail": f"/{i}.jpg"},
+        created_by="benchmark", category_id=uuid.uuid4(), status="published", enabled=True, created_at=now,
+        updated_at=now
+    ) for i in range(count)]
+
+def variant_rows(count: int, stock_per_variant: int = 3) -> List[VariantRow]:
+    product_id = uuid.uuid4()
+    rows = []
+    for i in range(count // stock_per_variant or 1):
+        variant_id = uuid.uuid4()
+        for s in range(stock_per_variant):
+            rows.append(VariantRow(
+                variant_id, product_id, f"Variant {i}", "#112233", "Indigo", f"V{i}", uuid.uuid4(), uuid.uuid4(),
+                100 + s, s, Decimal("1250.00"), Decimal("800.00"), "INR"
+            ))
+    return rows[:count]
+
+def model_products(count: int) -> list:
+    from domain.models import Product, ProductStatus
+    
+    now = datetime.now(timezone.utc)
+    return [Product(
+        id=str(uuid.uuid4()), sku_id=f"SKU-{i:06d}", title=f"Block print quilt {i}", description=None,
+        material="cotton", pattern="floral", color_primary="#aa3355", colors=[{"hex": "#aa3355"}],
+        width_estimate_cm=220, scale="large", special_features=["handwoven"], image_urls={"thumbnail": f"/{i}.jpg"},
+        created_by="benchmark", category_id=None, created_at=now, updated_at=now, status=ProductStatus.PUBLISHED
+    ) for i in range(count)]
+
+def cases(rows: int) -> Dict[str, Callable[[], object]]:
+    """Case name -> zero-argument callable doing `rows` rows of work on prebuilt inputs"""
+    from adapters.database_product_repository import DatabaseProductRepository
+    from adapters.database_variant_repository import fold_variant_rows
+    from domain.product.value_objects import ProductId
+    from gql.resolvers import convert_product_to_gql
+    from main import convert_product_to_response
+    
+    entities = product_entities(rows)
+    repository = DatabaseProductRepository(None)
+    folded = variant_rows(rows)
+    products = model_products(rows)
+    ids = [ProductId(str(uuid.uuid4())) for _ in range(rows)]
+    copies = [ProductId(product_id.value) for product_id in ids]
+    
+    return {
+        "entity_to_domain": lambda: [repository._entity_to_domain(entity) for entity in entities],
+        "fold_variant_rows": lambda: fold_variant_rows(folded),
+        "convert_product_to_gql": lambda: [convert_product_to_gql(product) for product in products],
+        "convert_product_to_response": lambda: [convert_product_to_response(product) for product in products],
+        "value_object_eq": lambda: sum(a == b for a, b in zip(ids, copies)),
+        "value_object_hash": lambda: set(ids),
+    }
+
+def run(sizes: Sequence[int], repeat: int = 5, only: Optional[List[str]] = None) -> List[Measurement]:
+    measurements = []
+    for rows in sizes:
+        for name, function in cases(rows).items():
+            if not only or name in only:
+                measurements.append(measure(name, rows, function, repeat))
+    return measurements
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("sizes", type=int, nargs="*", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--case", action="append", help="run only these cases")
+    parser.add_argument("--json", help="also write the measurements to this file")
+    args = parser.parse_args(argv)
+    
+    measurements = run(args.sizes, args.repeat, args.case)
+    print_table(measurements)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([asdict(m) for m in measurements], f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Drive the hot endpoints at fixed concurrency and compare against a baseline.
+
+Generates (or reuses) a synthetic catalog in DATABASE_URL, then runs each
+scenario in-process through httpx's ASGI transport with mock storage and
+queues, so numbers reflect the application and database rather than the
+network. Statement counts come from an engine listener, which is why the
+app is driven in-process rather than over HTTP.
+
+    python -m benchmarks.load_test --products 5000 --concurrency 16 --save-baseline
+    python -m benchmarks.load_test --products 5000 --concurrency 16   # exits 1 on regression
+
+Use the same spec and concurrency as the baseline; the baseline records
+both and refuses to compare otherwise.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+from sqlalchemy import event, select
+from .catalog import CatalogSpec, generate_catalog
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+@dataclass
+class Scenario:
+    name: str
+    # Builds the httpx request arguments for the i-th request
+    request: Callable[[int], dict]
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries_per_request: float
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending sequence"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def png_bytes(size: int = 64) -> bytes:
+    from PIL import Image
+    
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), (180, 40, 90)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def hot_scenarios(product_ids: List[str], campaign_ids: List[str]) -> List[Scenario]:
+    image = png_bytes()
+    pick = lambda ids, i: ids[i % len(ids)]
+    scenarios = [
+        Scenario("product_list", lambda i: {"method": "GET", "url": "/api/v1/products/list"}),
+        Scenario("product_detail", lambda i: {"method": "GET", "url": f"/api/v1/products/{pick(product_ids, i)}"}),
+        Scenario("search", lambda i: {
+            "method": "GET", "url": "/api/v1/products/search",
+            "params": {"q": ("silk floral", "cotton", "block print", "handwoven wool")[i % 4]}
+        }),
+        Scenario("stock_update", lambda i: {
+            "method": "PUT", "url": f"/products/{pick(product_ids, i)}/stock",
+            "json": {"current_stock": i % 500, "updated_by": "benchmark"}
+        }),
+        Scenario("image_upload", lambda i: {
+            "method": "POST", "url": f"/products/{pick(product_ids, i)}/images",
+            "files": {"raw": (f"bench-{i}.png", image, "image/png")}
+        }),
+        Scenario("graphql_products", lambda i: {
+            "method": "POST", "url": "/graphql", "json": {"query": "{ products { id skuId title } }"}
+        }),
+    ]
+    if campaign_ids:
+        scenarios.append(Scenario("campaign_metrics", lambda i: {
+            "method": "GET", "url": f"/campaigns/{pick(campaign_ids, i)}/metrics"
+        }))
+    return scenarios
+
+async def run_scenario(client, scenario: Scenario, requests: int, concurrency: int, offset: int = 0) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+    
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            response = await client.request(**scenario.request(offset + index))
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"elapsed": time.perf_counter() - started, "latencies": sorted(latencies), "errors": errors}
+
+def run_suite(spec: CatalogSpec, requests: int, concurrency: int, warmup: int, only: Optional[List[str]] = None) -> Dict[str, ScenarioResult]:
+    os.environ.setdefault("USE_MOCK_STORAGE", "true")
+    os.environ.setdefault("OUTBOX_RELAY_ENABLED", "false")
+    import httpx
+    import main
+    from adapters.database.entities import CampaignEntity, ProductEntity
+    
+    if generate_catalog(main.engine, spec):
+        print(f"Generated catalog {spec}")
+    with main.engine.connect() as connection:
+        product_ids = [str(row[0]) for row in connection.execute(
+            select(ProductEntity.id).where(ProductEntity.sku_id.startswith(spec.sku_prefix)).order_by(ProductEntity.sku_id)
+        )]
+        campaign_ids = [str(row[0]) for row in connection.execute(
+            select(CampaignEntity.id).where(CampaignEntity.name.startswith(spec.sku_prefix)).order_by(CampaignEntity.name)
+        )]
+    
+    statements = 0
+    
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+    
+    event.listen(main.engine, "after_cursor_execute", count_statement)
+    results = {}
+    
+    async def drive():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            nonlocal statements
+            for scenario in hot_scenarios(product_ids, campaign_ids):
+                if only and scenario.name not in only:
+                    continue
+                for i in range(warmup):
+                    await client.request(**scenario.request(i))
+                statements = 0
+                run = await run_scenario(client, scenario, requests, concurrency, offset=warmup)
+                latencies = run["latencies"]
+                results[scenario.name] = ScenarioResult(
+                    requests=len(latencies),
+                    errors=run["errors"],
+                    throughput_rps=round(len(latencies) / run["elapsed"], 1),
+                    p50_ms=round(percentile(latencies, 0.50) * 1000, 2),
+                    p95_ms=round(percentile(latencies, 0.95) * 1000, 2),
+                    p99_ms=round(percentile(latencies, 0.99) * 1000, 2),
+                    queries_per_request=round(statements / max(len(latencies), 1), 2)
+                )
+    
+    try:
+        asyncio.run(drive())
+    finally:
+        event.remove(main.engine, "after_cursor_execute", count_statement)
+    return results
+
+def compare(results: Dict[str, ScenarioResult], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Human-readable regressions of `results` against a stored baseline"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result.p95_ms > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result.p95_ms} ms vs baseline {base['p95_ms']} ms")
+        if result.throughput_rps < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {result.throughput_rps} req/s vs baseline {base['throughput_rps']} req/s")
+        if result.queries_per_request > base["queries_per_request"] + 0.01:
+            regressions.append(
+                f"{name}: {result.queries_per_request} queries/request vs baseline {base['queries_per_request']}"
+            )
+        if result.errors > base["errors"]:
+            regressions.append(f"{name}: {result.errors} errors vs baseline {base['errors']}")
+    return regressions
+
+def print_report(results: Dict[str, ScenarioResult]):
+    print(f"{'scenario':<18} {'reqs':>6} {'errs':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<18} {r.requests:>6} {r.errors:>5} {r.throughput_rps:>8} {r.p50_ms:>8} {r.p95_ms:>8} "
+            f"{r.p99_ms:>8} {r.queries_per_request:>8}"
+        )
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--products", type=int, default=CatalogSpec.products)
+    parser.add_argument("--variants", type=int, default=CatalogSpec.variants_per_product)
+    parser.add_argument("--partners", type=int, default=CatalogSpec.partners)
+    parser.add_argument("--campaigns", type=int, default=CatalogSpec.campaigns)
+    parser.add_argument("--metric-days", type=int, default=CatalogSpec.metric_days)
+    parser.add_argument("--seed", type=int, default=CatalogSpec.seed)
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenario", action="append", help="run only these scenarios")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95/throughput drift, as a fraction")
+    args = parser.parse_args(argv)
+    
+    spec = CatalogSpec(args.products, args.variants, args.partners, args.campaigns, args.metric_days, args.seed)
+    results = run_suite(spec, args.requests, args.concurrency, args.warmup, args.scenario)
+    print_report(results)
+    
+    run = {"spec": asdict(spec), "concurrency": args.concurrency, "results": {k: asdict(v) for k, v in results.items()}}
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(run, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print("No baseline to compare against; run with --save-baseline first")
+        return 0
+    
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["spec"] != run["spec"] or baseline["concurrency"] != run["concurrency"]:
+        print(f"Baseline was recorded with {baseline['spec']} at concurrency {baseline['concurrency']}; not comparing")
+        return 2
+    regressions = compare(results, baseline["results"], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
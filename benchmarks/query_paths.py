@@ -0,0 +1,128 @@
+"""Per-query CPU of the listing and detail reads, rebuilt per call vs cached.
+
+Each pair runs the same read two ways: building the statement on every call,
+as the repositories used to, and executing the module-level statement they
+now reuse. Queries hit a small in-memory SQLite catalog so the timings are
+dominated by statement construction, cache-key generation and compilation
+rather than by the database.
+
+    python -m benchmarks.query_paths                # 2000 queries per case
+    python -m benchmarks.query_paths 500 --json queries.json
+"""
+import argparse
+import json
+import uuid
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from .harness import Measurement, measure, print_table
+
+DEFAULT_QUERIES = 2000
+LIST_SIZE = 50
+# The raw-SQL variant paths read "stock" by variant, which isn't an entity table
+STOCK_COLUMNS = (
+    "id", "product_id", "variant_id", "partner_id", "quantity_available", "quantity_reserved", "retail_price",
+    "wholesale_price", "currency"
+)
+
+def catalog_session() -> tuple:
+    """Session over an in-memory copy of the product tables, plus the id of a product with every relation"""
+    from adapters.database.entities import (
+        CategoryEntity, PriceTableEntity, ProductEntity, ProductVariantEntity, StockEntity
+    )
+    
+    engine = create_engine("sqlite://")
+    # PostgreSQL column types don't create on SQLite; untyped columns hold the same values
+    with engine.begin() as connection:
+        for entity in (CategoryEntity, PriceTableEntity, StockEntity, ProductVariantEntity, ProductEntity):
+            columns = ", ".join(column.name for column in entity.__table__.columns)
+            connection.exec_driver_sql(f"CREATE TABLE {entity.__tablename__} ({columns})")
+        connection.exec_driver_sql(f"CREATE TABLE stock ({', '.join(STOCK_COLUMNS)})")
+        
+        category_id = uuid.uuid4().hex
+        connection.exec_driver_sql(
+            "INSERT INTO categories (id, name, path, depth) VALUES (?, ?, ?, 0)", (category_id, "Quilts", "q/")
+        )
+        product_ids = [uuid.uuid4().hex for _ in range(LIST_SIZE)]
+        connection.exec_driver_sql(
+            "INSERT INTO products (id, sku_id, title, material, pattern, color_primary, colors, scale, "
+            "special_features, image_urls, created_by, category_id, status, enabled) "
+            "VALUES (?, ?, ?, 'cotton', 'floral', '#aa3355', '[]', 'large', '[]', '{}', 'benchmark', ?, "
+            "'PUBLISHED', 1)",
+            [(product_id, f"SKU-{i:04d}", f"Block print quilt {i}", category_id) for i, product_id in enumerate(product_ids)]
+        )
+        detail_id = product_ids[0]
+        connection.exec_driver_sql(
+            "INSERT INTO price_tables (id, product_id, wholesale_price, retail_price, currency, version, created_by) "
+            "VALUES (?, ?, 800, 1250, 'INR', 1, 'benchmark')", (uuid.uuid4().hex, detail_id)
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO stocks (id, product_id, current_stock, reserved_stock, available_stock, reorder_level, "
+            "max_stock_level, unit_of_measure, updated_by) VALUES (?, ?, 100, 0, 100, 10, 1000, 'pieces', 'benchmark')",
+            (uuid.uuid4().hex, detail_id)
+        )
+        for i in range(3):
+            variant_id = uuid.uuid4().hex
+            connection.exec_driver_sql(
+                "INSERT INTO product_variants (id, product_id, variant_name, color_code, color_name, range_details, "
+                "sku_suffix, additional_images, is_active, created_by) "
+                "VALUES (?, ?, ?, '#112233', 'Indigo', '{}', ?, '{}', 1, 'benchmark')",
+                (variant_id, detail_id, f"Variant {i}", f"V{i}")
+            )
+            connection.exec_driver_sql(
+                f"INSERT INTO stock ({', '.join(STOCK_COLUMNS)}) VALUES (?, ?, ?, ?, 100, 0, 1250, 800, 'INR')",
+                (uuid.uuid4().hex, detail_id, variant_id, uuid.uuid4().hex)
+            )
+    return Session(engine), uuid.UUID(detail_id)
+
+def cases(queries: int) -> Dict[str, Callable[[], object]]:
+    """Case name -> zero-argument callable running `queries` reads; cases come in rebuilt/cached pairs"""
+    from adapters.database.entities import ProductEntity
+    from adapters.database_product_repository import PRODUCT_SUMMARY, loader_options, product_statement
+    from adapters.database_variant_repository import VARIANTS_BY_PRODUCT
+    from domain.models import PRODUCT_RELATIONS
+    
+    db, product_id = catalog_session()
+    detail = frozenset(PRODUCT_RELATIONS)
+    
+    def repeated(read: Callable[[], object]) -> Callable[[], object]:
+        return lambda: [read() for _ in range(queries)]
+    
+    return {
+        "detail_rebuilt": repeated(lambda: db.query(ProductEntity).options(*loader_options(detail)).filter(
+            ProductEntity.id == product_id
+        ).first()),
+        "detail_cached": repeated(lambda: db.execute(
+            product_statement("by_id", detail), {"product_id": product_id}
+        ).scalars().first()),
+        "list_rebuilt": repeated(lambda: db.query(ProductEntity).all()),
+        "list_cached": repeated(lambda: db.execute(PRODUCT_SUMMARY).all()),
+        "variants_text_rebuilt": repeated(lambda: db.execute(
+            text(VARIANTS_BY_PRODUCT.text), {"product_id": product_id.hex}
+        ).all()),
+        "variants_text_cached": repeated(lambda: db.execute(VARIANTS_BY_PRODUCT, {"product_id": product_id.hex}).all()),
+    }
+
+def run(queries: int = DEFAULT_QUERIES, repeat: int = 5, only: Optional[List[str]] = None) -> List[Measurement]:
+    return [
+        measure(name, queries, function, repeat)
+        for name, function in cases(queries).items() if not only or name in only
+    ]
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("queries", type=int, nargs="?", default=DEFAULT_QUERIES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--case", action="append", help="run only these cases")
+    parser.add_argument("--json", help="also write the measurements to this file")
+    args = parser.parse_args(argv)
+    
+    measurements = run(args.queries, args.repeat, args.case)
+    print_table(measurements)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([asdict(m) for m in measurements], f, indent=2)
+
+if __name__ == "__main__":
+    main()
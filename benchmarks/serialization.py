@@ -0,0 +1,85 @@
+"""Compare list-endpoint serialization before and after the orjson rows path.
+
+"Before" repeats what the handlers used to do: build a response model per
+row, then let FastAPI validate the list against response_model, dump it in
+JSON mode and encode it with the standard library. "After" is
+rows_response(). Run with: python -m benchmarks.serialization [rows]
+"""
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+from pydantic import TypeAdapter
+from adapters.json_response import rows_response
+
+def recommendation_rows(count: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [{
+        "id": uuid.uuid4(),
+        "raw_image_key": f"raw/{i}.jpg",
+        "analysis_type": "market_trend",
+        "recommended_products": [{"sku": f"SKU-{i}", "score": 0.9}, {"sku": f"SKU-{i + 1}", "score": 0.7}],
+        "market_insights": {"trend": "rising", "regions": ["south", "west"]},
+        "sku_properties": {"material": "silk", "pattern": "floral"},
+        "confidence_score": Decimal("0.87"),
+        "version": 1,
+        "expiry_date": now + timedelta(days=30),
+        "is_considered": False,
+        "consideration_reason": None,
+        "created_by": "analysis",
+        "created_time": now - timedelta(minutes=i),
+        "updated_time": None,
+    } for i in range(count)]
+
+def campaign_rows(count: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [{
+        "id": uuid.uuid4(),
+        "name": f"Campaign {i}",
+        "platform": "instagram",
+        "campaign_type": "awareness",
+        "target_audience": {"age": "25-40", "interests": ["home", "textiles"]},
+        "budget": Decimal("1500.00"),
+        "currency": "INR",
+        "start_date": now,
+        "end_date": now + timedelta(days=14),
+        "status": "active",
+        "platform_campaign_id": f"ig-{i}",
+        "creative_assets": {"image": f"https://cdn.example.com/{i}.jpg"},
+        "created_by": "marketing",
+        "created_time": now,
+        "updated_time": None,
+    } for i in range(count)]
+
+def before(rows, model) -> bytes:
+    models = [model(**{**row, "id": str(row["id"])}) for row in rows]
+    adapter = TypeAdapter(List[model])
+    content = adapter.dump_python(adapter.validate_python(models), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+def after(rows, model) -> bytes:
+    return rows_response(rows, model).body
+
+def best_of(function, *args, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main(count: int = 10000):
+    from main import CampaignResponse, RecommendationResponse
+    
+    for name, rows, model in (
+        ("/recommendations", recommendation_rows(count), RecommendationResponse),
+        ("/campaigns", campaign_rows(count), CampaignResponse),
+    ):
+        old, new = best_of(before, rows, model), best_of(after, rows, model)
+        print(f"{name:<18} {count} rows  before {old * 1000:8.1f} ms  after {new * 1000:8.1f} ms  ({old / new:.1f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
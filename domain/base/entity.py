@@ -3,7 +3,9 @@ from typing import Any
 
 
 class Entity(ABC):
-    """Base class for domain entities."""
+    """Base class for domain entities; subclasses declare their attributes in __slots__."""
+    
+    __slots__ = ("_id",)
     
     def __init__(self, id: Any = None):
         self._id = id
@@ -24,16 +26,22 @@ class Entity(ABC):
 class AggregateRoot(Entity):
     """Base class for domain aggregates."""
     
+    # The event list is only allocated once an aggregate raises its first event
+    __slots__ = ("_domain_events",)
+    
     def __init__(self, id: Any = None):
         super().__init__(id)
-        self._domain_events = []
+        self._domain_events = None
     
     def add_domain_event(self, event):
+        if self._domain_events is None:
+            self._domain_events = []
         self._domain_events.append(event)
     
     def clear_domain_events(self):
-        self._domain_events.clear()
+        if self._domain_events:
+            self._domain_events.clear()
     
     @property
     def domain_events(self):
-        return self._domain_events.copy()
+        return list(self._domain_events or ())
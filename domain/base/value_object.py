@@ -1,18 +1,84 @@
 from abc import ABC
-from typing import Any
+from operator import attrgetter
+from typing import Any, Optional, Tuple
+
+
+def _compile_eq(fields: Tuple[str, ...]):
+    """An __eq__ comparing `fields` directly, as dataclasses generate theirs"""
+    comparison = " and ".join(f"self.{name} == other.{name}" for name in fields) or "True"
+    namespace = {}
+    exec(f"def __eq__(self, other):\n    return isinstance(other, self.__class__) and {comparison}\n", namespace)
+    return namespace["__eq__"]
 
 
 class ValueObject(ABC):
-    """Base class for value objects."""
+    """Base class for immutable value objects.
+    
+    Subclasses declare their attributes in __slots__ and set them in __init__
+    with object.__setattr__; any later assignment raises AttributeError.
+    Equality compares the slot values and the hash is computed on first use
+    and cached. Subclasses without __slots__ keep the old mutable behaviour,
+    comparing their __dict__.
+    """
+    
+    __slots__ = ("_hash",)
+    _fields: Optional[Tuple[str, ...]] = ()
+    _key = staticmethod(lambda value_object: ())
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not all("__slots__" in vars(base) for base in cls.__mro__ if base is not object):
+            cls._fields = None
+            cls._key = staticmethod(lambda value_object: tuple(sorted(value_object.__dict__.items())))
+            return
+        cls._fields = tuple(
+            name for base in reversed(cls.__mro__) for name in vars(base).get("__slots__", ()) if name != "_hash"
+        )
+        cls._key = staticmethod(attrgetter(*cls._fields)) if cls._fields else ValueObject._key
+        if "__eq__" not in vars(cls):
+            cls.__eq__ = _compile_eq(cls._fields)
+            # Assigning __eq__ alone would leave instances unhashable
+            cls.__hash__ = ValueObject.__hash__
+    
+    def __setattr__(self, name: str, value: Any):
+        if self._fields is not None:
+            raise AttributeError(f"{self.__class__.__name__} is immutable")
+        object.__setattr__(self, name, value)
+    
+    def __delattr__(self, name: str):
+        if self._fields is not None:
+            raise AttributeError(f"{self.__class__.__name__} is immutable")
+        object.__delattr__(self, name)
     
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
-        return self.__dict__ == other.__dict__
+        return self._key(self) == other._key(other)
     
     def __hash__(self):
-        return hash(tuple(sorted(self.__dict__.items())))
+        if self._fields is None:
+            return hash(self._key(self))
+        try:
+            return self._hash
+        except AttributeError:
+            value = hash(self._key(self))
+            object.__setattr__(self, "_hash", value)
+            return value
+    
+    def __getstate__(self):
+        # The cached hash is left out: string hashes differ between processes
+        if self._fields is None:
+            return self.__dict__.copy()
+        return {name: getattr(self, name) for name in self._fields}
+    
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
     
     def __repr__(self):
-        attrs = ', '.join(f'{k}={v}' for k, v in self.__dict__.items())
+        if self._fields is None:
+            items = self.__dict__.items()
+        else:
+            items = ((name, getattr(self, name)) for name in self._fields)
+        attrs = ', '.join(f'{k}={v}' for k, v in items)
         return f'{self.__class__.__name__}({attrs})'
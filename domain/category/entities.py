@@ -4,6 +4,8 @@ from typing import Optional
 
 
 class Category(AggregateRoot):
+    __slots__ = ("category_id", "name", "description")
+    
     def __init__(
         self,
         category_id: CategoryId,
@@ -3,10 +3,12 @@ import uuid
 
 
 class CategoryId(ValueObject):
+    __slots__ = ("value",)
+    
     def __init__(self, value: str):
         if not value:
             raise ValueError("CategoryId cannot be empty")
-        self.value = value
+        object.__setattr__(self, "value", value)
     
     @classmethod
     def generate(cls):
@@ -14,9 +16,11 @@ class CategoryId(ValueObject):
 
 
 class CategoryName(ValueObject):
+    __slots__ = ("value",)
+    
     def __init__(self, value: str):
         if not value or len(value.strip()) == 0:
             raise ValueError("Category name cannot be empty")
         if len(value) > 100:
             raise ValueError("Category name too long")
-        self.value = value.strip()
+        object.__setattr__(self, "value", value.strip())
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import BinaryIO, Optional, List, Dict
+from dataclasses import dataclass, field
+from typing import BinaryIO, Optional, List, Dict, Tuple
 from datetime import datetime
 from enum import Enum
 from decimal import Decimal
@@ -14,6 +14,7 @@ class ImageUpload:
 class ProcessingJob:
     image_key: str
     filename: str
+    traceparent: Optional[str] = None  # W3C trace context of the request that queued it
 
 @dataclass
 class ProductAnalysisJob:
@@ -21,12 +22,40 @@ class ProductAnalysisJob:
     sku_id: str
     image_urls: Dict[str, str]
     analysis_type: str = "genai_analysis"
+    dedupe_id: Optional[str] = None
+    traceparent: Optional[str] = None
 
 @dataclass
 class RawImageAnalysisJob:
     raw_image_key: str
     filename: str
     analysis_type: str = "market_analysis"
+    dedupe_id: Optional[str] = None
+    traceparent: Optional[str] = None
+
+@dataclass
+class ReceivedJob:
+    message_id: str
+    receipt_handle: str
+    body: str
+    receive_count: int = 1
+
+@dataclass
+class OutboxMessage:
+    id: str
+    destination: str
+    payload: Dict
+    attempts: int = 0
+    created_time: Optional[datetime] = None
+
+@dataclass
+class StoredObject:
+    key: str
+    content_hash: str
+    size_bytes: int
+    ref_count: int
+    created_time: Optional[datetime] = None
+    updated_time: Optional[datetime] = None
 
 @dataclass
 class Category:
@@ -34,6 +63,18 @@ class Category:
     name: str
     description: Optional[str] = None
 
+@dataclass
+class CategoryNode:
+    id: str
+    name: str
+    description: Optional[str]
+    parent_id: Optional[str]
+    path: str  # ancestor ids from the root down to this category, each followed by "/"
+    depth: int
+    product_count: int = 0  # products assigned directly to this category
+    subtree_product_count: int = 0  # products in this category and all its descendants
+    children: List["CategoryNode"] = field(default_factory=list)
+
 class ProductStatus(Enum):
     DRAFT = "draft"
     PENDING_REVIEW = "pending_review"
@@ -69,6 +110,94 @@ class Recommendation:
     created_by: str
     created_time: Optional[datetime] = None
     updated_time: Optional[datetime] = None
+    dedupe_id: Optional[str] = None  # Id of the job that produced it; saved at most once
+
+@dataclass
+class RecommendationQuery:
+    analysis_type: Optional[str] = None
+    is_considered: Optional[bool] = None
+    min_confidence: Optional[Decimal] = None
+    max_confidence: Optional[Decimal] = None
+    unexpired_only: bool = False
+    sku_properties: Optional[Dict] = None
+    summary: bool = False
+    limit: Optional[int] = 50  # None returns every match
+    cursor: Optional[str] = None
+
+@dataclass
+class ProductSearchQuery:
+    text: Optional[str] = None
+    material: Optional[str] = None
+    pattern: Optional[str] = None
+    scale: Optional[str] = None
+    status: Optional[str] = None
+    category_id: Optional[str] = None
+    special_features: Optional[List[str]] = None
+    enabled: Optional[bool] = None
+    limit: int = 24
+    cursor: Optional[str] = None
+
+@dataclass
+class ProductSearchResult:
+    items: List[Dict]
+    facets: Dict[str, Dict[str, int]]
+    total: int
+    next_cursor: Optional[str] = None
+
+@dataclass
+class ColorMatch:
+    product_id: str
+    variant_id: Optional[str]
+    hex_color: str
+    distance: float
+
+@dataclass
+class AutocompleteMatch:
+    product_id: str
+    sku_id: str
+    title: str
+    matched_field: str  # "sku", "variant_sku" or "title"
+    matched_text: str
+
+@dataclass
+class BatchOperation:
+    op: str  # one of BATCH_OPERATIONS in adapters/database_batch_writer.py
+    product_id: str
+    variant_id: Optional[str] = None
+    data: Dict = field(default_factory=dict)
+
+@dataclass
+class IdempotentResponse:
+    status_code: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+@dataclass
+class IdempotencyRecord:
+    fingerprint: str  # hash of the request the key was first used with
+    response: Optional[IdempotentResponse] = None  # None while the first request is still running
+
+@dataclass
+class SlowQuery:
+    statement: str
+    parameters: object  # bind values replaced by their type names
+    duration_ms: float
+    call_site: Optional[str]  # innermost application frame that issued the query
+    plan: object = None  # EXPLAIN output, when it could be captured
+    recorded_at: datetime = field(default_factory=datetime.utcnow)
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str  # 32 hex chars, shared by every span in a W3C trace
+    span_id: str  # 16 hex chars
+    parent_id: Optional[str]
+    kind: str  # internal, server, client, producer or consumer
+    start_time: int  # unix nanoseconds
+    end_time: Optional[int] = None
+    attributes: Dict = field(default_factory=dict)
+    status: str = "unset"  # unset, ok or error
+    status_message: Optional[str] = None
 
 @dataclass
 class Campaign:
@@ -162,3 +291,7 @@ class Product:
     price_table: Optional[PriceTable] = None
     stock: Optional[Stock] = None
     variants: List[ProductVariant] = None
+    category: Optional[Category] = None
+
+# Parts of the product aggregate a read can ask for; anything not requested is left as None
+PRODUCT_RELATIONS = ("category", "price", "stock", "variants")
@@ -5,6 +5,8 @@ from datetime import datetime
 
 
 class Partner(AggregateRoot):
+    __slots__ = ("partner_id", "name", "code", "email", "phone", "address", "is_active", "created_at", "updated_at")
+    
     def __init__(
         self,
         partner_id: PartnerId,
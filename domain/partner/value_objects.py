@@ -3,10 +3,12 @@ import uuid
 
 
 class PartnerId(ValueObject):
+    __slots__ = ("value",)
+    
     def __init__(self, value: str):
         if not value:
             raise ValueError("PartnerId cannot be empty")
-        self.value = value
+        object.__setattr__(self, "value", value)
     
     @classmethod
     def generate(cls):
@@ -14,9 +16,11 @@ class PartnerId(ValueObject):
 
 
 class PartnerCode(ValueObject):
+    __slots__ = ("value",)
+    
     def __init__(self, value: str):
         if not value or len(value.strip()) == 0:
             raise ValueError("Partner code cannot be empty")
         if len(value) > 50:
             raise ValueError("Partner code too long")
-        self.value = value.strip().upper()
+        object.__setattr__(self, "value", value.strip().upper())
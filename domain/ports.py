@@ -1,11 +1,63 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from .models import ImageUpload, ProcessingJob, ProductAnalysisJob, Category, Product
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from .models import (
+    ImageUpload, ProcessingJob, ProductAnalysisJob, RawImageAnalysisJob, Category, Product,
+    OutboxMessage, ReceivedJob, Recommendation, RecommendationQuery, ProductSearchQuery, ProductSearchResult,
+    ColorMatch, AutocompleteMatch, CategoryNode, BatchOperation, IdempotencyRecord, IdempotentResponse, Span
+)
 
 class StoragePort(ABC):
     @abstractmethod
     def store_image(self, image: ImageUpload) -> str:
         pass
+    
+    @abstractmethod
+    def store_product_images(self, images: Dict[str, ImageUpload]) -> Dict[str, str]:
+        pass
+    
+    @abstractmethod
+    def release_image(self, url_or_key: str) -> None:
+        pass
+    
+    @abstractmethod
+    def create_presigned_upload(self, key: str, content_type: str, expiration: int = 900) -> Dict[str, object]:
+        pass
+    
+    @abstractmethod
+    def confirm_upload(self, key: str, content_type: str) -> Optional[str]:
+        pass
+    
+    @abstractmethod
+    def discard_upload(self, key: str) -> None:
+        pass
+
+class ImageIndexPort(ABC):
+    """Reference-counted lookup of content-addressed objects already in storage"""
+    
+    @abstractmethod
+    def acquire(self, key: str) -> bool:
+        pass
+    
+    @abstractmethod
+    def register(self, key: str, content_hash: str, size_bytes: int) -> None:
+        pass
+    
+    @abstractmethod
+    def release(self, key: str) -> int:
+        pass
+    
+    @abstractmethod
+    def collect_unreferenced(self, delete_object: Callable[[str], None], grace_seconds: int = 3600) -> List[str]:
+        pass
+
+class ImageProcessorPort(ABC):
+    @abstractmethod
+    def rendition_names(self) -> List[str]:
+        pass
+    
+    @abstractmethod
+    def render_derivatives(self, content: bytes) -> Dict[str, bytes]:
+        pass
 
 class QueuePort(ABC):
     @abstractmethod
@@ -17,6 +69,93 @@ class ProductAnalysisQueuePort(ABC):
     def queue_analysis(self, job: ProductAnalysisJob) -> None:
         pass
 
+class OutboxPort(ABC):
+    @abstractmethod
+    def add(self, message: OutboxMessage) -> None:
+        pass
+    
+    @abstractmethod
+    def relay_pending(
+        self,
+        dispatch: Callable[[OutboxMessage], None],
+        destinations: List[str],
+        batch_size: int = 100,
+        max_attempts: int = 10,
+        retry_backoff: float = 2.0
+    ) -> int:
+        pass
+
+class JobSourcePort(ABC):
+    @abstractmethod
+    def receive(self, max_messages: int = 10, wait_seconds: int = 20, visibility_timeout: int = 60) -> List[ReceivedJob]:
+        pass
+    
+    @abstractmethod
+    def delete(self, receipt_handle: str) -> None:
+        pass
+    
+    @abstractmethod
+    def extend_visibility(self, receipt_handle: str, visibility_timeout: int) -> None:
+        pass
+    
+    @abstractmethod
+    def dead_letter(self, job: ReceivedJob, reason: str) -> None:
+        pass
+
+class JobAnalyzerPort(ABC):
+    @abstractmethod
+    def analyze(self, job: Union[ProductAnalysisJob, RawImageAnalysisJob]) -> Recommendation:
+        pass
+
+class RecommendationRepositoryPort(ABC):
+    @abstractmethod
+    def add_all(self, recommendations: List[Recommendation]) -> int:
+        pass
+    
+    @abstractmethod
+    def search(self, query: RecommendationQuery) -> Tuple[List[Dict], Optional[str]]:
+        pass
+
+class ProductSearchPort(ABC):
+    @abstractmethod
+    def search(self, query: ProductSearchQuery) -> ProductSearchResult:
+        pass
+
+class ColorIndexPort(ABC):
+    @abstractmethod
+    def upsert(self, key: str, product_id: str, hex_color: str, variant_id: Optional[str] = None) -> None:
+        pass
+    
+    @abstractmethod
+    def remove(self, key: str) -> None:
+        pass
+    
+    @abstractmethod
+    def remove_product(self, product_id: str) -> None:
+        pass
+    
+    @abstractmethod
+    def nearest(self, hex_color: str, k: int = 10) -> List[ColorMatch]:
+        pass
+
+class AutocompletePort(ABC):
+    @abstractmethod
+    def complete(self, prefix: str, limit: int = 10) -> List[AutocompleteMatch]:
+        pass
+
+class RetentionPort(ABC):
+    @abstractmethod
+    def delete_expired_recommendations(self, batch_size: int) -> int:
+        pass
+    
+    @abstractmethod
+    def ensure_partitions(self) -> List[str]:
+        pass
+    
+    @abstractmethod
+    def drop_partitions_older_than(self, table: str, months: int) -> List[str]:
+        pass
+
 class CategoryRepositoryPort(ABC):
     @abstractmethod
     def create(self, category: Category) -> Category:
@@ -38,17 +177,68 @@ class CategoryRepositoryPort(ABC):
     def delete(self, category_id: str) -> bool:
         pass
 
+class IdempotencyStorePort(ABC):
+    @abstractmethod
+    def reserve(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        """Claim `key` for a new request, or return the record already holding it"""
+        pass
+    
+    @abstractmethod
+    def save(self, key: str, response: IdempotentResponse) -> None:
+        pass
+    
+    @abstractmethod
+    def release(self, key: str) -> None:
+        pass
+
+class SpanExporterPort(ABC):
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        """Hand off finished spans; must not block the caller on the network"""
+        pass
+    
+    @abstractmethod
+    def shutdown(self) -> None:
+        pass
+
+class BatchWriterPort(ABC):
+    @abstractmethod
+    def apply(self, operation: BatchOperation) -> Optional[Dict]:
+        pass
+
+class CategoryTreePort(ABC):
+    @abstractmethod
+    def move(self, category_id: str, parent_id: Optional[str]) -> None:
+        pass
+    
+    @abstractmethod
+    def nodes(self) -> List[CategoryNode]:
+        pass
+    
+    @abstractmethod
+    def breadcrumb(self, category_id: str) -> List[CategoryNode]:
+        pass
+    
+    @abstractmethod
+    def subtree(self, category_id: str) -> List[CategoryNode]:
+        pass
+    
+    @abstractmethod
+    def subtree_products(self, category_id: str) -> List[dict]:
+        pass
+
 class ProductRepositoryPort(ABC):
     @abstractmethod
     def create(self, product: Product) -> Product:
         pass
     
     @abstractmethod
-    def get_by_id(self, product_id: str) -> Optional[Product]:
+    def get_by_id(self, product_id: str, load: Iterable[str] = ()) -> Optional[Product]:
+        """Load the product plus the named PRODUCT_RELATIONS; the rest stay None"""
         pass
     
     @abstractmethod
-    def get_all(self) -> List[Product]:
+    def get_all(self, load: Iterable[str] = ()) -> List[Product]:
         pass
     
     @abstractmethod
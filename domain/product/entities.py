@@ -11,6 +11,11 @@ class ProductStatus(Enum):
 
 
 class ProductVariant(Entity):
+    __slots__ = (
+        "variant_id", "product_id", "color_name", "color_code", "sku_suffix", "stock_records", "created_at",
+        "updated_at"
+    )
+    
     def __init__(
         self,
         variant_id: str,
@@ -64,6 +69,12 @@ class ProductVariant(Entity):
 
 
 class Product(AggregateRoot):
+    __slots__ = (
+        "product_id", "title", "sku", "category_id", "description", "material", "pattern", "color_primary", "colors",
+        "width_estimate_cm", "scale", "special_features", "image_urls", "variants", "created_by", "status", "enabled",
+        "discontinuation_reason", "discontinuation_date", "created_at", "updated_at"
+    )
+    
     def __init__(
         self,
         product_id: ProductId,
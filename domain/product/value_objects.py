@@ -4,10 +4,12 @@ import uuid
 
 
 class ProductId(ValueObject):
+    __slots__ = ("value",)
+    
     def __init__(self, value: str):
         if not value:
             raise ValueError("ProductId cannot be empty")
-        self.value = value
+        object.__setattr__(self, "value", value)
     
     @classmethod
     def generate(cls):
@@ -15,24 +17,30 @@ class ProductId(ValueObject):
 
 
 class Money(ValueObject):
+    __slots__ = ("amount", "currency")
+    
     def __init__(self, amount: float, currency: str = "INR"):
         if amount < 0:
             raise ValueError("Amount cannot be negative")
-        self.amount = amount
-        self.currency = currency
+        object.__setattr__(self, "amount", amount)
+        object.__setattr__(self, "currency", currency)
 
 
 class ProductTitle(ValueObject):
+    __slots__ = ("value",)
+    
     def __init__(self, value: str):
         if not value or len(value.strip()) == 0:
             raise ValueError("Product title cannot be empty")
         if len(value) > 200:
             raise ValueError("Product title too long")
-        self.value = value.strip()
+        object.__setattr__(self, "value", value.strip())
 
 
 class SKU(ValueObject):
+    __slots__ = ("value",)
+    
     def __init__(self, value: str):
         if not value:
             raise ValueError("SKU cannot be empty")
-        self.value = value.upper()
+        object.__setattr__(self, "value", value.upper())
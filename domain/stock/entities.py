@@ -6,6 +6,11 @@ import uuid
 
 
 class StockRecord(AggregateRoot):
+    __slots__ = (
+        "stock_id", "product_id", "partner_id", "partner_sku", "quantity_available", "quantity_reserved",
+        "reorder_level", "wholesale_price", "retail_price"
+    )
+    
     def __init__(
         self,
         stock_id: str,
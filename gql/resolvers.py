@@ -16,6 +16,14 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """Session for query fields; its reads may be served by a replica unless the client just wrote"""
+    db = SessionLocal(info={"read_only": True})
+    try:
+        return db
+    finally:
+        db.close()
+
 def convert_product_to_gql(product: Product) -> ProductType:
     # Convert domain ProductStatus to GraphQL ProductStatus
     gql_status = GQLProductStatus.DRAFT
@@ -46,14 +54,14 @@ def convert_product_to_gql(product: Product) -> ProductType:
 class Query:
     @strawberry.field
     def categories(self) -> List[CategoryType]:
-        db = get_db()
+        db = get_read_db()
         service = CategoryService(DatabaseCategoryRepository(db))
         categories = service.get_all_categories()
         return [CategoryType(id=c.id, name=c.name, description=c.description) for c in categories]
     
     @strawberry.field
     def category(self, id: str) -> Optional[CategoryType]:
-        db = get_db()
+        db = get_read_db()
         service = CategoryService(DatabaseCategoryRepository(db))
         category = service.get_category(id)
         if not category:
@@ -62,14 +70,14 @@ class Query:
     
     @strawberry.field
     def products(self) -> List[ProductType]:
-        db = get_db()
+        db = get_read_db()
         service = ProductService(DatabaseProductRepository(db))
-        products = service.get_all_products()
+        products = service.list_products()
         return [convert_product_to_gql(p) for p in products]
     
     @strawberry.field
     def product(self, id: str) -> Optional[ProductType]:
-        db = get_db()
+        db = get_read_db()
         service = ProductService(DatabaseProductRepository(db))
         product = service.get_product(id)
         if not product:
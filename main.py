@@ -1,34 +1,96 @@
+import json
+import logging
 import os
-from typing import Optional, List, Dict
-from fastapi import FastAPI, UploadFile, HTTPException, Depends, File, Form
+import threading
+import time
+from dataclasses import asdict
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Literal, Union
+from fastapi import FastAPI, UploadFile, HTTPException, Depends, File, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from decimal import Decimal
 from datetime import datetime
 from strawberry.fastapi import GraphQLRouter
-from domain.models import ImageUpload, Product, ProductStatus, ProductVariant
+from domain.models import ImageUpload, Product, ProductStatus, ProductVariant, PRODUCT_RELATIONS
 from application.service import ImageProcessingService
 from application.category_service import CategoryService
 from application.product_service import ProductService
+from application.image_derivative_service import ImageDerivativeService
+from application.outbox_relay import OutboxRelay, job_dispatchers, product_analysis_message, raw_image_analysis_message
+from application.analysis_consumer import AnalysisJobConsumer
+from application.retention_sweeper import RetentionSweeper
+from application.category_tree_cache import CategoryTreeCache
+from application.tracing import Tracer, current_traceparent
 from adapters.s3_storage import S3StorageAdapter
 from adapters.sqs_queue import SQSQueueAdapter
+from adapters.sqs_send_buffer import SendBufferFullError
 from adapters.database_category_repository import DatabaseCategoryRepository
 from adapters.database_product_repository import DatabaseProductRepository
-from adapters.database.config import get_db
+from adapters.database_outbox import DatabaseOutboxRepository, open_outbox
+from adapters.database_direct_uploads import DatabaseDirectUploadRepository
+from adapters.database_recommendation_repository import DatabaseRecommendationRepository
+from adapters.mock_job_analyzer import MockJobAnalyzer
+from adapters.database.config import get_db, SessionLocal, engine, replica_engines, READ_YOUR_WRITES_SECONDS
+from adapters.database.routing import ReplicaRoutingMiddleware
+from adapters.database.migrations import run_migrations
+from adapters.database_retention import DatabaseRetention
+from adapters.database.color_sync import load_colors, register_color_sync
+from adapters.database.catalog_sync import register_catalog_sync
+from adapters.database_category_tree import CategoryTreeInvalidator, DatabaseCategoryTree, build_tree
+from adapters.database.autocomplete_sync import load_autocomplete, register_autocomplete_sync
+from adapters.numpy_color_index import NumpyColorIndex
+from adapters.prefix_autocomplete_index import PrefixAutocompleteIndex
+from adapters.pillow_image_processor import PillowImageProcessor
+from adapters.idempotency_middleware import IdempotencyMiddleware
+from adapters.compression_middleware import CompressedBodyCache, CompressionMiddleware
+from adapters.memory_idempotency_store import MemoryIdempotencyStore
+from adapters.request_metrics import MetricsMiddleware, RequestMetrics
+from adapters.slow_query_log import SlowQueryLog
+from adapters.tracing_instrumentation import TracingMiddleware, instrument_engine, traced
+from adapters.json_response import model_fields, rows_response
 from gql.schema import schema
 
-app = FastAPI()
-
-# Add CORS middleware with explicit configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for development
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-    allow_headers=["*"],
-    expose_headers=["*"]
-)
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if RUN_MIGRATIONS:
+        run_migrations(engine, {"bucket": BUCKET_NAME, "raw_bucket": RAW_BUCKET_NAME})
+    # Background workers are defined further down
+    if OUTBOX_RELAY_ENABLED:
+        outbox_relay.start()
+    if ANALYSIS_CONSUMER_ENABLED and analysis_consumer:
+        analysis_consumer.start()
+    if retention_sweeper:
+        retention_sweeper.start()
+    if AUTOCOMPLETE_BACKEND == "memory":
+        threading.Thread(target=warm_autocomplete_index, name="autocomplete-warmup", daemon=True).start()
+    yield
+    if retention_sweeper:
+        retention_sweeper.stop(timeout=5)
+    outbox_relay.stop(timeout=5)
+    if analysis_consumer:
+        analysis_consumer.stop(timeout=30)
+    derivative_service.shutdown(wait=False)
+    for buffered_queue in (queue, analysis_queue):
+        if hasattr(buffered_queue, "close"):
+            buffered_queue.close()
+    if span_exporter:
+        span_exporter.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.exception_handler(SendBufferFullError)
+async def send_buffer_full_handler(request: Request, exc: SendBufferFullError):
+    """Ask clients to back off while the SQS send buffer drains"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 # Tables are created by Docker setup
 
@@ -36,11 +98,129 @@ app.add_middleware(
 # Configuration
 BUCKET_NAME = os.getenv('S3_BUCKET_NAME', 'your-bucket-name')
 RAW_BUCKET_NAME = os.getenv('S3_RAW_BUCKET_NAME', 'your-raw-bucket-name')
+# Bring an existing PostgreSQL schema up to date on startup (see adapters/database/migrations.py)
+RUN_MIGRATIONS = os.getenv('RUN_MIGRATIONS', 'true').lower() == 'true'
 QUEUE_URL = os.getenv('SQS_QUEUE_URL', 'your-queue-url')
 ANALYSIS_QUEUE_URL = os.getenv('SQS_ANALYSIS_QUEUE_URL', 'your-analysis-queue-url')
 SNS_TOPIC_ARN = os.getenv('SNS_TOPIC_ARN', 'your-sns-topic-arn')
 AWS_REGION = os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
 USE_MOCK_STORAGE = os.getenv('USE_MOCK_STORAGE', 'true').lower() == 'true'
+PUBLIC_BASE_URL = os.getenv('PUBLIC_BASE_URL', 'http://localhost:8000')
+MOCK_UPLOAD_SECRET = os.getenv('MOCK_UPLOAD_SECRET', 'mock-upload-secret')
+PRESIGNED_UPLOAD_EXPIRY = int(os.getenv('PRESIGNED_UPLOAD_EXPIRY', '900'))
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv('IMAGE_DERIVATIVE_WORKERS', '0')) or None
+SQS_BATCH_SENDS = os.getenv('SQS_BATCH_SENDS', 'true').lower() == 'true'
+SQS_FLUSH_INTERVAL = float(os.getenv('SQS_FLUSH_INTERVAL', '0.05'))
+OUTBOX_RELAY_ENABLED = os.getenv('OUTBOX_RELAY_ENABLED', 'true').lower() == 'true'
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', '1.0'))
+ANALYSIS_DLQ_URL = os.getenv('SQS_ANALYSIS_DLQ_URL')
+ANALYSIS_CONSUMER_ENABLED = os.getenv('ANALYSIS_CONSUMER_ENABLED', 'false').lower() == 'true'
+ANALYSIS_CONSUMER_CONCURRENCY = int(os.getenv('ANALYSIS_CONSUMER_CONCURRENCY', '4'))
+LOCAL_QUEUE_PATH = os.getenv('LOCAL_QUEUE_PATH')
+RETENTION_SWEEPER_ENABLED = os.getenv('RETENTION_SWEEPER_ENABLED', 'true').lower() == 'true'
+RETENTION_SWEEP_INTERVAL = float(os.getenv('RETENTION_SWEEP_INTERVAL', '3600'))
+RECOMMENDATION_RETENTION_MONTHS = int(os.getenv('RECOMMENDATION_RETENTION_MONTHS', '12'))
+CAMPAIGN_METRIC_RETENTION_MONTHS = int(os.getenv('CAMPAIGN_METRIC_RETENTION_MONTHS', '24'))
+RECOMMENDATION_PAGE_SIZE = int(os.getenv('RECOMMENDATION_PAGE_SIZE', '50'))  # Page size when only a cursor is sent
+CATEGORY_TREE_TTL = float(os.getenv('CATEGORY_TREE_TTL', '300'))
+# In-memory catalog indexes reload after this many seconds to pick up other workers' writes; 0 never reloads
+CATALOG_INDEX_TTL = float(os.getenv('CATALOG_INDEX_TTL', '300'))
+# "memory" keeps a per-process prefix index; "database" uses pg_trgm and suits multi-worker deployments
+AUTOCOMPLETE_BACKEND = os.getenv(
+    'AUTOCOMPLETE_BACKEND', 'database' if int(os.getenv('WEB_CONCURRENCY', '1')) > 1 else 'memory'
+).lower()
+# "memory" keeps keys per process; "database" shares them through idempotency_keys across workers
+IDEMPOTENCY_BACKEND = os.getenv(
+    'IDEMPOTENCY_BACKEND', 'database' if int(os.getenv('WEB_CONCURRENCY', '1')) > 1 else 'memory'
+).lower()
+IDEMPOTENCY_TTL = float(os.getenv('IDEMPOTENCY_TTL', '86400'))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv('IDEMPOTENCY_MAX_ENTRIES', '10000'))
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_CACHE_BYTES = int(os.getenv('COMPRESSION_CACHE_BYTES', str(32 * 1024 * 1024)))
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', '50'))
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+SLOW_QUERY_BUFFER = int(os.getenv('SLOW_QUERY_BUFFER', '100'))
+SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'none').lower()  # none, memory or otlp
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://localhost:4318')
+OTEL_SERVICE_NAME = os.getenv('OTEL_SERVICE_NAME', 'vibrantknots-admin-api')
+
+# GET reads go to replicas when any are configured; clients that just wrote stay on the primary
+if replica_engines:
+    app.add_middleware(ReplicaRoutingMiddleware, read_your_writes_seconds=READ_YOUR_WRITES_SECONDS)
+
+# Retried creates and uploads carrying an Idempotency-Key replay the first response
+if IDEMPOTENCY_BACKEND == "database":
+    from adapters.database_idempotency_store import DatabaseIdempotencyStore
+    idempotency_store = DatabaseIdempotencyStore(SessionLocal, ttl=IDEMPOTENCY_TTL)
+else:
+    idempotency_store = MemoryIdempotencyStore(max_entries=IDEMPOTENCY_MAX_ENTRIES, ttl=IDEMPOTENCY_TTL)
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    paths=[
+        r"/products",
+        r"/api/v1/products",
+        r"/campaigns",
+        r"/upload",
+        r"/uploads/complete",
+        r"/products/[^/]+/images",
+        r"/raw-images/upload",
+        r"/api/v1/batch",
+    ]
+)
+
+# Outside Idempotency, so replayed idempotent responses are compressed too
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    cache=CompressedBodyCache(COMPRESSION_CACHE_BYTES) if COMPRESSION_CACHE_BYTES > 0 else None
+)
+
+# When disabled neither the middleware nor the engine listeners are installed
+request_metrics = RequestMetrics(n_plus_one_threshold=N_PLUS_ONE_THRESHOLD) if METRICS_ENABLED else None
+if request_metrics:
+    for instrumented in (engine, *replica_engines):
+        request_metrics.instrument_engine(instrumented)
+    # Outside Compression, so response sizes are the compressed bytes clients receive
+    app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=SLOW_QUERY_MS, capacity=SLOW_QUERY_BUFFER, explain=SLOW_QUERY_EXPLAIN
+) if SLOW_QUERY_MS > 0 else None
+if slow_query_log:
+    for instrumented in (engine, *replica_engines):
+        slow_query_log.instrument_engine(instrumented)
+
+if TRACING_EXPORTER == 'otlp':
+    from adapters.otlp_span_exporter import OTLPHttpSpanExporter
+    span_exporter = OTLPHttpSpanExporter(OTEL_EXPORTER_OTLP_ENDPOINT, OTEL_SERVICE_NAME)
+elif TRACING_EXPORTER == 'memory':
+    from adapters.memory_span_exporter import InMemorySpanExporter
+    span_exporter = InMemorySpanExporter()
+else:
+    span_exporter = None
+tracer = Tracer(span_exporter)
+if tracer.enabled:
+    for instrumented in (engine, *replica_engines):
+        instrument_engine(instrumented, tracer)
+    # Outside the middleware added before it, so the request span covers all of them
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+# Middleware added later wraps what was added before, so requests pass through
+# CORS, Tracing, Metrics, Compression, Idempotency and then ReplicaRouting. CORS
+# is added last so every response gets its headers, including the errors,
+# replays and 304s the inner middleware answer without reaching a route.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # Allow all origins for development
+    allow_credentials=True,
+    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
+    allow_headers=["*"],
+    # Listed by name: browsers ignore the "*" wildcard on credentialed requests
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed", "ETag", "Retry-After"]
+)
 
 # Dependencies
 if USE_MOCK_STORAGE:
@@ -49,28 +229,170 @@ if USE_MOCK_STORAGE:
     from adapters.mock_raw_storage import MockRawImageStorageAdapter
     from adapters.mock_sns_notification import MockSNSNotificationAdapter
     from adapters.mock_social_media import SocialMediaManager
-    storage = MockS3StorageAdapter(BUCKET_NAME, AWS_REGION)
-    raw_storage = MockRawImageStorageAdapter(RAW_BUCKET_NAME, AWS_REGION)
+    from adapters.memory_image_index import MemoryImageIndex
+    storage = MockS3StorageAdapter(BUCKET_NAME, AWS_REGION, MemoryImageIndex(), PUBLIC_BASE_URL, MOCK_UPLOAD_SECRET)
+    raw_storage = MockRawImageStorageAdapter(RAW_BUCKET_NAME, AWS_REGION, MemoryImageIndex(), PUBLIC_BASE_URL, MOCK_UPLOAD_SECRET)
     queue = MockSQSQueueAdapter(QUEUE_URL)
-    analysis_queue = MockSQSAnalysisQueueAdapter(ANALYSIS_QUEUE_URL)
-    sns_notification = MockSNSNotificationAdapter(SNS_TOPIC_ARN)
+    if LOCAL_QUEUE_PATH:
+        # Analysis jobs and raw image notifications share a SQLite queue the consumer can drain
+        from adapters.sqlite_job_queue import SQLiteJobQueue, SQLiteNotificationAdapter
+        from adapters.sqs_analysis_queue import SQSAnalysisQueueAdapter
+        job_source = SQLiteJobQueue(LOCAL_QUEUE_PATH)
+        analysis_queue = SQSAnalysisQueueAdapter(ANALYSIS_QUEUE_URL, client=job_source)
+        sns_notification = SQLiteNotificationAdapter(job_source)
+    else:
+        job_source = None
+        analysis_queue = MockSQSAnalysisQueueAdapter(ANALYSIS_QUEUE_URL)
+        sns_notification = MockSNSNotificationAdapter(SNS_TOPIC_ARN)
+    relay_analysis_queue = analysis_queue
     social_media_manager = SocialMediaManager()
     print("Using Mock S3 Storage, SQS Queues, SNS, and Social Media for development")
 else:
     from adapters.s3_storage import S3StorageAdapter
-    from adapters.sqs_queue import SQSQueueAdapter
-    from adapters.sqs_analysis_queue import SQSAnalysisQueueAdapter
+    from adapters.sqs_queue import SQSQueueAdapter, BufferedSQSQueueAdapter
+    from adapters.sqs_analysis_queue import SQSAnalysisQueueAdapter, BufferedSQSAnalysisQueueAdapter
     from adapters.mock_social_media import SocialMediaManager  # Always use mock for now
-    storage = S3StorageAdapter(BUCKET_NAME, AWS_REGION)
-    raw_storage = S3StorageAdapter(RAW_BUCKET_NAME, AWS_REGION)  # Use same adapter for raw
-    queue = SQSQueueAdapter(QUEUE_URL)
-    analysis_queue = SQSAnalysisQueueAdapter(ANALYSIS_QUEUE_URL)
+    from adapters.database_image_index import DatabaseImageIndex
+    from adapters.sqs_job_source import SQSJobSource
+    # Content-addressed keys are shared across workers through the stored_objects table
+    storage = S3StorageAdapter(BUCKET_NAME, AWS_REGION, DatabaseImageIndex(SessionLocal, BUCKET_NAME))
+    raw_storage = S3StorageAdapter(RAW_BUCKET_NAME, AWS_REGION, DatabaseImageIndex(SessionLocal, RAW_BUCKET_NAME))  # Use same adapter for raw
+    if SQS_BATCH_SENDS:
+        # Jobs are coalesced into SendMessageBatch calls off the request path
+        queue = BufferedSQSQueueAdapter(QUEUE_URL, flush_interval=SQS_FLUSH_INTERVAL)
+        analysis_queue = BufferedSQSAnalysisQueueAdapter(ANALYSIS_QUEUE_URL, flush_interval=SQS_FLUSH_INTERVAL)
+    else:
+        queue = SQSQueueAdapter(QUEUE_URL)
+        analysis_queue = SQSAnalysisQueueAdapter(ANALYSIS_QUEUE_URL)
+    # The outbox relay sends synchronously so a failed send keeps its row pending
+    relay_analysis_queue = SQSAnalysisQueueAdapter(ANALYSIS_QUEUE_URL)
+    job_source = SQSJobSource(ANALYSIS_QUEUE_URL, ANALYSIS_DLQ_URL)
     social_media_manager = SocialMediaManager()
     # sns_notification = RealSNSAdapter(SNS_TOPIC_ARN)  # TODO: Implement real SNS
+    sns_notification = None  # Raw image jobs wait in the outbox until then
     print("Using Real S3 Storage and SQS Queues")
 
+# Each storage, queue, SNS and social media call gets its own span when tracing is on
+storage = traced(storage, "storage", tracer)
+raw_storage = traced(raw_storage, "raw_storage", tracer)
+queue = traced(queue, "queue", tracer)
+analysis_queue = traced(analysis_queue, "analysis_queue", tracer)
+relay_analysis_queue = traced(relay_analysis_queue, "analysis_queue", tracer)
+sns_notification = traced(sns_notification, "sns", tracer)
+social_media_manager.adapters = {
+    platform: traced(adapter, f"social_media.{platform}", tracer)
+    for platform, adapter in social_media_manager.adapters.items()
+}
+
 service = ImageProcessingService(storage, queue)
 
+def attach_derivative_urls(product_id: str, image_urls: Dict[str, str]):
+    """Record generated rendition URLs on the product once the pipeline finishes"""
+    db = SessionLocal()
+    try:
+        replaced = DatabaseProductRepository(db).merge_image_urls(product_id, image_urls)
+    finally:
+        db.close()
+    for old_url in (replaced or {}).values():
+        storage.release_image(old_url)
+
+derivative_service = ImageDerivativeService(
+    storage, PillowImageProcessor(), attach_derivative_urls, max_workers=IMAGE_DERIVATIVE_WORKERS
+)
+
+# Analysis jobs and notifications are committed to the outbox with the change that
+# triggered them; the relay delivers them to the queue/SNS off the request path
+outbox_relay = OutboxRelay(
+    lambda: open_outbox(SessionLocal),
+    job_dispatchers(relay_analysis_queue, sns_notification),
+    poll_interval=OUTBOX_POLL_INTERVAL,
+    tracer=tracer
+)
+
+def save_recommendations(recommendations: List):
+    """Persist one batch of consumer results"""
+    db = SessionLocal()
+    try:
+        DatabaseRecommendationRepository(db).add_all(recommendations)
+    finally:
+        db.close()
+
+analysis_consumer = AnalysisJobConsumer(
+    job_source, MockJobAnalyzer(), save_recommendations, concurrency=ANALYSIS_CONSUMER_CONCURRENCY, tracer=tracer
+) if job_source else None
+
+# Partition maintenance relies on PostgreSQL declarative partitioning
+retention_sweeper = RetentionSweeper(
+    DatabaseRetention(engine),
+    {"recommendations": RECOMMENDATION_RETENTION_MONTHS, "campaign_metrics": CAMPAIGN_METRIC_RETENTION_MONTHS},
+    interval=RETENTION_SWEEP_INTERVAL
+) if RETENTION_SWEEPER_ENABLED and engine.dialect.name == "postgresql" else None
+
+# In-memory catalog indexes: filled from the database on first use (autocomplete
+# is also warmed at startup), kept current by this process's committed changes
+# and reloaded in the background after CATALOG_INDEX_TTL for everyone else's
+color_index = NumpyColorIndex()
+register_color_sync(color_index)
+autocomplete_index = PrefixAutocompleteIndex()
+if AUTOCOMPLETE_BACKEND == "memory":
+    register_autocomplete_sync(autocomplete_index)
+_index_loaded_at: Dict[int, float] = {}
+_indexes_reloading = set()
+_index_load_lock = threading.Lock()
+
+def ensure_index_loaded(index, load, db: Session):
+    loaded_at = _index_loaded_at.get(id(index))
+    if loaded_at is None:
+        with _index_load_lock:
+            if id(index) not in _index_loaded_at:
+                load(db, index)
+                _index_loaded_at[id(index)] = time.monotonic()
+    elif CATALOG_INDEX_TTL > 0 and time.monotonic() - loaded_at > CATALOG_INDEX_TTL:
+        reload_index_in_background(index, load)
+    return index
+
+def reload_index_in_background(index, load):
+    """Refresh a stale index off the request path; lookups keep using the old contents meanwhile"""
+    with _index_load_lock:
+        if id(index) in _indexes_reloading:
+            return
+        _indexes_reloading.add(id(index))
+    
+    def reload():
+        db = SessionLocal()
+        try:
+            load(db, index)
+            _index_loaded_at[id(index)] = time.monotonic()
+        except Exception:
+            logger.exception("Reloading a catalog index failed; retrying on a later request")
+        finally:
+            db.close()
+            with _index_load_lock:
+                _indexes_reloading.discard(id(index))
+    
+    threading.Thread(target=reload, name="catalog-index-reload", daemon=True).start()
+
+def warm_autocomplete_index():
+    db = SessionLocal()
+    try:
+        ensure_index_loaded(autocomplete_index, load_autocomplete, db)
+    except Exception:
+        logger.exception("Warming the autocomplete index failed; it will load on first use")
+    finally:
+        db.close()
+
+# Assembled category tree, dropped on local catalog writes and expired after
+# CATEGORY_TREE_TTL to pick up other workers' changes
+def load_category_tree():
+    db = SessionLocal()
+    try:
+        return build_tree(DatabaseCategoryTree(db).nodes())
+    finally:
+        db.close()
+
+category_tree_cache = CategoryTreeCache(load_category_tree, ttl=CATEGORY_TREE_TTL)
+register_catalog_sync(CategoryTreeInvalidator(category_tree_cache))
+
 # GraphQL endpoint
 graphql_app = GraphQLRouter(schema)
 app.include_router(graphql_app, prefix="/graphql")
@@ -84,6 +406,9 @@ class CategoryUpdate(BaseModel):
     name: str
     description: Optional[str] = None
 
+class CategoryNodeCreate(CategoryCreate):
+    parent_id: Optional[str] = None
+
 class CategoryResponse(BaseModel):
     id: str
     name: str
@@ -283,6 +608,20 @@ class RecommendationResponse(BaseModel):
     created_time: datetime
     updated_time: Optional[datetime]
 
+class RecommendationSummaryResponse(BaseModel):
+    """Recommendation without its JSONB payloads, for list views"""
+    id: str
+    raw_image_key: str
+    analysis_type: str
+    confidence_score: Optional[Decimal]
+    version: int
+    expiry_date: Optional[datetime]
+    is_considered: bool
+    consideration_reason: Optional[str]
+    created_by: str
+    created_time: datetime
+    updated_time: Optional[datetime]
+
 class RecommendationUpdateRequest(BaseModel):
     is_considered: bool
     consideration_reason: Optional[str] = None
@@ -339,6 +678,30 @@ class MetricsCollectionRequest(BaseModel):
     start_date: datetime
     end_date: datetime
 
+class PresignedUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    purpose: str = "product"  # product, raw, image
+    product_id: Optional[str] = None
+    image_type: str = "raw"
+
+class PresignedUploadResponse(BaseModel):
+    key: str
+    upload_url: str
+    method: str
+    headers: Dict[str, str]
+    expires_in: int
+
+class UploadCompleteRequest(BaseModel):
+    key: str
+    purpose: str = "product"
+    product_id: Optional[str] = None
+    image_type: str = "raw"
+    filename: Optional[str] = None
+
+# Key prefix each direct-upload purpose is allowed to write under
+UPLOAD_PREFIXES = {"product": "products", "raw": "raw", "image": "images"}
+
 @app.post("/upload")
 async def upload_image(file: UploadFile):
     if not file.content_type.startswith('image/'):
@@ -353,6 +716,133 @@ async def upload_image(file: UploadFile):
     image_key = service.upload_and_queue(image)
     return {"image_key": image_key, "status": "queued"}
 
+# Direct-to-storage upload APIs
+@app.post("/uploads/presign", response_model=PresignedUploadResponse)
+async def create_presigned_upload(upload_request: PresignedUploadRequest, db: Session = Depends(get_db)):
+    """Issue a presigned PUT URL so image bytes go straight to storage"""
+    from adapters.content_addressing import object_extension
+    from adapters.database.entities import ProductEntity
+    import uuid
+    
+    if upload_request.purpose not in UPLOAD_PREFIXES:
+        raise HTTPException(400, f"Invalid purpose. Must be one of: {', '.join(UPLOAD_PREFIXES)}")
+    if not upload_request.content_type.startswith('image/'):
+        raise HTTPException(400, "File must be an image")
+    product_id = None
+    if upload_request.purpose == "product":
+        if not upload_request.product_id:
+            raise HTTPException(400, "product_id is required for product uploads")
+        try:
+            product_id = uuid.UUID(upload_request.product_id)
+        except ValueError:
+            raise HTTPException(400, "Invalid product_id")
+        if not db.query(ProductEntity.id).filter(ProductEntity.id == product_id).first():
+            raise HTTPException(404, "Product not found")
+    
+    extension = object_extension(upload_request.filename, upload_request.content_type)
+    key = f"{UPLOAD_PREFIXES[upload_request.purpose]}/{uuid.uuid4()}{extension}"
+    target = raw_storage if upload_request.purpose == "raw" else storage
+    presigned = target.create_presigned_upload(key, upload_request.content_type, PRESIGNED_UPLOAD_EXPIRY)
+    # Only keys issued here can be completed
+    DatabaseDirectUploadRepository(db).issue(
+        key,
+        target.bucket_name,
+        upload_request.purpose,
+        upload_request.content_type,
+        product_id=product_id,
+        filename=upload_request.filename
+    )
+    
+    return PresignedUploadResponse(
+        key=key,
+        upload_url=presigned["url"],
+        method=presigned["method"],
+        headers=presigned["headers"],
+        expires_in=PRESIGNED_UPLOAD_EXPIRY
+    )
+
+@app.put("/uploads/local/{bucket_name}/{key:path}")
+async def receive_local_upload(bucket_name: str, key: str, expires: int, signature: str, request: Request):
+    """Local equivalent of an S3 presigned PUT, served only with mock storage"""
+    if not USE_MOCK_STORAGE:
+        raise HTTPException(404, "Not found")
+    target = {storage.bucket_name: storage, raw_storage.bucket_name: raw_storage}.get(bucket_name)
+    if not target:
+        raise HTTPException(404, "Bucket not found")
+    if not target.write_presigned_upload(key, expires, signature, await request.body()):
+        raise HTTPException(403, "Signature invalid or expired")
+    return {"key": key}
+
+@app.post("/uploads/complete")
+async def complete_upload(complete_request: UploadCompleteRequest, db: Session = Depends(get_db)):
+    """Verify a direct upload and hand it to the analysis pipeline; retries replay the first result"""
+    from adapters.database.entities import ProductEntity
+    from domain.models import ProductAnalysisJob, ProcessingJob, RawImageAnalysisJob
+    
+    if complete_request.purpose not in UPLOAD_PREFIXES:
+        raise HTTPException(400, f"Invalid purpose. Must be one of: {', '.join(UPLOAD_PREFIXES)}")
+    uploads = DatabaseDirectUploadRepository(db)
+    upload = uploads.claim(complete_request.key)
+    if not upload or upload.purpose != complete_request.purpose:
+        raise HTTPException(404, "No presigned upload was issued for this key")
+    if upload.result is not None:
+        return upload.result
+    if complete_request.product_id and str(upload.product_id) != complete_request.product_id:
+        raise HTTPException(400, "product_id does not match the presigned upload")
+    filename = complete_request.filename or upload.filename or complete_request.key.rsplit('/', 1)[-1]
+    target = raw_storage if upload.purpose == "raw" else storage
+    
+    if upload.purpose == "product":
+        sku_id = db.query(ProductEntity.sku_id).filter(ProductEntity.id == upload.product_id).scalar()
+        if sku_id is None:
+            raise HTTPException(404, "Product not found")
+    content_key = target.confirm_upload(upload.key, upload.content_type)
+    if content_key is None:
+        raise HTTPException(400, "Upload not found in storage")
+    
+    if upload.purpose == "raw":
+        result = {
+            "key": content_key,
+            "raw_image_url": raw_storage.get_raw_image_url(content_key),
+            "analysis_queued": True
+        }
+        DatabaseOutboxRepository(db).add(raw_image_analysis_message(RawImageAnalysisJob(
+            raw_image_key=content_key,
+            filename=filename,
+            analysis_type="market_analysis"
+        )))
+        uploads.complete(upload, content_key, result)
+        db.commit()
+    elif upload.purpose == "image":
+        result = {"key": content_key, "status": "queued"}
+        queue.queue_job(ProcessingJob(image_key=content_key, filename=filename, traceparent=current_traceparent()))
+        uploads.complete(upload, content_key, result)
+        db.commit()
+    else:
+        product_id = str(upload.product_id)
+        image_urls = {complete_request.image_type: storage.get_image_url(content_key)}
+        result = {
+            "key": content_key,
+            "image_urls": image_urls,
+            "product_id": product_id,
+            "analysis_queued": True
+        }
+        # Staged on the same session, so the analysis job and the completion commit with the new image URLs
+        DatabaseOutboxRepository(db).add(product_analysis_message(ProductAnalysisJob(
+            product_id=product_id,
+            sku_id=sku_id,
+            image_urls=image_urls
+        )))
+        uploads.complete(upload, content_key, result)
+        replaced = DatabaseProductRepository(db).merge_image_urls(upload.product_id, image_urls)
+        for old_url in (replaced or {}).values():
+            storage.release_image(old_url)
+    
+    target.discard_upload(upload.key)
+    if upload.purpose != "image":
+        outbox_relay.notify()
+    return result
+
 # Category APIs
 @app.post("/categories", response_model=CategoryResponse)
 async def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
@@ -447,7 +937,7 @@ async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
             product_repo.create_variant(variant)
     
     # Get updated product with variants
-    updated_result = product_repo.get_by_id(result.id)
+    updated_result = product_repo.get_by_id(result.id, load=PRODUCT_RELATIONS)
     return convert_product_to_response(updated_result)
 
 @app.get("/products")
@@ -460,7 +950,7 @@ async def get_products(db: Session = Depends(get_db)):
 @app.get("/products/{product_id}", response_model=ProductResponse)
 async def get_product(product_id: str, db: Session = Depends(get_db)):
     product_service = ProductService(DatabaseProductRepository(db))
-    product = product_service.get_product(product_id)
+    product = product_service.get_product(product_id, load=PRODUCT_RELATIONS)
     if not product:
         raise HTTPException(404, "Product not found")
     
@@ -504,7 +994,7 @@ async def update_product(product_id: str, product_update: ProductUpdate, db: Ses
             product_repo.create_variant(variant)
     
     # Get updated product with variants
-    updated_result = product_repo.get_by_id(result.id)
+    updated_result = product_repo.get_by_id(result.id, load=PRODUCT_RELATIONS)
     return convert_product_to_response(updated_result)
 
 @app.delete("/products/{product_id}")
@@ -523,7 +1013,7 @@ async def discontinue_product(
 ):
     """Discontinue a product with reason"""
     product_service = ProductService(DatabaseProductRepository(db))
-    product = product_service.get_product(product_id)
+    product = product_service.get_product(product_id, load=("price",))
     if not product:
         raise HTTPException(404, "Product not found")
     
@@ -551,7 +1041,7 @@ async def update_product_status(
 ):
     """Update product status with optional notes"""
     product_service = ProductService(DatabaseProductRepository(db))
-    product = product_service.get_product(product_id)
+    product = product_service.get_product(product_id, load=("price",))
     if not product:
         raise HTTPException(404, "Product not found")
     
@@ -577,7 +1067,7 @@ async def update_product_status(
 async def enable_product(product_id: str, db: Session = Depends(get_db)):
     """Enable a product"""
     product_service = ProductService(DatabaseProductRepository(db))
-    product = product_service.get_product(product_id)
+    product = product_service.get_product(product_id, load=("price",))
     if not product:
         raise HTTPException(404, "Product not found")
     
@@ -595,7 +1085,7 @@ async def enable_product(product_id: str, db: Session = Depends(get_db)):
 async def disable_product(product_id: str, db: Session = Depends(get_db)):
     """Disable a product"""
     product_service = ProductService(DatabaseProductRepository(db))
-    product = product_service.get_product(product_id)
+    product = product_service.get_product(product_id, load=("price",))
     if not product:
         raise HTTPException(404, "Product not found")
     
@@ -617,10 +1107,17 @@ async def upload_product_images(
     zoom: UploadFile = File(None),
     db: Session = Depends(get_db)
 ):
+    from adapters.database.entities import ProductEntity
+    from domain.models import ProductAnalysisJob
+    import uuid
+    
     try:
-        product_service = ProductService(DatabaseProductRepository(db), analysis_queue)
-        product = product_service.get_product(product_id)
-        if not product:
+        try:
+            product_uuid = uuid.UUID(product_id)
+        except ValueError:
+            raise HTTPException(404, "Product not found")
+        sku_id = db.query(ProductEntity.sku_id).filter(ProductEntity.id == product_uuid).scalar()
+        if sku_id is None:
             raise HTTPException(404, "Product not found")
         
         # Validate image files
@@ -644,27 +1141,33 @@ async def upload_product_images(
                     content_type=file.content_type
                 )
         
+        # Renditions the client didn't send are generated server-side from the raw upload
+        derivatives_pending = [name for name in derivative_service.renditions if name not in image_uploads]
+        if derivatives_pending:
+            derivative_service.submit(product_uuid, image_uploads["raw"], skip=image_uploads.keys())
+        
         # Store images and get URLs
         image_urls = storage.store_product_images(image_uploads)
         
-        # Update product with image URLs
-        product.image_urls.update(image_urls)
-        updated_product = product_service.update_product(product)
-        
-        # Queue for GenAI analysis
-        from domain.models import ProductAnalysisJob
-        analysis_job = ProductAnalysisJob(
+        # Stage the GenAI analysis job so it commits atomically with the image URLs
+        DatabaseOutboxRepository(db).add(product_analysis_message(ProductAnalysisJob(
             product_id=product_id,
-            sku_id=product.sku_id,
+            sku_id=sku_id,
             image_urls=image_urls
-        )
-        analysis_queue.queue_analysis(analysis_job)
+        )))
+        
+        # Update product with image URLs, dropping our reference to any image being replaced
+        replaced = DatabaseProductRepository(db).merge_image_urls(product_uuid, image_urls)
+        for old_url in (replaced or {}).values():
+            storage.release_image(old_url)
+        outbox_relay.notify()
         
         return {
             "message": "Images uploaded successfully",
             "image_urls": image_urls,
             "product_id": product_id,
-            "analysis_queued": True
+            "analysis_queued": True,
+            "derivatives_pending": derivatives_pending
         }
     except HTTPException:
         raise
@@ -712,7 +1215,7 @@ async def create_variant(product_id: str, variant_data: ProductVariantCreate, db
 @app.get("/products/{product_id}/variants", response_model=List[ProductVariantResponse])
 async def get_variants(product_id: str, db: Session = Depends(get_db)):
     product_repo = DatabaseProductRepository(db)
-    product = product_repo.get_by_id(product_id)
+    product = product_repo.get_by_id(product_id, load=("variants",))
     if not product:
         raise HTTPException(404, "Product not found")
     
@@ -723,7 +1226,7 @@ async def update_variant(product_id: str, variant_id: str, variant_data: Product
     product_repo = DatabaseProductRepository(db)
     
     # Get existing variant
-    product = product_repo.get_by_id(product_id)
+    product = product_repo.get_by_id(product_id, load=("variants",))
     if not product:
         raise HTTPException(404, "Product not found")
     
@@ -786,22 +1289,12 @@ async def create_price(product_id: str, price_data: PriceTableCreate, db: Sessio
 
 @app.put("/products/{product_id}/price", response_model=PriceTableResponse)
 async def update_price(product_id: str, price_data: PriceTableUpdate, db: Session = Depends(get_db)):
-    from adapters.database.entities import PriceTableEntity
-    from datetime import datetime
+    from adapters.database_batch_writer import DatabaseBatchWriter
     
-    price_entity = db.query(PriceTableEntity).filter(PriceTableEntity.product_id == product_id).first()
-    if not price_entity:
-        raise HTTPException(status_code=404, detail="Price not found")
-    
-    if price_data.wholesale_price is not None:
-        price_entity.wholesale_price = price_data.wholesale_price
-    if price_data.retail_price is not None:
-        price_entity.retail_price = price_data.retail_price
-    if price_data.currency is not None:
-        price_entity.currency = price_data.currency
-    price_entity.modified_by = price_data.modified_by
-    price_entity.modified_time = datetime.utcnow()
-    price_entity.version += 1
+    try:
+        price_entity = DatabaseBatchWriter(db).update_price(product_id, price_data.model_dump())
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
     db.commit()
     db.refresh(price_entity)
@@ -831,9 +1324,37 @@ async def delete_price(product_id: str, db: Session = Depends(get_db)):
     db.commit()
     return {"message": "Price deleted successfully"}
 
+@app.post("/admin/storage/gc")
+async def collect_storage_garbage(grace_seconds: int = 3600):
+    """Delete stored images that are no longer referenced"""
+    deleted = storage.collect_garbage(grace_seconds)
+    return {"deleted": deleted, "count": len(deleted)}
+
+@app.post("/admin/retention/sweep")
+async def run_retention_sweep():
+    """Delete expired recommendations and drop partitions past retention now"""
+    if not retention_sweeper:
+        raise HTTPException(404, "Retention sweeper is not enabled")
+    return await run_in_threadpool(retention_sweeper.sweep)
+
+@app.get("/admin/slow-queries")
+async def list_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """Recently captured slow statements with redacted parameters, call site and plan"""
+    if not slow_query_log:
+        raise HTTPException(404, "Slow query log is not enabled")
+    return [asdict(entry) for entry in slow_query_log.recent(limit)]
+
+@app.delete("/admin/slow-queries")
+async def clear_slow_queries():
+    """Empty the slow query buffer, e.g. after deploying an index"""
+    if not slow_query_log:
+        raise HTTPException(404, "Slow query log is not enabled")
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
 # Raw Image Analysis APIs
 @app.post("/raw-images/upload", response_model=RawImageUploadResponse)
-async def upload_raw_image(raw: UploadFile = File(...)):
+async def upload_raw_image(raw: UploadFile = File(...), db: Session = Depends(get_db)):
     """Upload raw image for market analysis"""
     if not raw.content_type.startswith('image/'):
         raise HTTPException(400, "File must be an image")
@@ -848,14 +1369,16 @@ async def upload_raw_image(raw: UploadFile = File(...)):
     raw_image_key = raw_storage.store_raw_image(image_upload)
     raw_image_url = raw_storage.get_raw_image_url(raw_image_key)
     
-    # Send SNS notification for agent analysis
+    # Record the SNS notification for agent analysis; the outbox relay sends it
     from domain.models import RawImageAnalysisJob
     analysis_job = RawImageAnalysisJob(
         raw_image_key=raw_image_key,
         filename=raw.filename,
         analysis_type="market_analysis"
     )
-    sns_notification.send_notification(analysis_job)
+    DatabaseOutboxRepository(db).add(raw_image_analysis_message(analysis_job))
+    db.commit()
+    outbox_relay.notify()
     
     return RawImageUploadResponse(
         raw_image_key=raw_image_key,
@@ -864,31 +1387,53 @@ async def upload_raw_image(raw: UploadFile = File(...)):
         message="Raw image uploaded and queued for analysis"
     )
 
-@app.get("/recommendations", response_model=List[RecommendationResponse])
-async def get_recommendations(db: Session = Depends(get_db)):
-    """Get all recommendations"""
-    from adapters.database.entities import RecommendationEntity
+@app.get("/recommendations", response_model=List[Union[RecommendationResponse, RecommendationSummaryResponse]])
+async def get_recommendations(
+    analysis_type: Optional[str] = None,
+    is_considered: Optional[bool] = None,
+    min_confidence: Optional[Decimal] = None,
+    max_confidence: Optional[Decimal] = None,
+    active_only: bool = False,
+    sku_properties: Optional[str] = Query(None, description='JSON object the sku_properties must contain, e.g. {"material": "silk"}'),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """List recommendations newest first.
     
-    recommendations = db.query(RecommendationEntity).order_by(RecommendationEntity.created_time.desc()).all()
+    Sending limit or cursor pages the results, with the next page's cursor in X-Next-Cursor;
+    without either every matching recommendation is returned.
+    """
+    from domain.models import RecommendationQuery
     
-    return [
-        RecommendationResponse(
-            id=str(rec.id),
-            raw_image_key=rec.raw_image_key,
-            analysis_type=rec.analysis_type,
-            recommended_products=rec.recommended_products,
-            market_insights=rec.market_insights,
-            sku_properties=rec.sku_properties,
-            confidence_score=rec.confidence_score,
-            version=rec.version,
-            expiry_date=rec.expiry_date,
-            is_considered=rec.is_considered,
-            consideration_reason=rec.consideration_reason,
-            created_by=rec.created_by,
-            created_time=rec.created_time,
-            updated_time=rec.updated_time
-        ) for rec in recommendations
-    ]
+    sku_filter = None
+    if sku_properties:
+        try:
+            sku_filter = json.loads(sku_properties)
+        except ValueError:
+            raise HTTPException(400, "sku_properties must be a JSON object")
+        if not isinstance(sku_filter, dict):
+            raise HTTPException(400, "sku_properties must be a JSON object")
+    
+    query = RecommendationQuery(
+        analysis_type=analysis_type,
+        is_considered=is_considered,
+        min_confidence=min_confidence,
+        max_confidence=max_confidence,
+        unexpired_only=active_only,
+        sku_properties=sku_filter,
+        summary=view == "summary",
+        limit=limit or (RECOMMENDATION_PAGE_SIZE if cursor else None),
+        cursor=cursor
+    )
+    try:
+        rows, next_cursor = DatabaseRecommendationRepository(db).search(query)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    
+    model = RecommendationSummaryResponse if query.summary else RecommendationResponse
+    return rows_response(rows, model, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
 
 @app.get("/recommendations/{recommendation_id}", response_model=RecommendationResponse)
 async def get_recommendation(recommendation_id: str, db: Session = Depends(get_db)):
@@ -1009,27 +1554,11 @@ async def get_campaigns(db: Session = Depends(get_db)):
     """Get all campaigns"""
     from adapters.database.entities import CampaignEntity
     
-    campaigns = db.query(CampaignEntity).order_by(CampaignEntity.created_time.desc()).all()
-    
-    return [
-        CampaignResponse(
-            id=str(c.id),
-            name=c.name,
-            platform=c.platform,
-            campaign_type=c.campaign_type,
-            target_audience=c.target_audience,
-            budget=c.budget,
-            currency=c.currency,
-            start_date=c.start_date,
-            end_date=c.end_date,
-            status=c.status,
-            platform_campaign_id=c.platform_campaign_id,
-            creative_assets=c.creative_assets,
-            created_by=c.created_by,
-            created_time=c.created_time,
-            updated_time=c.updated_time
-        ) for c in campaigns
-    ]
+    columns = CampaignEntity.__table__.c
+    rows = db.execute(
+        select(*(columns[field] for field in model_fields(CampaignResponse))).order_by(columns.created_time.desc())
+    ).mappings()
+    return rows_response(rows, CampaignResponse)
 
 @app.put("/campaigns/{campaign_id}/status")
 async def update_campaign_status(
@@ -1143,25 +1672,7 @@ async def get_campaign_metrics(
         query = query.filter(CampaignMetricEntity.metric_date <= datetime.fromisoformat(end_date))
     
     metrics = query.order_by(CampaignMetricEntity.metric_date.asc()).all()
-    
-    return [
-        CampaignMetricResponse(
-            id=str(m.id),
-            campaign_id=str(m.campaign_id),
-            metric_date=m.metric_date,
-            impressions=m.impressions,
-            clicks=m.clicks,
-            conversions=m.conversions,
-            spend=m.spend,
-            reach=m.reach,
-            engagement=m.engagement,
-            ctr=m.ctr,
-            cpc=m.cpc,
-            cpm=m.cpm,
-            additional_metrics=m.additional_metrics,
-            collected_at=m.collected_at
-        ) for m in metrics
-    ]
+    return rows_response(metrics, CampaignMetricResponse)
 
 # Stock Management APIs
 @app.post("/products/{product_id}/stock", response_model=StockResponse)
@@ -1208,31 +1719,12 @@ async def create_stock(product_id: str, stock_data: StockCreateRequest, db: Sess
 @app.put("/products/{product_id}/stock", response_model=StockResponse)
 async def update_stock(product_id: str, stock_data: StockUpdateRequest, db: Session = Depends(get_db)):
     """Update stock record for a product"""
-    from adapters.database.entities import StockEntity
+    from adapters.database_batch_writer import DatabaseBatchWriter
     
-    stock_entity = db.query(StockEntity).filter(StockEntity.product_id == product_id).first()
-    if not stock_entity:
-        raise HTTPException(404, "Stock record not found")
-    
-    if stock_data.current_stock is not None:
-        stock_entity.current_stock = stock_data.current_stock
-    if stock_data.reserved_stock is not None:
-        stock_entity.reserved_stock = stock_data.reserved_stock
-    if stock_data.reorder_level is not None:
-        stock_entity.reorder_level = stock_data.reorder_level
-    if stock_data.max_stock_level is not None:
-        stock_entity.max_stock_level = stock_data.max_stock_level
-    if stock_data.unit_of_measure is not None:
-        stock_entity.unit_of_measure = stock_data.unit_of_measure
-    if stock_data.warehouse_location is not None:
-        stock_entity.warehouse_location = stock_data.warehouse_location
-    if stock_data.batch_number is not None:
-        stock_entity.batch_number = stock_data.batch_number
-    if stock_data.expiry_date is not None:
-        stock_entity.expiry_date = stock_data.expiry_date
-    
-    stock_entity.available_stock = stock_entity.current_stock - stock_entity.reserved_stock
-    stock_entity.updated_by = stock_data.updated_by
+    try:
+        stock_entity = DatabaseBatchWriter(db).update_stock(product_id, stock_data.model_dump())
+    except LookupError as e:
+        raise HTTPException(404, str(e))
     
     db.commit()
     db.refresh(stock_entity)
@@ -1253,9 +1745,72 @@ async def update_stock(product_id: str, stock_data: StockUpdateRequest, db: Sess
         updated_by=stock_entity.updated_by
     )
 
+# Batch API
+class BatchOperationRequest(BaseModel):
+    op: Literal["update_product", "create_variant", "update_variant", "delete_variant", "update_price", "update_stock"]
+    product_id: str
+    variant_id: Optional[str] = None
+    data: Dict = {}
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperationRequest] = Field(..., min_length=1, max_length=100)
+
+# Each operation's data is validated by the model its single-resource endpoint uses
+BATCH_PAYLOADS = {
+    "update_product": ProductUpdate,
+    "create_variant": ProductVariantCreate,
+    "update_variant": ProductVariantUpdate,
+    "update_price": PriceTableUpdate,
+    "update_stock": StockUpdateRequest,
+}
+
+def batch_failure(status_code: int, index: int, operation: BatchOperationRequest, detail) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content=jsonable_encoder({"detail": detail, "failed_index": index, "op": operation.op})
+    )
+
+@app.post("/api/v1/batch")
+async def batch_v1(batch: BatchRequest, db: Session = Depends(get_db)):
+    """Apply product, variant, price and stock writes in order, in one transaction.
+    
+    Either every operation is committed together or, if one fails, none are
+    and the response names the failing operation.
+    """
+    from domain.models import BatchOperation
+    from adapters.database_batch_writer import DatabaseBatchWriter
+    
+    writer = DatabaseBatchWriter(db)
+    results = []
+    for index, operation in enumerate(batch.operations):
+        payload_model = BATCH_PAYLOADS.get(operation.op)
+        data = {}
+        if payload_model:
+            try:
+                data = payload_model.model_validate(operation.data).model_dump(exclude_unset=True)
+            except ValidationError as e:
+                db.rollback()
+                return batch_failure(422, index, operation, e.errors(include_url=False))
+            if operation.op == "update_product" and "variants" in data:
+                db.rollback()
+                return batch_failure(400, index, operation, "Use variant operations to change variants")
+        try:
+            result = writer.apply(BatchOperation(operation.op, operation.product_id, operation.variant_id, data))
+        except LookupError as e:
+            db.rollback()
+            return batch_failure(404, index, operation, str(e))
+        except (ValueError, SQLAlchemyError) as e:
+            db.rollback()
+            return batch_failure(400, index, operation, str(e))
+        results.append({"index": index, "op": operation.op, "result": result})
+    
+    db.commit()
+    return {"results": results}
+
 # API v1 endpoints with ORM operations
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import Column, String, Integer, Numeric, UUID, Boolean, DateTime, ForeignKey, Text, JSON, ARRAY
+from adapters.database.entities import category_depth_default, category_path_default
 import uuid
 from datetime import datetime
 
@@ -1269,6 +1824,9 @@ class CategoryORM(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
+    parent_id = Column(UUID(as_uuid=True), ForeignKey("categories.id"), nullable=True)
+    path = Column(String(1024), nullable=False, default=category_path_default)
+    depth = Column(Integer, nullable=False, default=category_depth_default)
 
 class ProductORM(Base):
     __tablename__ = "products"
@@ -1343,32 +1901,60 @@ class StockORM(Base):
     partner_sku = Column(String(100), nullable=True)
 
 # Categories API
+def category_dict(category) -> dict:
+    return {
+        "id": str(category.id),
+        "name": category.name,
+        "description": category.description,
+        "parent_id": str(category.parent_id) if category.parent_id else None
+    }
+
 @app.get("/api/v1/categories")
 async def get_categories_v1(db: Session = Depends(get_db)):
     """Get all categories using ORM"""
-    categories = db.query(CategoryORM).all()
-    return [{"id": str(cat.id), "name": cat.name, "description": cat.description} for cat in categories]
+    categories = db.query(CategoryORM).order_by(CategoryORM.path).all()
+    return [category_dict(cat) for cat in categories]
+
+@app.get("/api/v1/categories/tree")
+async def get_category_tree_v1():
+    """The whole category hierarchy with product counts, served from cache"""
+    tree = await run_in_threadpool(category_tree_cache.get)
+    return [asdict(node) for node in tree]
 
 @app.post("/api/v1/categories")
-async def create_category_v1(category: CategoryCreate, db: Session = Depends(get_db)):
+async def create_category_v1(category: CategoryNodeCreate, db: Session = Depends(get_db)):
     """Create new category using ORM"""
-    db_category = CategoryORM(name=category.name, description=category.description)
+    if category.parent_id and not db.query(CategoryORM.id).filter(CategoryORM.id == category.parent_id).first():
+        raise HTTPException(404, "Parent category not found")
+    db_category = CategoryORM(name=category.name, description=category.description, parent_id=category.parent_id)
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
-    return {"id": str(db_category.id), "name": db_category.name, "description": db_category.description}
+    return category_dict(db_category)
 
 @app.put("/api/v1/categories/{category_id}")
-async def update_category_v1(category_id: str, category: CategoryCreate, db: Session = Depends(get_db)):
-    """Update category using ORM"""
+async def update_category_v1(category_id: str, category: CategoryNodeCreate, db: Session = Depends(get_db)):
+    """Update category using ORM; sending parent_id moves it and its subtree"""
+    from adapters.database_category_tree import DatabaseCategoryTree
+    
     db_category = db.query(CategoryORM).filter(CategoryORM.id == category_id).first()
     if not db_category:
         raise HTTPException(404, "Category not found")
     
     db_category.name = category.name
     db_category.description = category.description
+    if "parent_id" in category.model_fields_set:
+        try:
+            DatabaseCategoryTree(db).move(category_id, category.parent_id)
+        except LookupError as e:
+            raise HTTPException(404, str(e))
+        except ValueError as e:
+            raise HTTPException(400, str(e))
     db.commit()
-    return {"id": str(db_category.id), "name": db_category.name, "description": db_category.description}
+    db.refresh(db_category)
+    # Path rewrites bypass the ORM, so the commit hook can't see them
+    category_tree_cache.invalidate()
+    return category_dict(db_category)
 
 @app.delete("/api/v1/categories/{category_id}")
 async def delete_category_v1(category_id: str, db: Session = Depends(get_db)):
@@ -1376,12 +1962,132 @@ async def delete_category_v1(category_id: str, db: Session = Depends(get_db)):
     db_category = db.query(CategoryORM).filter(CategoryORM.id == category_id).first()
     if not db_category:
         raise HTTPException(404, "Category not found")
+    if db.query(CategoryORM.id).filter(CategoryORM.parent_id == category_id).first():
+        raise HTTPException(409, "Category has subcategories; move or delete them first")
     
     db.delete(db_category)
     db.commit()
     return {"message": "Category deleted successfully"}
 
+@app.get("/api/v1/categories/{category_id}/breadcrumb")
+async def get_category_breadcrumb_v1(category_id: str, db: Session = Depends(get_db)):
+    """The category's ancestors from the root down, ending with the category itself"""
+    from adapters.database_category_tree import DatabaseCategoryTree
+    
+    trail = DatabaseCategoryTree(db).breadcrumb(category_id)
+    if not trail:
+        raise HTTPException(404, "Category not found")
+    return [{"id": node.id, "name": node.name, "depth": node.depth} for node in trail]
+
+@app.get("/api/v1/categories/{category_id}/subtree")
+async def get_category_subtree_v1(category_id: str, db: Session = Depends(get_db)):
+    """The category's subtree with direct and rolled-up product counts"""
+    from adapters.database_category_tree import DatabaseCategoryTree, build_tree
+    
+    nodes = DatabaseCategoryTree(db).subtree(category_id)
+    if not nodes:
+        raise HTTPException(404, "Category not found")
+    return asdict(build_tree(nodes)[0])
+
 # Products API
+@app.get("/api/v1/products/search")
+async def search_products_v1(
+    q: Optional[str] = Query(None, description='Full-text query over title, description, material and pattern; supports "quoted phrases", OR and -exclusions'),
+    material: Optional[str] = None,
+    pattern: Optional[str] = None,
+    scale: Optional[str] = None,
+    status: Optional[str] = None,
+    category_id: Optional[str] = None,
+    special_features: List[str] = Query([]),
+    enabled: Optional[bool] = None,
+    limit: int = Query(24, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Search products by relevance with facet counts for the matching set"""
+    from domain.models import ProductSearchQuery
+    from adapters.database_product_search import DatabaseProductSearch
+    
+    query = ProductSearchQuery(
+        text=q,
+        material=material,
+        pattern=pattern,
+        scale=scale,
+        status=status,
+        category_id=category_id,
+        special_features=special_features or None,
+        enabled=enabled,
+        limit=limit,
+        cursor=cursor
+    )
+    try:
+        result = DatabaseProductSearch(db).search(query)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {
+        "items": result.items,
+        "facets": result.facets,
+        "total": result.total,
+        "next_cursor": result.next_cursor
+    }
+
+@app.get("/api/v1/products/autocomplete")
+async def autocomplete_products_v1(
+    q: str = Query(..., min_length=1, description="Partial SKU, variant SKU suffix or title words"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Product picker suggestions: SKU matches first, then variant SKUs, then titles"""
+    if AUTOCOMPLETE_BACKEND == "memory":
+        await run_in_threadpool(ensure_index_loaded, autocomplete_index, load_autocomplete, db)
+        matches = autocomplete_index.complete(q, limit)
+    else:
+        from adapters.database_autocomplete import DatabaseAutocomplete
+        matches = DatabaseAutocomplete(db).complete(q, limit)
+    return [
+        {
+            "product_id": match.product_id,
+            "sku_id": match.sku_id,
+            "title": match.title,
+            "matched_field": match.matched_field,
+            "matched_text": match.matched_text
+        }
+        for match in matches
+    ]
+
+@app.get("/api/v1/products/similar-color")
+async def similar_color_products_v1(
+    hex: str = Query(..., description="Target colour as #rrggbb or #rgb"),
+    k: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Products whose primary or variant colour is perceptually closest to `hex`"""
+    from adapters.database.entities import ProductEntity
+    
+    index = await run_in_threadpool(ensure_index_loaded, color_index, load_colors, db)
+    try:
+        matches = index.nearest(hex, k)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    
+    products = {
+        str(row.id): row
+        for row in db.query(ProductEntity.id, ProductEntity.sku_id, ProductEntity.title).filter(
+            ProductEntity.id.in_([match.product_id for match in matches])
+        )
+    }
+    return [
+        {
+            "product_id": match.product_id,
+            "variant_id": match.variant_id,
+            "sku_id": products[match.product_id].sku_id,
+            "title": products[match.product_id].title,
+            "hex_color": match.hex_color,
+            "distance": match.distance
+        }
+        for match in matches if match.product_id in products
+    ]
+
 @app.get("/api/v1/products/list")
 async def get_products_list_v1(db: Session = Depends(get_db)):
     """Get products with category info using ORM"""
@@ -1448,8 +2154,15 @@ async def get_products_list_v1(db: Session = Depends(get_db)):
     return result
 
 @app.get("/api/v1/categories/{category_id}/products")
-async def get_products_by_category_v1(category_id: str, db: Session = Depends(get_db)):
+async def get_products_by_category_v1(
+    category_id: str,
+    include_descendants: bool = Query(True, description="Also list products from every subcategory"),
+    db: Session = Depends(get_db)
+):
     """Get products by category ID using ORM"""
+    if include_descendants:
+        from adapters.database_category_tree import DatabaseCategoryTree
+        return DatabaseCategoryTree(db).subtree_products(category_id)
     try:
         products = db.query(ProductORM).filter(ProductORM.category_id == category_id).all()
         return [{
@@ -1809,6 +2522,13 @@ async def delete_stock_v1(product_id: str, variant_id: str, stock_id: str, db: S
     db.commit()
     return {"message": "Stock record deleted successfully"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Per-route latency, SQL and response size metrics in the Prometheus text format"""
+    if request_metrics is None:
+        raise HTTPException(404, "Metrics are disabled")
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -0,0 +1,51 @@
+import time
+from adapters.mock_job_analyzer import MockJobAnalyzer
+from adapters.sqlite_job_queue import SQLiteJobQueue
+from adapters.sqs_analysis_queue import SQSAnalysisQueueAdapter
+from application.analysis_consumer import AnalysisJobConsumer
+from domain.models import ProductAnalysisJob
+
+class FailingAnalyzer(MockJobAnalyzer):
+    def analyze(self, job):
+        raise RuntimeError("model unavailable")
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+def test_consumer_saves_results_in_batches_and_deletes_messages(tmp_path):
+    local_queue = SQLiteJobQueue(str(tmp_path / "queue.db"))
+    producer = SQSAnalysisQueueAdapter("local-analysis", client=local_queue)
+    for i in range(12):
+        producer.queue_analysis(ProductAnalysisJob(product_id=f"p{i}", sku_id=f"SKU{i}", image_urls={"raw": f"raw/{i}.jpg"}))
+    
+    batches = []
+    consumer = AnalysisJobConsumer(
+        local_queue, MockJobAnalyzer(), batches.append, concurrency=4, batch_size=5, wait_seconds=1
+    )
+    consumer.start()
+    assert wait_for(lambda: consumer.processed == 12)
+    consumer.stop()
+    
+    assert sorted(r.sku_properties["sku_id"] for batch in batches for r in batch) == sorted(f"SKU{i}" for i in range(12))
+    assert max(len(batch) for batch in batches) <= 5
+    assert local_queue.depth() == 0
+
+def test_failing_and_malformed_messages_are_dead_lettered(tmp_path):
+    local_queue = SQLiteJobQueue(str(tmp_path / "queue.db"))
+    SQSAnalysisQueueAdapter("local-analysis", client=local_queue).queue_analysis(
+        ProductAnalysisJob(product_id="p1", sku_id="SKU1", image_urls={"raw": "raw/1.jpg"})
+    )
+    local_queue.send_message(QueueUrl="local-analysis", MessageBody="not json")
+    
+    consumer = AnalysisJobConsumer(
+        local_queue, FailingAnalyzer(), lambda results: None, wait_seconds=1, retry_delay=0, max_receives=3
+    )
+    consumer.start()
+    assert wait_for(lambda: consumer.dead_lettered == 2)
+    consumer.stop()
+    
+    assert local_queue.depth() == 0
+    assert local_queue.depth(local_queue.dead_letter_name) == 2
@@ -0,0 +1,49 @@
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from adapters.database_autocomplete import DatabaseAutocomplete
+from adapters.prefix_autocomplete_index import PrefixAutocompleteIndex
+
+def test_prefix_index_ranks_skus_before_variants_and_titles():
+    index = PrefixAutocompleteIndex()
+    index.bulk_load(
+        [("p1", "sil-001", "Red Silk Saree"), ("p2", "COT-002", "Silky Cotton Dupatta"), ("p3", "LIN-003", "Linen Throw")],
+        [("v1", "p3", "SILVER")]
+    )
+    
+    matches = index.complete("sil")
+    
+    assert [(m.product_id, m.matched_field, m.matched_text) for m in matches] == [
+        ("p1", "sku", "SIL-001"),
+        ("p3", "variant_sku", "SILVER"),
+        ("p2", "title", "Silky Cotton Dupatta"),
+    ]
+    assert [m.product_id for m in index.complete("silk sa")] == ["p1"]
+
+def test_prefix_index_follows_writes():
+    index = PrefixAutocompleteIndex()
+    index.upsert_product("p1", "ABC-1", "Block Print Quilt")
+    index.upsert_variant("v1", "p1", "ABX")
+    index.upsert_product("p1", "XYZ-1", "Block Print Quilt")
+    
+    assert [m.matched_field for m in index.complete("ab")] == ["variant_sku"]
+    index.remove_product("p1")
+    assert index.complete("ab") == [] and index.complete("block") == []
+
+def test_changes_made_while_a_reload_reads_its_snapshot_survive_it():
+    index = PrefixAutocompleteIndex()
+    
+    with index.loading():
+        # Committed after the snapshot below was read
+        index.upsert_product("p2", "NEW-2", "Silk Saree")
+        index.remove_product("p1")
+        index.bulk_load([("p1", "OLD-1", "Block Print Quilt")], [("v1", "p1", "ABX")])
+    
+    assert index.complete("block") == [] and index.complete("ab") == []
+    assert [m.product_id for m in index.complete("silk")] == ["p2"]
+
+def test_database_fallback_uses_trigram_friendly_patterns():
+    statement = DatabaseAutocomplete(Session()).complete_statement("SK_1", 10)
+    compiled = statement.compile(dialect=postgresql.dialect())
+    
+    assert "products.sku_id ILIKE" in str(compiled) and "word_similarity" in str(compiled)
+    assert {"SK\\_1%", "%SK\\_1%"} <= set(compiled.params.values())
@@ -0,0 +1,109 @@
+import uuid
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import main
+from adapters.database.config import get_db
+from adapters.database.entities import PriceTableEntity, ProductEntity, ProductVariantEntity, StockEntity
+from adapters.database_batch_writer import DatabaseBatchWriter
+from domain.models import BatchOperation
+
+class StagingSession:
+    """Stands in for a Session: hands out rows by entity and counts flushes and commits"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+        self.flushes = 0
+        self.commits = 0
+    
+    def query(self, entity):
+        row = self.rows.get(entity)
+        
+        class Query:
+            def filter(self, *criteria):
+                return self
+            
+            def first(self):
+                return row
+        return Query()
+    
+    def flush(self):
+        self.flushes += 1
+    
+    def commit(self):
+        self.commits += 1
+
+def test_batch_writes_are_flushed_but_never_committed():
+    product_id = uuid.uuid4()
+    price = PriceTableEntity(id=uuid.uuid4(), product_id=product_id, wholesale_price=10, retail_price=20, currency="INR", version=1)
+    stock = StockEntity(id=uuid.uuid4(), product_id=product_id, current_stock=10, reserved_stock=2)
+    db = StagingSession({PriceTableEntity: price, StockEntity: stock})
+    writer = DatabaseBatchWriter(db)
+    
+    price_result = writer.apply(BatchOperation("update_price", str(product_id), data={"retail_price": 25, "modified_by": "ops"}))
+    stock_result = writer.apply(BatchOperation("update_stock", str(product_id), data={"reserved_stock": 4, "updated_by": "ops"}))
+    
+    assert (price_result["retail_price"], price_result["version"], price_result["product_id"]) == (25, 2, str(product_id))
+    assert stock_result["available_stock"] == 6
+    assert (db.flushes, db.commits) == (2, 0)
+
+def test_unknown_operations_and_missing_rows_are_rejected():
+    writer = DatabaseBatchWriter(StagingSession({}))
+    for operation, error in (
+        (BatchOperation("drop_table", "x"), ValueError),
+        (BatchOperation("update_variant", str(uuid.uuid4())), ValueError),
+        (BatchOperation("update_price", str(uuid.uuid4()), data={"modified_by": "ops"}), LookupError),
+    ):
+        try:
+            writer.apply(operation)
+            assert False, f"{operation.op} should have been rejected"
+        except error:
+            pass
+
+def test_a_failing_operation_rolls_back_the_ones_before_it(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'batch.db'}")
+    # PostgreSQL column types don't create on SQLite; untyped columns hold the same values
+    with engine.begin() as connection:
+        for entity in (ProductEntity, ProductVariantEntity):
+            columns = ", ".join(column.name for column in entity.__table__.columns)
+            connection.exec_driver_sql(f"CREATE TABLE {entity.__tablename__} ({columns})")
+    Session = sessionmaker(bind=engine)
+    product_id, variant_id = uuid.uuid4(), uuid.uuid4()
+    with Session() as db:
+        db.connection().exec_driver_sql(
+            "INSERT INTO products (id, sku_id, title, image_urls) VALUES (?, 'SKU-1', 'Quilt', '{}')", (product_id.hex,)
+        )
+        db.connection().exec_driver_sql(
+            "INSERT INTO product_variants (id, product_id, variant_name, sku_suffix) VALUES (?, ?, 'Red', 'R')",
+            (variant_id.hex, product_id.hex)
+        )
+        db.commit()
+    
+    def session():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    new_variant = {
+        "variant_name": "Blue", "color_code": "#0000ff", "color_name": "Blue",
+        "range_details": {}, "sku_suffix": "B", "created_by": "ops"
+    }
+    operations = [
+        {"op": "update_product", "product_id": str(product_id), "data": {"title": "Renamed Quilt"}},
+        {"op": "create_variant", "product_id": str(product_id), "data": new_variant},
+        {"op": "delete_variant", "product_id": str(product_id), "variant_id": str(variant_id)},
+        {"op": "update_variant", "product_id": str(product_id), "variant_id": str(uuid.uuid4()), "data": {"variant_name": "Green"}},
+    ]
+    main.app.dependency_overrides[get_db] = session
+    try:
+        response = TestClient(main.app).post("/api/v1/batch", json={"operations": operations})
+    finally:
+        del main.app.dependency_overrides[get_db]
+    
+    assert response.status_code == 404
+    assert (response.json()["failed_index"], response.json()["op"]) == (3, "update_variant")
+    with Session() as db:
+        assert db.get(ProductEntity, product_id).title == "Quilt"
+        assert [(v.id, v.variant_name) for v in db.query(ProductVariantEntity)] == [(variant_id, "Red")]
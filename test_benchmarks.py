@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from benchmarks.catalog import CatalogSpec, catalog_rows
+from benchmarks.load_test import ScenarioResult, compare, hot_scenarios, percentile
+
+def test_catalogs_are_reproducible_from_their_spec():
+    spec = CatalogSpec(products=20, variants_per_product=3, partners=2, campaigns=2, metric_days=5, seed=7)
+    rows = catalog_rows(spec)
+    
+    assert rows == catalog_rows(spec)
+    assert rows["products"] != catalog_rows(CatalogSpec(products=20, seed=8))["products"]
+    assert len(rows["product_variants"]) == len(rows["stock"]) == 60
+    assert len(rows["campaign_metrics"]) == 10
+    assert rows["products"][0]["sku_id"] == "BENCH-7-000000"
+    product_ids = {row["id"] for row in rows["products"]}
+    assert all(row["product_id"] in product_ids for row in rows["product_variants"])
+
+def test_catalog_dates_end_at_the_current_month():
+    rows = catalog_rows(CatalogSpec(products=1, campaigns=1, metric_days=40))
+    this_month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    assert rows["campaigns"][0]["end_date"] == this_month
+    assert max(row["metric_date"] for row in rows["campaign_metrics"]) < this_month
+
+def test_write_scenarios_send_valid_payloads():
+    from main import StockUpdateRequest
+    
+    scenarios = {scenario.name: scenario for scenario in hot_scenarios(["p1"], [])}
+    StockUpdateRequest.model_validate(scenarios["stock_update"].request(0)["json"])
+
+def test_regressions_are_reported_against_the_baseline():
+    assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 0.95) == 10
+    assert percentile([1, 2, 3, 4], 0.5) == 2
+    baseline = {"product_list": {
+        "requests": 100, "errors": 0, "throughput_rps": 200.0, "p50_ms": 8.0, "p95_ms": 20.0, "p99_ms": 30.0,
+        "queries_per_request": 1.0
+    }}
+    
+    steady = ScenarioResult(100, 0, 190.0, 8.5, 22.0, 31.0, 1.0)
+    assert compare({"product_list": steady}, baseline, tolerance=0.2) == []
+    
+    n_plus_one = ScenarioResult(100, 0, 120.0, 14.0, 35.0, 50.0, 101.0)
+    assert compare({"product_list": n_plus_one}, baseline, tolerance=0.2) == [
+        "product_list: p95 35.0 ms vs baseline 20.0 ms",
+        "product_list: 120.0 req/s vs baseline 200.0 req/s",
+        "product_list: 101.0 queries/request vs baseline 1.0",
+    ]
+
+def test_hot_path_cases_run_and_report_memory():
+    from benchmarks.hot_paths import run
+    
+    measurements = run([50], repeat=1)
+    
+    assert {m.name for m in measurements} >= {"entity_to_domain", "fold_variant_rows", "value_object_hash"}
+    folded = next(m for m in measurements if m.name == "fold_variant_rows")
+    assert folded.rows == 50 and folded.best_ms > 0 and folded.retained_blocks_per_row > 0
+
+def test_query_path_cases_pair_rebuilt_and_cached_reads():
+    from benchmarks.query_paths import run
+    
+    measurements = run(queries=5, repeat=1)
+    
+    names = {m.name for m in measurements}
+    assert {"detail_cached", "list_cached", "variants_text_cached"} <= names
+    assert all(name.replace("_cached", "_rebuilt") in names for name in names)
+    assert all(m.rows == 5 and m.best_ms > 0 for m in measurements)
@@ -0,0 +1,53 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from adapters.database.entities import CategoryEntity
+from adapters.database_category_tree import DatabaseCategoryTree, build_tree
+from domain.models import CategoryNode
+
+def test_tree_rolls_product_counts_up_to_every_ancestor():
+    nodes = [
+        CategoryNode("a", "Home", None, None, "a/", 0, product_count=1),
+        CategoryNode("b", "Bedding", None, "a", "a/b/", 1, product_count=2),
+        CategoryNode("c", "Quilts", None, "b", "a/b/c/", 2, product_count=4),
+        CategoryNode("d", "Apparel", None, None, "d/", 0),
+    ]
+    
+    roots = build_tree(nodes)
+    
+    assert [root.id for root in roots] == ["a", "d"]
+    assert roots[0].subtree_product_count == 7
+    assert roots[0].children[0].subtree_product_count == 6
+    assert roots[0].children[0].children[0].children == []
+
+def test_paths_are_assigned_on_insert_and_rewritten_on_move():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        # The entity's PostgreSQL UUID columns have no SQLite DDL, so declare the table by hand
+        connection.exec_driver_sql(
+            "CREATE TABLE categories (id CHAR(32) PRIMARY KEY, name VARCHAR(255), description TEXT, "
+            "parent_id CHAR(32), path VARCHAR(1024) NOT NULL, depth INTEGER NOT NULL)"
+        )
+    with Session(engine) as db:
+        home, apparel = CategoryEntity(name="Home"), CategoryEntity(name="Apparel")
+        db.add_all([home, apparel])
+        db.commit()
+        bedding = CategoryEntity(name="Bedding", parent_id=home.id)
+        db.add(bedding)
+        db.commit()
+        quilts = CategoryEntity(name="Quilts", parent_id=bedding.id)
+        db.add(quilts)
+        db.commit()
+        assert (quilts.path, quilts.depth) == (f"{home.id}/{bedding.id}/{quilts.id}/", 2)
+        
+        tree = DatabaseCategoryTree(db)
+        tree.move(str(bedding.id), str(apparel.id))
+        db.commit()
+        paths = dict(db.execute(select(CategoryEntity.name, CategoryEntity.path)).all())
+        assert paths["Quilts"] == f"{apparel.id}/{bedding.id}/{quilts.id}/"
+        assert db.get(CategoryEntity, quilts.id).depth == 2
+        
+        try:
+            tree.move(str(apparel.id), str(quilts.id))
+            assert False, "moving a category under its own descendant must fail"
+        except ValueError:
+            pass
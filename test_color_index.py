@@ -0,0 +1,65 @@
+import numpy as np
+from sqlalchemy import Column, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from adapters.database.color_sync import register_color_sync
+from adapters.numpy_color_index import NumpyColorIndex, hex_to_lab
+
+def test_hex_to_lab_matches_reference_values():
+    lab = hex_to_lab(["#ffffff", "000", "#FF0000"])
+    assert np.allclose(lab[0], [100, 0, 0], atol=0.05)
+    assert np.allclose(lab[1], [0, 0, 0], atol=0.05)
+    assert np.allclose(lab[2], [53.24, 80.09, 67.20], atol=0.05)
+
+def test_nearest_keeps_each_products_closest_colour():
+    index = NumpyColorIndex(initial_capacity=2)
+    index.upsert("product:red", "red", "#ff0000")
+    index.upsert("variant:red-dark", "red", "#cc0000", variant_id="red-dark")
+    index.upsert("product:maroon", "maroon", "#800000")
+    index.upsert("product:blue", "blue", "#0000ff")
+    
+    matches = index.nearest("#dd1111", k=2)
+    
+    assert [(m.product_id, m.variant_id) for m in matches] == [("red", "red-dark"), ("maroon", None)]
+    index.remove_product("red")
+    assert [m.product_id for m in index.nearest("#dd1111", k=5)] == ["maroon", "blue"]
+
+def test_committed_changes_reach_the_index_and_rollbacks_do_not():
+    Base = declarative_base()
+    
+    class Product(Base):
+        __tablename__ = "products"
+        id = Column(String, primary_key=True)
+        color_primary = Column(String(7))
+    
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    index = NumpyColorIndex()
+    register_color_sync(index, Session)
+    
+    with Session() as db:
+        db.add(Product(id="a", color_primary="#00ff00"))
+        db.commit()
+        db.add(Product(id="b", color_primary="#00ee00"))
+        db.flush()
+        db.rollback()
+    assert [m.product_id for m in index.nearest("#00ff00")] == ["a"]
+    
+    with Session() as db:
+        db.delete(db.get(Product, "a"))
+        db.commit()
+    assert index.nearest("#00ff00") == []
+
+def test_changes_made_while_a_reload_reads_its_snapshot_survive_it():
+    index = NumpyColorIndex()
+    index.upsert("product:gone", "gone", "#00ff00")
+    
+    with index.loading():
+        # Committed after the snapshot below was read
+        index.upsert("product:new", "new", "#00ff00")
+        index.remove_product("gone")
+        index.bulk_load([("product:gone", "gone", "#00ff00", None), ("product:old", "old", "#0000ff", None)])
+    
+    assert [m.product_id for m in index.nearest("#00ff00", k=5)] == ["new", "old"]
+    index.upsert("product:later", "later", "#00ff00")
+    assert index._pending is None
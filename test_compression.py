@@ -0,0 +1,60 @@
+import gzip
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from adapters.compression_middleware import CompressedBodyCache, CompressionMiddleware, GzipEncoder, negotiate
+
+def make_client(cache=None):
+    app = FastAPI()
+    
+    @app.api_route("/large", methods=["GET", "HEAD"])
+    async def large(response: Response):
+        response.headers["Cache-Control"] = "private, max-age=60"
+        response.headers["X-Next-Cursor"] = "next"
+        return {"items": [{"sku": f"SKU-{i}", "title": "Block print quilt"} for i in range(200)]}
+    
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+    
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse((f"line {i}\n" for i in range(100)), media_type="text/plain")
+    
+    app.add_middleware(CompressionMiddleware, minimum_size=500, encoders=[GzipEncoder()], cache=cache)
+    return TestClient(app)
+
+def test_negotiation_honours_weights_then_server_preference():
+    gzip_encoder = GzipEncoder()
+    assert negotiate("br;q=1.0, gzip;q=0.5", [gzip_encoder]) is gzip_encoder
+    assert negotiate("gzip;q=0, identity", [gzip_encoder]) is None
+    assert negotiate("*", [gzip_encoder]) is gzip_encoder
+
+def test_large_responses_are_compressed_and_revalidated_by_etag():
+    cache = CompressedBodyCache()
+    client = make_client(cache)
+    
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json()["items"][199]["sku"] == "SKU-199"
+    etag = response.headers["etag"]
+    assert etag.endswith('-gzip"')
+    
+    not_modified = client.get("/large", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert (not_modified.headers["cache-control"], not_modified.headers["x-next-cursor"]) == ("private, max-age=60", "next")
+    assert not {"content-type", "content-encoding"} & set(not_modified.headers)
+    assert "etag" not in client.head("/large", headers={"Accept-Encoding": "gzip"}).headers
+    assert len(cache._bodies) == 1
+    
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers and small.json() == {"ok": True}
+
+def test_streaming_responses_are_compressed_chunk_by_chunk():
+    client = make_client()
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip" and "content-length" not in response.headers
+    assert gzip.decompress(raw).decode().splitlines()[-1] == "line 99"
@@ -0,0 +1,95 @@
+import os
+import uuid
+from urllib.parse import urlsplit
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import main
+from adapters.database.config import get_db
+from adapters.database.entities import DirectUploadEntity, OutboxMessageEntity, ProductEntity
+
+@pytest.fixture
+def upload_client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'uploads.db'}")
+    # PostgreSQL column types don't create on SQLite; untyped columns hold the same values
+    with engine.begin() as connection:
+        for entity in (ProductEntity, DirectUploadEntity, OutboxMessageEntity):
+            columns = ", ".join(column.name for column in entity.__table__.columns)
+            connection.exec_driver_sql(f"CREATE TABLE {entity.__tablename__} ({columns})")
+    Session = sessionmaker(bind=engine)
+    
+    def session():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    main.app.dependency_overrides[get_db] = session
+    try:
+        yield TestClient(main.app), Session
+    finally:
+        del main.app.dependency_overrides[get_db]
+
+def add_product(Session) -> str:
+    product_id = uuid.uuid4()
+    with Session() as db:
+        db.connection().exec_driver_sql(
+            "INSERT INTO products (id, sku_id, title, image_urls) VALUES (?, 'SKU-1', 'Quilt', '{}')", (product_id.hex,)
+        )
+        db.commit()
+    return str(product_id)
+
+def put_upload(client, presigned: dict, content: bytes):
+    url = urlsplit(presigned["upload_url"])
+    return client.put(f"{url.path}?{url.query}", content=content, headers=presigned["headers"])
+
+def test_presigned_upload_completes_once_at_its_content_key(upload_client):
+    client, Session = upload_client
+    product_id = add_product(Session)
+    content = b"\x89PNG\r\n\x1a\n" + uuid.uuid4().bytes
+    
+    presigned = client.post("/uploads/presign", json={
+        "filename": "swatch.jpg", "content_type": "image/jpeg", "purpose": "product", "product_id": product_id
+    }).json()
+    assert presigned["method"] == "PUT"
+    assert put_upload(client, presigned, content).status_code == 200
+    
+    complete = {"key": presigned["key"], "purpose": "product", "product_id": product_id, "image_type": "zoom"}
+    first = client.post("/uploads/complete", json=complete)
+    retry = client.post("/uploads/complete", json=complete)
+    
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    content_key = first.json()["key"]
+    assert content_key.startswith("objects/") and content_key.endswith(".png")
+    assert main.storage.index._objects[content_key].ref_count == 1
+    assert not os.path.exists(main.storage._file_path(presigned["key"]))
+    with open(main.storage._file_path(content_key), "rb") as f:
+        assert f.read() == content
+    with Session() as db:
+        assert db.query(OutboxMessageEntity).count() == 1
+        assert db.get(ProductEntity, uuid.UUID(product_id)).image_urls == {"zoom": main.storage.get_image_url(content_key)}
+
+def test_only_issued_keys_can_be_completed(upload_client):
+    client, Session = upload_client
+    presigned = client.post("/uploads/presign", json={
+        "filename": "swatch.png", "content_type": "image/png", "purpose": "image"
+    }).json()
+    put_upload(client, presigned, b"\x89PNG\r\n\x1a\n" + uuid.uuid4().bytes)
+    content_key = client.post("/uploads/complete", json={"key": presigned["key"], "purpose": "image"}).json()["key"]
+    
+    # An existing object, and an issued key completed under another purpose
+    assert client.post("/uploads/complete", json={"key": content_key, "purpose": "image"}).status_code == 404
+    assert client.post("/uploads/complete", json={"key": presigned["key"], "purpose": "raw"}).status_code == 404
+
+def test_local_upload_rejects_a_tampered_signature(upload_client):
+    client, _ = upload_client
+    presigned = client.post("/uploads/presign", json={
+        "filename": "swatch.png", "content_type": "image/png", "purpose": "raw"
+    }).json()
+    presigned["upload_url"] = presigned["upload_url"].replace("signature=", "signature=0")
+    
+    assert put_upload(client, presigned, b"raw bytes").status_code == 403
+    assert client.post("/uploads/complete", json={"key": presigned["key"], "purpose": "raw"}).status_code == 400
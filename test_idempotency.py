@@ -0,0 +1,98 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from adapters.database.entities import IdempotencyKeyEntity
+from adapters.database_idempotency_store import DatabaseIdempotencyStore
+from adapters.idempotency_middleware import IdempotencyMiddleware
+from adapters.memory_idempotency_store import MemoryIdempotencyStore
+from domain.models import IdempotencyRecord, IdempotentResponse
+
+def make_client(store=None):
+    app = FastAPI()
+    calls = []
+    
+    @app.post("/products")
+    async def create(payload: dict):
+        calls.append(payload)
+        return {"id": len(calls), **payload}
+    
+    @app.post("/products/{product_id}/images")
+    async def upload(product_id: str, file: UploadFile = File(...)):
+        calls.append(await file.read())
+        return {"uploads": len(calls)}
+    
+    app.add_middleware(IdempotencyMiddleware, store=store or MemoryIdempotencyStore(), paths=[r"/products", r"/products/[^/]+/images"])
+    return TestClient(app), calls
+
+def test_retries_replay_the_first_response():
+    client, calls = make_client()
+    headers = {"Idempotency-Key": "create-1"}
+    
+    first = client.post("/products", json={"title": "Quilt"}, headers=headers)
+    retry = client.post("/products", json={"title": "Quilt"}, headers=headers)
+    
+    assert len(calls) == 1
+    assert retry.json() == first.json() == {"id": 1, "title": "Quilt"}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert client.post("/products", json={"title": "Rug"}, headers=headers).status_code == 422
+    client.post("/products", json={"title": "Quilt"})
+    assert len(calls) == 2
+
+def test_upload_retries_match_despite_new_multipart_boundaries():
+    client, calls = make_client()
+    for _ in range(2):
+        response = client.post(
+            "/products/p1/images", files={"file": ("a.jpg", b"pixels", "image/jpeg")}, headers={"Idempotency-Key": "up-1"}
+        )
+        assert response.json() == {"uploads": 1}
+    assert calls == [b"pixels"]
+
+def test_store_is_bounded_and_in_flight_keys_block_duplicates():
+    store = MemoryIdempotencyStore(max_entries=2)
+    assert store.reserve("a", "x") is None
+    assert store.reserve("a", "x").response is None
+    store.save("a", IdempotentResponse(201, [], b"{}"))
+    store.reserve("b", "x")
+    store.reserve("c", "x")
+    assert len(store) == 2 and store.reserve("a", "x") is None
+
+def test_in_flight_reservations_are_never_evicted_for_size():
+    store = MemoryIdempotencyStore(max_entries=1)
+    store.reserve("a", "x")
+    store.reserve("b", "x")
+    assert len(store) == 2 and store.reserve("a", "x").response is None
+
+def test_database_store_shares_keys_between_workers(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'idempotency.db'}")
+    # PostgreSQL column types don't create on SQLite; untyped columns hold the same values
+    columns = ", ".join(column.name for column in IdempotencyKeyEntity.__table__.columns if column.name != "key")
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"CREATE TABLE idempotency_keys (key PRIMARY KEY, {columns})")
+    Session = sessionmaker(bind=engine)
+    worker_a, worker_b = DatabaseIdempotencyStore(Session), DatabaseIdempotencyStore(Session)
+    response = IdempotentResponse(201, [(b"content-type", b"application/json")], b'{"id": 1}')
+    
+    assert worker_a.reserve("POST /products k1", "x") is None
+    assert worker_b.reserve("POST /products k1", "x").response is None
+    worker_a.save("POST /products k1", response)
+    assert worker_b.reserve("POST /products k1", "x") == IdempotencyRecord("x", response)
+    worker_b.release("POST /products k1")
+    assert worker_a.reserve("POST /products k1", "y") is None
+    
+    # A reservation whose request never finished can be taken over once it expires
+    stale = DatabaseIdempotencyStore(Session, in_flight_timeout=-1)
+    assert stale.reserve("POST /products k2", "x") is None
+    assert worker_b.reserve("POST /products k2", "x") is None
+    stale.reserve("POST /products k3", "x")
+    assert stale.purge_expired() == 1
+
+def test_responses_built_by_the_middleware_carry_cors_headers():
+    import main
+    
+    response = TestClient(main.app).post(
+        "/products", json={}, headers={"Origin": "https://admin.example.com", "Idempotency-Key": "k" * 300}
+    )
+    
+    assert response.status_code == 400
+    assert "access-control-allow-origin" in response.headers
@@ -0,0 +1,72 @@
+import io
+import os
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from adapters.database.entities import StoredObjectEntity
+from adapters.database_image_index import DatabaseImageIndex
+from adapters.mock_s3_storage import MockS3StorageAdapter
+from adapters.memory_image_index import MemoryImageIndex
+from domain.models import ImageUpload
+
+def make_image(content: bytes, filename: str = "swatch.jpg") -> ImageUpload:
+    return ImageUpload(filename=filename, content=io.BytesIO(content), content_type="image/jpeg")
+
+def test_identical_content_shares_one_object():
+    index = MemoryImageIndex()
+    storage = MockS3StorageAdapter("bucket", "us-east-1", index)
+    
+    first = storage.store_product_images({"raw": make_image(b"fabric-swatch")})
+    second = storage.store_product_images({"zoom": make_image(b"fabric-swatch", "renamed.jpg")})
+    other = storage.store_product_images({"raw": make_image(b"different-swatch")})
+    
+    assert first["raw"] == second["zoom"]
+    assert first["raw"] != other["raw"]
+    key = first["raw"].replace(storage.get_image_url(""), "")
+    assert index._objects[key].ref_count == 2
+
+def test_garbage_collection_only_removes_unreferenced_objects():
+    index = MemoryImageIndex()
+    storage = MockS3StorageAdapter("bucket", "us-east-1", index)
+    
+    url = storage.store_product_images({"raw": make_image(b"gc-candidate")})["raw"]
+    storage.store_product_images({"zoom": make_image(b"gc-candidate")})
+    key = url.replace(storage.get_image_url(""), "")
+    file_path = storage._file_path(key)
+    
+    storage.release_image(url)
+    assert storage.collect_garbage(grace_seconds=0) == []
+    assert os.path.exists(file_path)
+    
+    storage.release_image(key)
+    assert storage.collect_garbage(grace_seconds=0) == [key]
+    assert not os.path.exists(file_path)
+
+def test_key_extension_comes_from_the_bytes_not_the_filename():
+    storage = MockS3StorageAdapter("bucket", "us-east-1", MemoryImageIndex())
+    png = b"\x89PNG\r\n\x1a\n" + b"swatch"
+    
+    as_jpg = storage.store_image(ImageUpload(filename="swatch.jpg", content=io.BytesIO(png), content_type="image/jpeg"))
+    as_png = storage.store_image(ImageUpload(filename="swatch.PNG", content=io.BytesIO(png), content_type="image/png"))
+    product = storage.store_product_images({"raw": ImageUpload(
+        filename="upload", content=io.BytesIO(png), content_type="application/octet-stream"
+    )})["raw"]
+    
+    assert as_jpg == as_png
+    assert as_jpg.startswith("objects/") and as_jpg.endswith(".png")
+    assert product == storage.get_image_url(as_jpg)
+
+def test_database_index_keeps_buckets_apart(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'objects.db'}")
+    StoredObjectEntity.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    images = DatabaseImageIndex(Session, "images-bucket")
+    raw = DatabaseImageIndex(Session, "raw-bucket")
+    
+    images.register("objects/abc.jpg", "abc", 10)
+    assert not raw.acquire("objects/abc.jpg")
+    raw.register("objects/abc.jpg", "abc", 10)
+    
+    assert raw.release("objects/abc.jpg") == 0
+    assert images.collect_unreferenced(lambda key: None, grace_seconds=0) == []
+    assert raw.collect_unreferenced(lambda key: None, grace_seconds=0) == ["objects/abc.jpg"]
+    assert images.acquire("objects/abc.jpg")
@@ -0,0 +1,132 @@
+import io
+import uuid
+from PIL import Image
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import main
+from adapters.database.config import get_db
+from adapters.database.entities import OutboxMessageEntity, ProductEntity
+from adapters.database_product_repository import DatabaseProductRepository
+from adapters.memory_image_index import MemoryImageIndex
+from adapters.mock_s3_storage import MockS3StorageAdapter
+from adapters.pillow_image_processor import PillowImageProcessor
+from application.image_derivative_service import ImageDerivativeService
+from domain.models import ImageUpload
+
+SPECS = {"thumbnail": (32, 32, 80), "zoom": (200, 200, 90)}
+
+def jpeg(width: int, height: int, exif_orientation: int = None) -> bytes:
+    image = Image.new("RGB", (width, height), (200, 40, 90))
+    exif = Image.Exif()
+    exif[0x010F] = "Test Camera"  # Make
+    if exif_orientation:
+        exif[0x0112] = exif_orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", exif=exif.tobytes())
+    return buffer.getvalue()
+
+def open_image(content: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(content))
+
+def product_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'products.db'}")
+    # PostgreSQL column types don't create on SQLite; untyped columns hold the same values
+    with engine.begin() as connection:
+        for entity in (ProductEntity, OutboxMessageEntity):
+            columns = ", ".join(column.name for column in entity.__table__.columns)
+            connection.exec_driver_sql(f"CREATE TABLE {entity.__tablename__} ({columns})")
+    return sessionmaker(bind=engine)
+
+def test_renditions_fit_their_bounds_and_drop_exif():
+    renditions = PillowImageProcessor(SPECS).render_derivatives(jpeg(400, 100))
+    
+    assert set(renditions) == {"thumbnail", "zoom"}
+    assert open_image(renditions["thumbnail"]).size == (32, 8)
+    assert open_image(renditions["zoom"]).size == (200, 50)
+    for content in renditions.values():
+        assert not open_image(content).getexif()
+
+def test_exif_orientation_is_applied_before_it_is_stripped():
+    # Orientation 6 means "rotate 90 degrees clockwise to display"
+    rendition = PillowImageProcessor(SPECS).render_derivatives(jpeg(400, 100, exif_orientation=6))["zoom"]
+    assert open_image(rendition).size == (50, 200)
+
+def test_images_already_within_bounds_are_not_upscaled():
+    renditions = PillowImageProcessor(SPECS).render_derivatives(jpeg(20, 10))
+    assert {name: open_image(content).size for name, content in renditions.items()} == {
+        "thumbnail": (20, 10), "zoom": (20, 10)
+    }
+
+def test_finished_renditions_are_stored_and_merged_into_the_product(tmp_path):
+    Session = product_session(tmp_path)
+    product_id = uuid.uuid4()
+    with Session() as db:
+        db.connection().exec_driver_sql(
+            "INSERT INTO products (id, sku_id, title, image_urls) VALUES (?, 'SKU-1', 'Quilt', ?)",
+            (product_id.hex, '{"raw": "raw-url"}')
+        )
+        db.commit()
+    
+    def attach(product_id, image_urls):
+        with Session() as db:
+            DatabaseProductRepository(db).merge_image_urls(product_id, image_urls)
+    
+    storage = MockS3StorageAdapter("bucket", "us-east-1", MemoryImageIndex())
+    service = ImageDerivativeService(storage, PillowImageProcessor(SPECS), attach, max_workers=1)
+    upload = ImageUpload(filename="quilt.jpg", content=io.BytesIO(jpeg(400, 100)), content_type="image/jpeg")
+    
+    service.submit(product_id, upload, skip=["zoom"])
+    assert upload.content.tell() == 0
+    # Waits for the render and for the upload/merge it triggers
+    service.shutdown()
+    
+    with Session() as db:
+        image_urls = db.get(ProductEntity, product_id).image_urls
+    assert set(image_urls) == {"raw", "thumbnail"}
+    assert image_urls["thumbnail"].startswith(storage.get_image_url("objects/"))
+    assert service._process_pool is None
+
+def test_shutdown_without_work_never_starts_a_process_pool():
+    service = ImageDerivativeService(None, PillowImageProcessor(SPECS), lambda *_: None)
+    service.shutdown()
+    assert service._process_pool is None
+    assert service._io_pool._shutdown
+
+def test_uploaded_images_and_their_renditions_reach_the_product(tmp_path, monkeypatch):
+    Session = product_session(tmp_path)
+    product_id = uuid.uuid4()
+    with Session() as db:
+        db.connection().exec_driver_sql(
+            "INSERT INTO products (id, sku_id, title, image_urls) VALUES (?, 'SKU-1', 'Quilt', '{}')", (product_id.hex,)
+        )
+        db.commit()
+    
+    def session():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    # Renditions are attached through the app's own callback, on its own sessions
+    service = ImageDerivativeService(main.storage, PillowImageProcessor(SPECS), main.attach_derivative_urls, max_workers=1)
+    monkeypatch.setattr(main, "SessionLocal", Session)
+    monkeypatch.setattr(main, "derivative_service", service)
+    main.app.dependency_overrides[get_db] = session
+    try:
+        response = TestClient(main.app).post(
+            f"/products/{product_id}/images",
+            files={"raw": ("quilt.jpg", jpeg(400, 100), "image/jpeg"), "zoom": ("zoom.jpg", jpeg(200, 50), "image/jpeg")}
+        )
+        service.shutdown()
+    finally:
+        del main.app.dependency_overrides[get_db]
+    
+    assert response.status_code == 200
+    assert response.json()["derivatives_pending"] == ["thumbnail"]
+    with Session() as db:
+        image_urls = db.get(ProductEntity, product_id).image_urls
+        assert db.query(OutboxMessageEntity).count() == 1
+    assert set(image_urls) == {"raw", "zoom", "thumbnail"}
+    assert image_urls["zoom"] == response.json()["image_urls"]["zoom"]
@@ -0,0 +1,39 @@
+import json
+from typing import List
+from pydantic import TypeAdapter
+from adapters.json_response import rows_response
+from benchmarks.serialization import campaign_rows, recommendation_rows
+from main import CampaignResponse, RecommendationResponse, RecommendationSummaryResponse
+
+def pydantic_json(rows, model):
+    adapter = TypeAdapter(List[model])
+    return adapter.dump_python([model(**{**row, "id": str(row["id"])}) for row in rows], mode="json")
+
+def test_rows_response_matches_pydantic_output():
+    for rows, model in (
+        (recommendation_rows(3), RecommendationResponse),
+        (recommendation_rows(3), RecommendationSummaryResponse),
+        (campaign_rows(3), CampaignResponse),
+    ):
+        assert json.loads(rows_response(rows, model).body) == pydantic_json(rows, model)
+
+def test_rows_response_reads_attributes_and_sets_headers():
+    class Row:
+        def __init__(self, values):
+            self.__dict__.update(values)
+    
+    rows = campaign_rows(1)
+    response = rows_response([Row(rows[0])], CampaignResponse, headers={"X-Next-Cursor": "abc"})
+    
+    assert response.headers["x-next-cursor"] == "abc"
+    assert json.loads(response.body)[0]["budget"] == "1500.00"
+
+def test_rows_that_dont_fit_the_model_are_rejected():
+    row = campaign_rows(1)[0]
+    renamed = {("campaign_name" if key == "name" else key): value for key, value in row.items()}
+    for rows, error in (([renamed], "no name"), ([{**row, "budget": "lots"}], "budget")):
+        try:
+            rows_response(rows, CampaignResponse)
+            assert False, "rows that don't fit the model should be rejected"
+        except ValueError as e:
+            assert error in str(e)
@@ -0,0 +1,53 @@
+from sqlalchemy.dialects import postgresql
+from adapters.database.migrations import MIGRATIONS
+
+class RecordingConnection:
+    """Stands in for a PostgreSQL connection on which every table exists; keeps the SQL it runs"""
+    
+    dialect = postgresql.dialect()
+    
+    def __init__(self):
+        self.statements = []
+    
+    def execute(self, statement, parameters=None):
+        sql = str(statement.compile(dialect=self.dialect))
+        self.statements.append(sql)
+        
+        class Result:
+            def scalar(self):
+                return True
+        return Result()
+
+def run(name: str):
+    connection = RecordingConnection()
+    dict(MIGRATIONS)[name](connection, {})
+    return [sql for sql in connection.statements if not sql.startswith("SELECT to_regclass")]
+
+def test_existing_categories_become_roots_before_path_and_depth_are_required():
+    statements = run("categories_tree")
+    
+    assert "ADD COLUMN IF NOT EXISTS parent_id UUID" in statements[0]
+    backfill = statements.index("UPDATE categories SET path = id::text || '/' WHERE path IS NULL")
+    assert backfill < statements.index("ALTER TABLE categories ALTER COLUMN path SET NOT NULL, ALTER COLUMN depth SET NOT NULL")
+    assert statements[-2:] == [
+        "CREATE INDEX IF NOT EXISTS ix_categories_path ON categories (path varchar_pattern_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_categories_parent_id ON categories (parent_id)",
+    ]
+
+def test_existing_products_get_the_generated_search_column_and_its_indexes():
+    statements = run("products_search_vector")
+    
+    assert statements[0].startswith("ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (")
+    assert statements[0].endswith(") STORED")
+    assert statements[1:] == [
+        "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin (search_vector)",
+        "CREATE INDEX IF NOT EXISTS ix_products_special_features ON products USING gin (special_features)",
+    ]
+
+def test_trigram_indexes_are_added_after_the_extension():
+    assert run("autocomplete_trigram_indexes") == [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_products_sku_id_trgm ON products USING gin (sku_id gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_products_title_trgm ON products USING gin (title gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_product_variants_sku_suffix_trgm ON product_variants USING gin (sku_suffix gin_trgm_ops)",
+    ]
@@ -0,0 +1,136 @@
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from adapters.database.entities import OutboxMessageEntity
+from adapters.database_outbox import DatabaseOutboxRepository, open_outbox
+from application.outbox_relay import OutboxRelay, job_dispatchers, product_analysis_message, raw_image_analysis_message
+from adapters.mock_sqs_queue import MockSQSAnalysisQueueAdapter
+from adapters.mock_sns_notification import MockSNSNotificationAdapter
+from domain.models import ProductAnalysisJob, RawImageAnalysisJob
+from domain.ports import OutboxPort
+
+class ListOutbox(OutboxPort):
+    """Outbox kept in a list; failed messages become available again on the next pass"""
+    
+    def __init__(self):
+        self.pending = []
+    
+    def add(self, message):
+        self.pending.append(message)
+    
+    def relay_pending(self, dispatch, destinations, batch_size=100, max_attempts=10, retry_backoff=2.0):
+        batch = [m for m in self.pending if m.destination in destinations and m.attempts < max_attempts][:batch_size]
+        for message in batch:
+            try:
+                dispatch(message)
+            except Exception:
+                message.attempts += 1
+            else:
+                self.pending.remove(message)
+        return len(batch)
+
+def _opener(outbox):
+    @contextmanager
+    def open_outbox():
+        yield outbox
+    return open_outbox
+
+def test_relay_delivers_with_outbox_id_as_dedupe_id():
+    outbox = ListOutbox()
+    analysis_queue = MockSQSAnalysisQueueAdapter("mock-queue")
+    notifications = MockSNSNotificationAdapter("mock-topic")
+    message = product_analysis_message(ProductAnalysisJob(product_id="p1", sku_id="SKU1", image_urls={"raw": "u"}))
+    outbox.add(message)
+    outbox.add(raw_image_analysis_message(RawImageAnalysisJob(raw_image_key="raw/k.jpg", filename="k.jpg")))
+    
+    relay = OutboxRelay(_opener(outbox), job_dispatchers(analysis_queue, notifications), batch_size=1)
+    assert relay.relay_once() == 2
+    
+    assert outbox.pending == []
+    assert analysis_queue.messages[0]["dedupe_id"] == message.id
+    assert notifications.notifications[0]["raw_image_key"] == "raw/k.jpg"
+
+def test_failed_sends_stay_in_outbox_until_max_attempts():
+    outbox = ListOutbox()
+    outbox.add(product_analysis_message(ProductAnalysisJob(product_id="p1", sku_id="SKU1", image_urls={})))
+    
+    def unavailable(message):
+        raise ConnectionError("queue unavailable")
+    
+    relay = OutboxRelay(_opener(outbox), {"product_analysis": unavailable}, max_attempts=3)
+    for _ in range(5):
+        relay.relay_once()
+    
+    assert len(outbox.pending) == 1
+    assert outbox.pending[0].attempts == 3
+
+def outbox_sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}")
+    # PostgreSQL column types don't create on SQLite; untyped columns hold the same values
+    columns = ", ".join(column.name for column in OutboxMessageEntity.__table__.columns)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"CREATE TABLE outbox_messages ({columns})")
+    return sessionmaker(bind=engine)
+
+def add_row(Session, available_in: float = -1, attempts: int = 0, leased_for: float = None) -> uuid.UUID:
+    now = datetime.now(timezone.utc)
+    message_id = uuid.uuid4()
+    with Session() as db:
+        db.add(OutboxMessageEntity(
+            id=message_id,
+            destination="product_analysis",
+            payload={"product_id": "p1"},
+            attempts=attempts,
+            available_at=now + timedelta(seconds=available_in),
+            leased_until=now + timedelta(seconds=leased_for) if leased_for is not None else None
+        ))
+        db.commit()
+    return message_id
+
+def test_database_outbox_leases_and_commits_its_claim_before_sending(tmp_path):
+    Session = outbox_sessions(tmp_path)
+    due = add_row(Session)
+    add_row(Session, available_in=3600)  # Backing off
+    add_row(Session, attempts=3)  # Gave up
+    add_row(Session, leased_for=60)  # Another relay is sending it
+    leases_seen = []
+    
+    def send(message):
+        # A separate session sees the lease, so nothing is locked while this runs
+        with Session() as db:
+            leases_seen.append(db.get(OutboxMessageEntity, uuid.UUID(message.id)).leased_until)
+    
+    with open_outbox(Session) as outbox:
+        assert outbox.relay_pending(send, ["product_analysis"], max_attempts=3) == 1
+    
+    assert len(leases_seen) == 1 and leases_seen[0] is not None
+    with Session() as db:
+        assert db.get(OutboxMessageEntity, due) is None
+        assert db.query(OutboxMessageEntity).count() == 3
+
+def test_database_outbox_backs_off_failed_sends_and_releases_the_lease(tmp_path):
+    Session = outbox_sessions(tmp_path)
+    message_id = add_row(Session)
+    
+    def unavailable(message):
+        raise ConnectionError("queue unavailable")
+    
+    with open_outbox(Session) as outbox:
+        assert outbox.relay_pending(unavailable, ["product_analysis"], retry_backoff=30) == 1
+        assert outbox.relay_pending(unavailable, ["product_analysis"]) == 0
+    
+    with Session() as db:
+        entity = db.get(OutboxMessageEntity, message_id)
+        assert (entity.attempts, entity.last_error, entity.leased_until) == (1, "queue unavailable", None)
+        assert entity.available_at > datetime.utcnow() + timedelta(seconds=25)
+
+def test_database_outbox_claim_skips_rows_other_relays_hold(tmp_path):
+    Session = outbox_sessions(tmp_path)
+    with Session() as db:
+        query = DatabaseOutboxRepository(db).claim_query(["product_analysis"], 100, 10)
+        sql = str(query.statement.compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "leased_until IS NULL" in sql
@@ -0,0 +1,64 @@
+import uuid
+from decimal import Decimal
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from adapters.database.entities import CategoryEntity, PriceTableEntity, ProductEntity, ProductVariantEntity
+from adapters.database_product_repository import DatabaseProductRepository, loader_options, product_statement
+from domain.models import PRODUCT_RELATIONS, ProductStatus
+
+def compile_query(load) -> str:
+    query = Session().query(ProductEntity).options(*loader_options(load))
+    return str(query.statement.compile(dialect=postgresql.dialect()))
+
+def product_entity() -> ProductEntity:
+    product_id = uuid.uuid4()
+    entity = ProductEntity(
+        id=product_id, sku_id="SKU-1", title="Silk scarf", material="silk", pattern="floral",
+        color_primary="#aa0000", colors=[], scale="small", special_features=[], image_urls={},
+        created_by="test", status=ProductStatus.DRAFT, enabled=True
+    )
+    entity.category = CategoryEntity(id=uuid.uuid4(), name="Scarves")
+    entity.price_table = PriceTableEntity(
+        id=uuid.uuid4(), product_id=product_id, wholesale_price=Decimal("5.00"), retail_price=Decimal("9.00"),
+        currency="INR", version=1, created_by="test"
+    )
+    entity.variants = [ProductVariantEntity(
+        id=uuid.uuid4(), product_id=product_id, variant_name="Red", color_code="#aa0000", color_name="Red",
+        range_details={}, sku_suffix="R", additional_images={}, is_active=True, created_by="test"
+    )]
+    return entity
+
+def test_list_reads_load_no_relations():
+    sql = compile_query(())
+    assert "JOIN" not in sql
+    assert loader_options(()) == []
+
+def test_to_one_relations_join_and_variants_select_separately():
+    sql = compile_query(PRODUCT_RELATIONS)
+    assert sql.count("LEFT OUTER JOIN") == 3
+    assert "product_variants" not in sql
+    
+    with pytest.raises(ValueError, match="reviews"):
+        loader_options(["variants", "reviews"])
+
+def test_only_requested_relations_are_populated():
+    repo = DatabaseProductRepository(Session())
+    entity = product_entity()
+    
+    product = repo._entity_to_model(entity, frozenset({"variants", "price"}))
+    assert product.sku_id == "SKU-1"
+    assert product.price_table.retail_price == Decimal("9.00")
+    assert [v.color_name for v in product.variants] == ["Red"]
+    assert product.category is None and product.stock is None
+    
+    bare = repo._entity_to_model(entity, frozenset())
+    assert bare.variants is None and bare.price_table is None and bare.category is None
+
+def test_hot_product_statements_are_built_once_per_load_set():
+    statement = product_statement("by_id", frozenset({"variants"}))
+    assert product_statement("by_id", frozenset({"variants"})) is statement
+    assert product_statement("all", frozenset({"variants"})) is not statement
+    
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "products.id = %(product_id)s" in sql and "LIMIT" in sql
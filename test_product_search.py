@@ -0,0 +1,97 @@
+import os
+import uuid
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+from adapters.database.entities import Base, CategoryEntity, ProductEntity
+from adapters.database_product_search import DatabaseProductSearch, encode_cursor, decode_cursor
+from domain.models import ProductSearchQuery
+
+# The search SQL is PostgreSQL-only; point this at a scratch database to run it against real rows
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+requires_postgres = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+def compile_search(query: ProductSearchQuery) -> str:
+    statement = DatabaseProductSearch(Session()).search_statement(query)
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+def test_products_store_a_generated_search_vector():
+    ddl = str(CreateTable(ProductEntity.__table__).compile(dialect=postgresql.dialect()))
+    assert "search_vector TSVECTOR GENERATED ALWAYS AS" in ddl
+
+def test_product_loads_leave_the_search_vector_unread():
+    assert "search_vector" not in str(select(ProductEntity).compile(dialect=postgresql.dialect()))
+
+def test_search_filters_and_facets_share_one_statement():
+    product_id = uuid.uuid4()
+    sql = compile_search(ProductSearchQuery(
+        text="silk floral",
+        material="silk",
+        special_features=["handwoven"],
+        cursor=encode_cursor(0.25, product_id)
+    ))
+    
+    assert sql.startswith("WITH matched AS")
+    assert "products.search_vector @@ websearch_to_tsquery" in sql
+    assert "products.special_features @> ARRAY" in sql
+    assert "(matched.rank, matched.id) <" in sql
+    assert "unnest(matched.special_features)" in sql
+    assert sql.count("json_object_agg") == 6
+    assert decode_cursor(encode_cursor(0.25, product_id)) == (0.25, product_id)
+
+@pytest.fixture
+def search_session():
+    admin = create_engine(TEST_DATABASE_URL)
+    schema = f"test_search_{uuid.uuid4().hex[:8]}"
+    with admin.begin() as connection:
+        connection.exec_driver_sql(f"CREATE SCHEMA {schema}")
+    engine = admin.execution_options(schema_translate_map={None: schema})
+    Base.metadata.create_all(engine, tables=[CategoryEntity.__table__, ProductEntity.__table__])
+    try:
+        with Session(engine) as db:
+            for sku_id, title, material, pattern, features in (
+                ("SKU-1", "Silk floral scarf", "silk", "floral", ["handwoven"]),
+                ("SKU-2", "Cotton floral quilt", "cotton", "floral", []),
+                ("SKU-3", "Silk stripe tie", "silk", "stripe", ["handwoven", "limited"]),
+            ):
+                db.add(ProductEntity(
+                    sku_id=sku_id, title=title, material=material, pattern=pattern, color_primary="#aa3355",
+                    colors=[], scale="medium", special_features=features, created_by="test"
+                ))
+            db.commit()
+            yield db
+    finally:
+        with admin.begin() as connection:
+            connection.exec_driver_sql(f"DROP SCHEMA {schema} CASCADE")
+
+@requires_postgres
+def test_search_ranks_filters_and_counts_facets_on_real_rows(search_session):
+    search = DatabaseProductSearch(search_session)
+    
+    floral = search.search(ProductSearchQuery(text="floral"))
+    assert floral.total == 2
+    assert {item["sku_id"] for item in floral.items} == {"SKU-1", "SKU-2"}
+    assert floral.facets["material"] == {"silk": 1, "cotton": 1}
+    
+    handwoven_silk = search.search(ProductSearchQuery(material="silk", special_features=["handwoven"]))
+    assert handwoven_silk.total == 2
+    assert handwoven_silk.facets["pattern"] == {"floral": 1, "stripe": 1}
+    assert handwoven_silk.facets["special_features"] == {"handwoven": 2, "limited": 1}
+
+@requires_postgres
+def test_search_pages_follow_the_cursor_without_overlap(search_session):
+    search = DatabaseProductSearch(search_session)
+    
+    first = search.search(ProductSearchQuery(text="silk", limit=1))
+    second = search.search(ProductSearchQuery(text="silk", limit=1, cursor=first.next_cursor))
+    
+    assert first.total == second.total == 2
+    assert first.next_cursor and second.next_cursor is None
+    assert {first.items[0]["sku_id"], second.items[0]["sku_id"]} == {"SKU-1", "SKU-3"}
+
+@requires_postgres
+def test_loaded_products_defer_the_search_vector(search_session):
+    product = search_session.scalars(select(ProductEntity)).first()
+    assert "search_vector" in inspect(product).unloaded
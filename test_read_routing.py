@@ -0,0 +1,121 @@
+import asyncio
+import time
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from adapters.database.routing import (
+    PRIMARY_UNTIL_COOKIE, ReplicaRoutingMiddleware, RoutingSession, finish_read_routing, start_read_routing
+)
+
+metadata = MetaData()
+notes = Table("notes", metadata, Column("id", Integer, primary_key=True), Column("body", String))
+
+def engines(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, body in ((primary, "primary"), (replica, "replica")):
+        metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(notes).values(id=1, body=body))
+    return primary, sessionmaker(class_=RoutingSession, primary=primary, replicas=[replica])
+
+def read(db) -> str:
+    return db.execute(select(notes.c.body).where(notes.c.id == 1)).scalar()
+
+def test_reads_use_the_replica_only_when_routed_there(tmp_path):
+    _, Session = engines(tmp_path)
+    assert read(Session()) == "primary"
+    assert read(Session(info={"read_only": True})) == "replica"
+    
+    routing, token = start_read_routing(replica=True)
+    try:
+        db = Session()
+        assert read(db) == "replica"
+        db.execute(insert(notes).values(id=2, body="new"))
+        db.commit()
+        # Once the session has written, its reads stay on the primary
+        assert read(db) == "primary"
+        assert routing.wrote
+    finally:
+        finish_read_routing(token)
+
+def test_middleware_pins_clients_that_wrote_to_the_primary(tmp_path):
+    primary, Session = engines(tmp_path)
+    
+    async def app(scope, receive, send):
+        db = Session()
+        if scope["method"] == "POST":
+            db.execute(insert(notes).values(body="written"))
+            db.commit()
+        body = read(db).encode()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+    
+    middleware = ReplicaRoutingMiddleware(app, read_your_writes_seconds=5)
+    
+    def call(method, cookie=None):
+        messages = []
+        
+        async def send(message):
+            messages.append(message)
+        
+        headers = [(b"cookie", cookie.encode())] if cookie else []
+        asyncio.run(middleware({"type": "http", "method": method, "headers": headers}, None, send))
+        return dict(messages[0]["headers"]), messages[1]["body"]
+    
+    headers, body = call("GET")
+    assert body == b"replica" and b"set-cookie" not in headers
+    
+    headers, body = call("POST")
+    assert body == b"primary"
+    cookie = headers[b"set-cookie"].decode().split(";")[0]
+    assert cookie.startswith(PRIMARY_UNTIL_COOKIE)
+    
+    assert call("GET", cookie)[1] == b"primary"
+    assert call("GET", f"{PRIMARY_UNTIL_COOKIE}={time.time() - 1}")[1] == b"replica"
+
+def test_read_only_sessions_stay_on_the_primary_for_clients_that_just_wrote(tmp_path):
+    primary, Session = engines(tmp_path)
+    
+    async def graphql(scope, receive, send):
+        body = read(Session(info={"read_only": True})).encode()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+    
+    middleware = ReplicaRoutingMiddleware(graphql, read_your_writes_seconds=5)
+    
+    def call(cookie=None):
+        messages = []
+        
+        async def send(message):
+            messages.append(message)
+        
+        headers = [(b"cookie", cookie.encode())] if cookie else []
+        asyncio.run(middleware({"type": "http", "method": "POST", "headers": headers}, None, send))
+        return messages[1]["body"]
+    
+    assert call() == b"replica"
+    assert call(f"{PRIMARY_UNTIL_COOKIE}={time.time() + 5}") == b"primary"
+    
+    # A write earlier in the same request pins later read_only sessions too
+    routing, token = start_read_routing(replica=False)
+    try:
+        writer = Session()
+        writer.execute(insert(notes).values(id=3, body="new"))
+        writer.commit()
+        assert read(Session(info={"read_only": True})) == "primary"
+    finally:
+        finish_read_routing(token)
+
+def test_a_session_keeps_the_replica_it_first_read_from(tmp_path):
+    primary, _ = engines(tmp_path)
+    replicas = []
+    for i in range(3):
+        replica = create_engine(f"sqlite:///{tmp_path / f'replica-{i}.db'}")
+        metadata.create_all(replica)
+        with replica.begin() as conn:
+            conn.execute(insert(notes).values(id=1, body=f"replica-{i}"))
+        replicas.append(replica)
+    Session = sessionmaker(class_=RoutingSession, primary=primary, replicas=replicas)
+    
+    db = Session(info={"read_only": True})
+    assert len({read(db) for _ in range(20)}) == 1
@@ -0,0 +1,112 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+import main
+from adapters.database.config import get_db
+from adapters.database.entities import ProcessedJobEntity, RecommendationEntity
+from adapters.mock_job_analyzer import MockJobAnalyzer
+from adapters.database_recommendation_repository import DatabaseRecommendationRepository, encode_cursor, decode_cursor
+from domain.models import ProductAnalysisJob, RecommendationQuery
+
+def compile_search(query: RecommendationQuery) -> str:
+    statement = DatabaseRecommendationRepository(Session()).search_statement(query)
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+def test_summary_view_skips_jsonb_columns_and_filters_server_side():
+    sql = compile_search(RecommendationQuery(
+        is_considered=False,
+        min_confidence=Decimal("0.8"),
+        sku_properties={"material": "silk"},
+        summary=True,
+        limit=20
+    ))
+    
+    assert "recommendations.market_insights" not in sql
+    assert "recommendations.sku_properties @>" in sql
+    assert "recommendations.confidence_score >=" in sql
+    assert "ORDER BY recommendations.created_time DESC, recommendations.id DESC" in sql
+
+def test_cursor_round_trips_and_seeks_past_last_row():
+    created = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    recommendation_id = uuid.uuid4()
+    cursor = encode_cursor(created, recommendation_id)
+    
+    assert decode_cursor(cursor) == (created, recommendation_id)
+    assert "(recommendations.created_time, recommendations.id) <" in compile_search(RecommendationQuery(cursor=cursor))
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+def recommendation_sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'recommendations.db'}")
+    # PostgreSQL column types don't create on SQLite; untyped columns hold the same values
+    columns = ", ".join(column.name for column in RecommendationEntity.__table__.columns)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"CREATE TABLE recommendations ({columns})")
+        # The primary key is what rejects a second save of the same job
+        connection.exec_driver_sql("CREATE TABLE processed_jobs (dedupe_id PRIMARY KEY, recommendation_id, created_time)")
+    return sessionmaker(bind=engine)
+
+def test_results_of_a_redelivered_job_are_saved_once(tmp_path):
+    Session = recommendation_sessions(tmp_path)
+    analyzer = MockJobAnalyzer()
+    
+    def result(dedupe_id):
+        recommendation = analyzer.analyze(ProductAnalysisJob(product_id="p1", sku_id="SKU1", image_urls={}))
+        recommendation.dedupe_id = dedupe_id
+        return recommendation
+    
+    # Two workers (or a restarted one) each save a copy of the same job's result
+    with Session() as db:
+        assert DatabaseRecommendationRepository(db).add_all([result("job-1"), result("job-1"), result(None)]) == 2
+    with Session() as db:
+        assert DatabaseRecommendationRepository(db).add_all([result("job-1"), result("job-2")]) == 1
+    
+    with Session() as db:
+        assert db.query(RecommendationEntity).count() == 3
+        assert sorted(db.scalars(select(ProcessedJobEntity.dedupe_id))) == ["job-1", "job-2"]
+        assert all("dedupe_id" not in entity.sku_properties for entity in db.query(RecommendationEntity))
+
+def test_keyset_pages_cover_every_row_once_and_unpaged_requests_get_all(tmp_path):
+    Session = recommendation_sessions(tmp_path)
+    start = datetime(2024, 5, 1)
+    with Session() as db:
+        # Two rows share a timestamp, so the id tie-break decides their order
+        db.execute(insert(RecommendationEntity), [{
+            "id": uuid.uuid4(), "raw_image_key": f"raw/{i}.jpg", "analysis_type": "market_analysis",
+            "recommended_products": [], "market_insights": {}, "sku_properties": {"index": i},
+            "version": 1, "is_considered": False, "created_by": "agent",
+            "created_time": start + timedelta(minutes=min(i, 3))
+        } for i in range(5)])
+        db.commit()
+    
+    def session():
+        with Session() as db:
+            yield db
+    
+    main.app.dependency_overrides[get_db] = session
+    try:
+        client = TestClient(main.app)
+        unpaged = client.get("/recommendations?view=summary")
+        assert len(unpaged.json()) == 5 and "x-next-cursor" not in unpaged.headers
+        
+        seen, cursor = [], None
+        while True:
+            params = {"view": "summary", "limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/recommendations", params=params, headers={"Origin": "https://admin.example"})
+            assert page.status_code == 200
+            assert "X-Next-Cursor" in page.headers["access-control-expose-headers"]
+            seen += page.json()
+            cursor = page.headers.get("x-next-cursor")
+            if not cursor:
+                break
+    finally:
+        del main.app.dependency_overrides[get_db]
+    
+    assert [row["id"] for row in seen] == [row["id"] for row in unpaged.json()]
+    assert len({row["id"] for row in seen}) == 5
+    assert [row["created_time"] for row in seen] == sorted((row["created_time"] for row in seen), reverse=True)
@@ -0,0 +1,49 @@
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from adapters.request_metrics import MetricsMiddleware, RequestMetrics
+
+def make_client(metrics: RequestMetrics):
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    app = FastAPI()
+    
+    @app.get("/products/{product_id}")
+    def product(product_id: str, queries: int = 1):
+        with engine.connect() as connection:
+            for _ in range(queries):
+                connection.execute(text("SELECT 1"))
+        return {"id": product_id}
+    
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    return TestClient(app)
+
+def test_requests_are_labelled_by_route_template_with_sql_counts():
+    metrics = RequestMetrics(n_plus_one_threshold=0)
+    client = make_client(metrics)
+    
+    client.get("/products/a", params={"queries": 3})
+    client.get("/products/b", params={"queries": 3})
+    client.get("/missing")
+    output = metrics.render()
+    
+    assert 'http_requests_total{method="GET",route="/products/{product_id}",status="200"} 2' in output
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in output
+    assert 'http_request_db_statements_bucket{method="GET",route="/products/{product_id}",le="2"} 0' in output
+    assert 'http_request_db_statements_bucket{method="GET",route="/products/{product_id}",le="5"} 2' in output
+    assert 'http_request_db_statements_sum{method="GET",route="/products/{product_id}"} 6.0' in output
+    assert 'http_response_size_bytes_count{method="GET",route="/products/{product_id}"} 2' in output
+    assert "http_requests_n_plus_one_total{" not in output
+
+def test_requests_over_the_statement_threshold_are_flagged(caplog):
+    metrics = RequestMetrics(n_plus_one_threshold=5)
+    client = make_client(metrics)
+    
+    with caplog.at_level(logging.WARNING, logger="adapters.request_metrics"):
+        client.get("/products/a", params={"queries": 2})
+        client.get("/products/a", params={"queries": 8})
+    
+    assert 'http_requests_n_plus_one_total{method="GET",route="/products/{product_id}"} 1' in metrics.render()
+    assert "ran 8 SQL statements" in caplog.text
+    assert "repeated 8 times: SELECT 1" in caplog.text
@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from adapters.database.partitions import (
+    add_months, create_partition_sql, ensure_partitions_for, month_start, partition_month, partition_name
+)
+from application.retention_sweeper import RetentionSweeper
+from domain.ports import RetentionPort
+
+class CountingRetention(RetentionPort):
+    def __init__(self, expired: int):
+        self.expired = expired
+        self.batches = 0
+        self.dropped_requests = []
+    
+    def delete_expired_recommendations(self, batch_size):
+        self.batches += 1
+        deleted = min(batch_size, self.expired)
+        self.expired -= deleted
+        return deleted
+    
+    def ensure_partitions(self):
+        return []
+    
+    def drop_partitions_older_than(self, table, months):
+        self.dropped_requests.append((table, months))
+        return [partition_name(table, date(2020, 1, 1))]
+
+def test_monthly_partition_names_and_bounds():
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partition_month("recommendations", "recommendations_p202402") == date(2024, 2, 1)
+    assert partition_month("recommendations", "recommendations_archive") is None
+    assert create_partition_sql("campaign_metrics", date(2024, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS campaign_metrics_p202412 PARTITION OF campaign_metrics "
+        "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')"
+    )
+
+def test_sweep_deletes_in_bounded_batches_and_drops_old_partitions():
+    retention = CountingRetention(expired=2500)
+    sweeper = RetentionSweeper(retention, {"campaign_metrics": 24}, batch_size=1000, max_batches=2, batch_pause=0)
+    
+    summary = sweeper.sweep()
+    
+    assert summary["expired_recommendations_deleted"] == 2000
+    assert retention.batches == 2
+    assert retention.dropped_requests == [("campaign_metrics", 24)]
+    assert summary["partitions_dropped"] == ["campaign_metrics_p202001"]
+
+class RecordingEngine:
+    """Stands in for a PostgreSQL engine and keeps the DDL it is asked to run"""
+    
+    def __init__(self):
+        self.engine = self
+        self.dialect = SimpleNamespace(name="postgresql")
+        self.statements = []
+    
+    @contextmanager
+    def begin(self):
+        yield SimpleNamespace(execute=lambda statement: self.statements.append(str(statement)))
+
+def test_back_dated_rows_get_their_partition_created_once():
+    engine = RecordingEngine()
+    # 23:30 on Jan 31 in UTC-5 is already February in UTC, which is what the bounds use
+    late_january = datetime(2023, 1, 31, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    
+    created = ensure_partitions_for(engine, "campaign_metrics", [datetime(2023, 1, 5), late_january, None])
+    assert created == ["campaign_metrics_p202301", "campaign_metrics_p202302"]
+    assert engine.statements == [
+        create_partition_sql("campaign_metrics", date(2023, 1, 1)),
+        create_partition_sql("campaign_metrics", date(2023, 2, 1)),
+    ]
+    assert ensure_partitions_for(engine, "campaign_metrics", [datetime(2023, 1, 20)]) == []
+    assert month_start(late_january) == date(2023, 2, 1)
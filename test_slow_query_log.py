@@ -0,0 +1,43 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+from adapters.slow_query_log import SlowQueryLog, redact
+
+def test_bind_values_are_redacted_to_type_names():
+    assert redact({"sku": "SKU-1", "limit": 20, "deleted_at": None}) == {"sku": "<str>", "limit": "<int>", "deleted_at": None}
+    assert redact(("SKU-1", 2.5)) == ["<str>", "<float>"]
+
+def test_slow_selects_are_buffered_with_call_site_and_plan(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    log = SlowQueryLog(threshold_ms=0, capacity=2)
+    log.instrument_engine(engine)
+    
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE products (id INTEGER PRIMARY KEY, sku TEXT)"))
+        connection.execute(text("CREATE INDEX ix_products_sku ON products (sku)"))
+        connection.execute(text("SELECT id FROM products WHERE sku = :sku"), {"sku": "SKU-1"})
+    
+    log.wait_for_plans()
+    entries = log.recent()
+    assert len(entries) == 2
+    newest = entries[0]
+    assert newest.statement == "SELECT id FROM products WHERE sku = ?"
+    assert newest.parameters == ["<str>"]
+    assert "test_slow_query_log.py" in newest.call_site
+    assert "ix_products_sku" in str(newest.plan)
+    assert entries[1].plan is None  # DDL is never explained
+    
+    log.clear()
+    assert log.recent() == []
+
+def test_plans_do_not_wait_for_the_application_pool(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}", poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1)
+    log = SlowQueryLog(threshold_ms=0)
+    log.instrument_engine(engine)
+    
+    # The request's transaction still holds the only pooled connection while the plan is fetched
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE products (id INTEGER PRIMARY KEY, sku TEXT)"))
+        connection.execute(text("SELECT id FROM products WHERE id = :id"), {"id": 1})
+        log.wait_for_plans()
+    
+    assert "PRIMARY KEY" in str(log.recent()[0].plan)
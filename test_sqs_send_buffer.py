@@ -0,0 +1,41 @@
+import pytest
+from adapters.mock_sqs_queue import MockSQSQueueAdapter
+from adapters.sqs_queue import BufferedSQSQueueAdapter
+from adapters.sqs_send_buffer import SQSSendBuffer, SendBufferFullError
+from domain.models import ProcessingJob
+
+class FlakyClient(MockSQSQueueAdapter):
+    """Mock queue that fails the first entry of the first batch with a throttling error"""
+    
+    def __init__(self):
+        super().__init__("mock-queue")
+        self.batch_sizes = []
+    
+    def send_message_batch(self, QueueUrl, Entries):
+        self.batch_sizes.append(len(Entries))
+        if len(self.batch_sizes) == 1:
+            response = super().send_message_batch(QueueUrl, Entries[1:])
+            response["Failed"] = [{"Id": Entries[0]["Id"], "Code": "ThrottlingException", "SenderFault": False}]
+            return response
+        return super().send_message_batch(QueueUrl, Entries)
+
+def test_jobs_are_sent_in_batches_and_failed_entries_retried():
+    client = FlakyClient()
+    adapter = BufferedSQSQueueAdapter("mock-queue", client, flush_interval=0.2, retry_backoff=0)
+    
+    for i in range(25):
+        adapter.queue_job(ProcessingJob(image_key=f"raw/{i}.jpg", filename=f"{i}.jpg"))
+    adapter.close()
+    
+    assert max(client.batch_sizes) <= 10
+    assert len(client.batch_sizes) < 25
+    assert sorted(m["image_key"] for m in client.messages) == sorted(f"raw/{i}.jpg" for i in range(25))
+
+def test_full_buffer_pushes_back_on_callers():
+    buffer = SQSSendBuffer(MockSQSQueueAdapter("mock-queue"), "mock-queue", max_buffered=1)
+    # Hold the background sender off so nothing drains
+    buffer._ensure_started = lambda: None
+    
+    buffer.put({"MessageBody": "{}"})
+    with pytest.raises(SendBufferFullError):
+        buffer.put({"MessageBody": "{}"})
@@ -0,0 +1,61 @@
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from adapters.memory_span_exporter import InMemorySpanExporter
+from adapters.mock_sqs_queue import MockSQSAnalysisQueueAdapter
+from adapters.otlp_span_exporter import otlp_request
+from adapters.tracing_instrumentation import TracingMiddleware, instrument_engine, traced
+from application.analysis_consumer import parse_job
+from application.outbox_relay import product_analysis_message
+from application.tracing import Tracer, parse_traceparent
+from domain.models import ProductAnalysisJob
+
+def test_request_spans_parent_db_and_adapter_spans_and_reach_queued_jobs():
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter)
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, tracer)
+    queue = traced(MockSQSAnalysisQueueAdapter("analysis"), "analysis_queue", tracer)
+    messages = []
+    app = FastAPI()
+    
+    @app.post("/products/{product_id}/images")
+    def upload(product_id: str):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        messages.append(product_analysis_message(ProductAnalysisJob(product_id, "SKU-1", {})))
+        queue.queue_analysis(ProductAnalysisJob(product_id, "SKU-1", {}))
+        return {"ok": True}
+    
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+    incoming = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+    TestClient(app).post("/products/p1/images", headers={"traceparent": incoming})
+    
+    spans = {span.name: span for span in exporter.finished()}
+    request = spans["POST /products/{product_id}/images"]
+    assert (request.trace_id, request.parent_id) == parse_traceparent(incoming)
+    assert request.attributes["http.response.status_code"] == 200
+    assert spans["db SELECT"].parent_id == request.span_id
+    assert spans["analysis_queue.queue_analysis"].parent_id == request.span_id
+    
+    job = parse_job(json.dumps(messages[0].payload))
+    assert parse_traceparent(job.traceparent) == (request.trace_id, request.span_id)
+
+def test_failed_spans_are_marked_and_encoded_as_otlp():
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter)
+    try:
+        with tracer.span("storage.store_image", "client", component="storage"):
+            raise RuntimeError("bucket unavailable")
+    except RuntimeError:
+        pass
+    
+    span = exporter.finished()[0]
+    encoded = otlp_request([span], "admin-api")["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert encoded["kind"] == 3
+    assert encoded["status"] == {"code": 2, "message": "RuntimeError: bucket unavailable"}
+    assert {"key": "component", "value": {"stringValue": "storage"}} in encoded["attributes"]
+    
+    with Tracer().span("disabled") as disabled:
+        assert disabled is None
@@ -0,0 +1,30 @@
+import pickle
+import pytest
+from domain.base.value_object import ValueObject
+from domain.product.entities import Product
+from domain.product.value_objects import Money, ProductId, ProductTitle, SKU
+
+def test_value_objects_are_slotted_immutable_and_hash_by_value():
+    product_id = ProductId("p-1")
+    
+    assert not hasattr(product_id, "__dict__")
+    assert product_id == ProductId("p-1") and product_id != ProductId("p-2")
+    assert {product_id: "found"}[ProductId("p-1")] == "found"
+    assert Money(10, "INR") != Money(10, "USD")
+    assert repr(Money(10)) == "Money(amount=10, currency=INR)"
+    with pytest.raises(AttributeError):
+        product_id.value = "p-2"
+    
+    restored = pickle.loads(pickle.dumps(product_id))
+    assert restored == product_id and hash(restored) == hash(product_id)
+    assert ValueObject() == ValueObject()
+
+def test_entities_use_slots_and_allocate_events_lazily():
+    product = Product(ProductId("p-1"), ProductTitle("Ikat stole"), SKU("ikat-1"))
+    
+    assert not hasattr(product, "__dict__")
+    assert product.domain_events == []
+    product.add_domain_event("published")
+    assert product.domain_events == ["published"]
+    product.clear_domain_events()
+    assert product.domain_events == []